@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AttendanceConfig(AppConfig):
     # App configuration for 'attendance'.
     name = 'attendance'
+
+    def ready(self):
+        # Connect the handlers that maintain the monthly rollups.
+        from . import signals  # noqa: F401
@@ -0,0 +1,129 @@
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from employees.directory import get_employees_by_employee_id
+from hrms_core.cache import bump_version
+from hrms_core.changefeed import record_writes
+from hrms_core.mongo import allocate_ids, get_collection, to_mongo_date
+from hrms_core.sync import log_changes
+from .models import Attendance
+from .rollups import refresh_rollups
+
+# Outcome of each row in a bulk request.
+CREATED = 'created'
+UPDATED = 'updated'
+DUPLICATE = 'duplicate'
+ERROR = 'error'
+
+# MongoDB error code for a unique index violation.
+DUPLICATE_KEY_ERROR = 11000
+
+
+# Records attendance for many employees on one date.
+#
+# Instead of one INSERT (and a duplicate check) per employee, the whole roster
+# costs four round trips: resolve employee ids, read the existing records for
+# that date, reserve primary keys, and one unordered bulk write of upserts.
+#
+# Each row is reported as:
+#   created   - the write inserted the record
+#   updated   - the write changed the status of an existing record
+#   duplicate - the record already had that status, or the employee appears
+#               more than once in the request (first entry wins)
+#   error     - the employee_id is unknown
+#
+# The existing records only decide which rows need writing; the outcome of the
+# written rows is read from the bulk write result, so a record created or
+# changed concurrently between the read and the write is still reported right.
+def mark_attendance_bulk(date, records):
+    mongo_date = to_mongo_date(date)
+    collection = get_collection(Attendance)
+
+    employee_ids = {row['employee_id'] for row in records}
+    pks = {employee_id: employee.pk for employee_id, employee in get_employees_by_employee_id(employee_ids).items()}
+
+    existing, record_ids = {}, {}
+    for doc in collection.find(
+        {'date': mongo_date, 'employee_id': {'$in': list(pks.values())}},
+        {'employee_id': 1, 'status': 1, 'id': 1, '_id': 0},
+    ):
+        existing[doc['employee_id']] = doc['status']
+        record_ids[doc['employee_id']] = doc.get('id')
+
+    results = []
+    to_write = []
+    seen = set()
+    for row in records:
+        result = {'employee_id': row['employee_id'], 'status': row['status']}
+        results.append(result)
+        pk = pks.get(row['employee_id'])
+        if pk is None:
+            result['result'] = ERROR
+            result['error'] = 'Employee not found.'
+        elif pk in seen or existing.get(pk) == row['status']:
+            result['result'] = DUPLICATE
+        else:
+            to_write.append((result, pk))
+        if pk is not None:
+            seen.add(pk)
+    if not to_write:
+        return results
+
+    # Every upsert matches the record only while its status differs, and inserts
+    # one (with a reserved id) when there is none. Per operation, the result is
+    # then: upserted (created), matched (updated), or a duplicate key error on
+    # the (employee, date) unique index because the record exists with this
+    # status already (duplicate). Ids reserved for rows that turn out to be
+    # updates are left unused.
+    next_id = allocate_ids(Attendance, len(to_write))
+    operations = [
+        UpdateOne(
+            {'employee_id': pk, 'date': mongo_date, 'status': {'$ne': result['status']}},
+            {'$set': {'status': result['status']}, '$setOnInsert': {'id': next_id + index}},
+            upsert=True,
+        )
+        for index, (result, pk) in enumerate(to_write)
+    ]
+    duplicates = set()
+    try:
+        upserted = collection.bulk_write(operations, ordered=False).upserted_ids
+    except BulkWriteError as exc:
+        # Everything else in the batch was still applied.
+        for error in exc.details.get('writeErrors', []):
+            if error.get('code') != DUPLICATE_KEY_ERROR:
+                raise
+            duplicates.add(error['index'])
+        upserted = {row['index']: row['_id'] for row in exc.details.get('upserted', [])}
+
+    created, updated = [], []
+    for index, (result, pk) in enumerate(to_write):
+        if index in duplicates:
+            result['result'] = DUPLICATE
+        elif index in upserted:
+            result['result'] = CREATED
+            record_ids[pk] = next_id + index
+            created.append(pk)
+        else:
+            result['result'] = UPDATED
+            updated.append(pk)
+    # Records created by someone else between the read and the write.
+    unknown = [pk for pk in updated if pk not in record_ids]
+    if unknown:
+        for doc in collection.find(
+            {'date': mongo_date, 'employee_id': {'$in': unknown}}, {'employee_id': 1, 'id': 1, '_id': 0},
+        ):
+            record_ids[doc['employee_id']] = doc.get('id')
+
+    if created or updated:
+        # Raw writes bypass model signals, so invalidate caches and refresh
+        # the monthly rollups of the affected employees explicitly.
+        bump_version('attendance')
+        # Duplicates were written by someone else, who logged them.
+        log_changes('attendance', [(record_ids[pk], [pk]) for pk in created + updated])
+        for pks_written, op in ((created, 'insert'), (updated, 'update')):
+            if pks_written:
+                filter = {'date': mongo_date, 'employee_id': {'$in': pks_written}}
+                record_writes(Attendance, filter, op=op, fields=('status',))
+        refresh_rollups(created + updated, date)
+
+    return results
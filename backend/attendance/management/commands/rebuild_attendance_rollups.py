@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the monthly attendance rollups (AttendanceMonthlySummary) from the daily records.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            help='Only rebuild this month (YYYY-MM). Rebuilds every month by default.',
+        )
+
+    def handle(self, *args, **options):
+        month = None
+        if options['month']:
+            try:
+                month = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--month must look like 2024-05.')
+
+        written = rebuild_rollups(month)
+        scope = f'{month:%Y-%m}' if month else 'all months'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} rollup rows ({scope}).'))
@@ -29,3 +29,27 @@ class Attendance(models.Model):
     def __str__(self):
         # String representation: "John Doe - 2023-10-27 - Present"
         return f"{self.employee.name} - {self.date} - {self.status}"
+
+
+# Materialized monthly rollup: one row per employee per month.
+# Maintained by the signal handlers in attendance/signals.py (and by the bulk
+# marking path), rebuildable with `manage.py rebuild_attendance_rollups`.
+# Reports read these rows instead of scanning the daily Attendance records.
+class AttendanceMonthlySummary(models.Model):
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='attendance_summaries')
+
+    # First day of the month this row covers.
+    month = models.DateField()
+
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    # Most recent date with an attendance record in this month.
+    last_marked = models.DateField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('employee', 'month')
+        ordering = ['-month']
+
+    def __str__(self):
+        return f"{self.employee.name} - {self.month:%Y-%m} - {self.present}/{self.present + self.absent}"
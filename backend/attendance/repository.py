@@ -0,0 +1,15 @@
+from hrms_core.mongo import MongoRepository
+from .models import Attendance, AttendanceMonthlySummary
+
+
+# Native Mongo read path for the attendance list (see hrms_core/mongo.py).
+class AttendanceRepository(MongoRepository):
+    model = Attendance
+    # AttendanceSerializer renders the employee as its employee_id slug.
+    directory_related = ('employee',)
+
+
+# Reads the monthly rollup rows for the monthly_summary action.
+class AttendanceSummaryRepository(MongoRepository):
+    model = AttendanceMonthlySummary
+    directory_related = ('employee',)
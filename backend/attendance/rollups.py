@@ -0,0 +1,119 @@
+from datetime import date
+
+from pymongo import DeleteOne, UpdateOne
+
+from hrms_core.cache import bump_version
+from hrms_core.mongo import allocate_ids, get_collection, to_mongo_date
+from .models import Attendance, AttendanceMonthlySummary
+
+
+def month_start(value):
+    return value.replace(day=1)
+
+
+def next_month(value):
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+# Counts Present/Absent per (employee, month) inside MongoDB.
+# `match` narrows the attendance rows (e.g. some employees and one month).
+def _aggregate(match):
+    pipeline = [
+        {'$match': match},
+        {'$group': {
+            '_id': {
+                'employee_id': '$employee_id',
+                'month': {'$dateFromParts': {'year': {'$year': '$date'}, 'month': {'$month': '$date'}, 'day': 1}},
+            },
+            'present': {'$sum': {'$cond': [{'$eq': ['$status', 'Present']}, 1, 0]}},
+            'absent': {'$sum': {'$cond': [{'$eq': ['$status', 'Absent']}, 1, 0]}},
+            'last_marked': {'$max': '$date'},
+        }},
+    ]
+    return {
+        (row['_id']['employee_id'], row['_id']['month']): row
+        for row in get_collection(Attendance).aggregate(pipeline)
+    }
+
+
+# Recomputes the rollup rows of the given employees for one month.
+#
+# Only the affected (employee, month) cells are touched: one aggregation over
+# that month's attendance for those employees (an indexed range), one read of
+# the existing rollup rows and one bulk write. Recomputing the cell rather than
+# applying +1/-1 deltas keeps it correct under retries and status changes.
+# Cells are written with upserts, so two refreshes creating the same cell at
+# once both succeed (the first one's id is kept).
+def refresh_rollups(employee_ids, month):
+    employee_ids = list(set(employee_ids))
+    if not employee_ids:
+        return
+    month = month_start(month)
+    mongo_month = to_mongo_date(month)
+
+    stats = _aggregate({
+        'employee_id': {'$in': employee_ids},
+        'date': {'$gte': mongo_month, '$lt': to_mongo_date(next_month(month))},
+    })
+    rollups = get_collection(AttendanceMonthlySummary)
+    existing = {
+        doc['employee_id']
+        for doc in rollups.find({'employee_id': {'$in': employee_ids}, 'month': mongo_month}, {'employee_id': 1})
+    }
+
+    new_cells = [
+        employee_id for employee_id in employee_ids
+        if employee_id not in existing and (employee_id, mongo_month) in stats
+    ]
+    next_id = allocate_ids(AttendanceMonthlySummary, len(new_cells))
+    new_ids = {employee_id: next_id + offset for offset, employee_id in enumerate(new_cells)}
+
+    operations = []
+    for employee_id in employee_ids:
+        row = stats.get((employee_id, mongo_month))
+        key = {'employee_id': employee_id, 'month': mongo_month}
+        if row is None:
+            if employee_id in existing:
+                operations.append(DeleteOne(key))
+            continue
+        update = {'$set': {'present': row['present'], 'absent': row['absent'], 'last_marked': row['last_marked']}}
+        if employee_id in new_ids:
+            update['$setOnInsert'] = {'id': new_ids[employee_id]}
+        operations.append(UpdateOne(key, update, upsert=employee_id in new_ids))
+
+    if operations:
+        rollups.bulk_write(operations, ordered=False)
+        bump_version('attendancemonthlysummary')
+
+
+# Rebuilds rollups from scratch, for every month or for one month only.
+# Returns the number of rollup rows written.
+def rebuild_rollups(month=None):
+    match = {}
+    rollup_filter = {}
+    if month is not None:
+        month = month_start(month)
+        match['date'] = {'$gte': to_mongo_date(month), '$lt': to_mongo_date(next_month(month))}
+        rollup_filter['month'] = to_mongo_date(month)
+
+    stats = _aggregate(match)
+    rollups = get_collection(AttendanceMonthlySummary)
+    rollups.delete_many(rollup_filter)
+
+    docs = []
+    next_id = allocate_ids(AttendanceMonthlySummary, len(stats))
+    for offset, ((employee_id, row_month), row) in enumerate(sorted(stats.items())):
+        docs.append({
+            'id': next_id + offset,
+            'employee_id': employee_id,
+            'month': row_month,
+            'present': row['present'],
+            'absent': row['absent'],
+            'last_marked': row['last_marked'],
+        })
+    if docs:
+        rollups.insert_many(docs, ordered=False)
+    bump_version('attendancemonthlysummary')
+    return len(docs)
@@ -1,18 +1,54 @@
 from rest_framework import serializers
-from .models import Attendance
-from employees.models import Employee
+from .models import Attendance, AttendanceMonthlySummary
+from employees.directory import DirectoryListSerializer, EmployeeReadOnlyField, EmployeeSlugRelatedField
+from hrms_core.sparse import SparseFieldsSerializerMixin
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     # SlugRelatedField allows us to represent the 'employee' relationship
     # using the 'employee_id' field (string) instead of the database ID (integer/ObjectId).
     # When reading, it shows the employee_id. When writing, it expects an employee_id to find the object.
-    employee = serializers.SlugRelatedField(
-        slug_field='employee_id',
-        queryset=Employee.objects.all(),
-        required=False
-    )
+    # Both go through the employee directory cache (employees/directory.py).
+    employee = EmployeeSlugRelatedField(required=False)
 
     class Meta:
         model = Attendance
         # Expose all fields including the computed/related ones.
         fields = '__all__'
+        list_serializer_class = DirectoryListSerializer
+
+
+# One row of a bulk attendance request: {"employee_id": "JDOE", "status": "Present"}
+class BulkAttendanceRowSerializer(serializers.Serializer):
+    employee_id = serializers.CharField(max_length=20)
+    status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES)
+
+
+# Payload of POST /api/attendance/bulk/: one date and the statuses to record on it.
+class BulkAttendanceSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    records = BulkAttendanceRowSerializer(many=True, allow_empty=False)
+
+    def validate_records(self, records):
+        if len(records) > self.context.get('max_rows', len(records)):
+            raise serializers.ValidationError(f"At most {self.context['max_rows']} records per request.")
+        return records
+
+
+# One employee-month of the precomputed attendance rollup.
+class AttendanceMonthlySummarySerializer(serializers.ModelSerializer):
+    employee = EmployeeSlugRelatedField(read_only=True)
+    employee_name = EmployeeReadOnlyField(source='employee.name')
+    month = serializers.DateField(format='%Y-%m')
+    # Percentage of marked days that were "Present" (None if nothing was marked).
+    presence_rate = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AttendanceMonthlySummary
+        fields = ('employee', 'employee_name', 'month', 'present', 'absent', 'presence_rate', 'last_marked')
+        list_serializer_class = DirectoryListSerializer
+
+    def get_presence_rate(self, obj):
+        marked = obj.present + obj.absent
+        if not marked:
+            return None
+        return round(100 * obj.present / marked, 1)
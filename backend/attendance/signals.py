@@ -0,0 +1,29 @@
+from collections import defaultdict
+
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Attendance
+from .rollups import month_start, refresh_rollups
+
+
+# Remember the cell a row was loaded in, so that moving it to another month
+# or employee also refreshes the cell it left.
+@receiver(post_init, sender=Attendance)
+def remember_rollup_cell(sender, instance, **kwargs):
+    instance._rollup_cell = (instance.__dict__.get('employee_id'), instance.__dict__.get('date'))
+
+
+# Keep the monthly rollups of the affected employees and months in step with
+# every attendance write made through the ORM. (The bulk marking path writes
+# with pymongo and refreshes its rollups itself.)
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def update_attendance_rollup(sender, instance, **kwargs):
+    months = defaultdict(set)
+    for employee_id, day in ((instance.employee_id, instance.date), getattr(instance, '_rollup_cell', (None, None))):
+        if employee_id is not None and day is not None:
+            months[month_start(day)].add(employee_id)
+    for month, employee_ids in months.items():
+        refresh_rollups(employee_ids, month)
+    instance._rollup_cell = (instance.employee_id, instance.date)
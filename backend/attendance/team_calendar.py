@@ -0,0 +1,121 @@
+from calendar import monthrange
+
+from pymongo.errors import OperationFailure
+
+from hrms_core.mongo import get_report_collection, to_mongo_date
+from leaves.models import Leave
+from .models import Attendance
+
+# ---------------------------------------------------------------------------
+# Team attendance calendar: an employee x day matrix for one month.
+#
+# Each employee's month is a string with one character per day:
+#   P present, A absent, L on approved leave, . nothing recorded
+# An approved leave covers the days without attendance and the absences; a
+# day marked present stays present. 500 employees x 31 days is 15.5 KB of
+# row strings before compression, instead of one JSON object per record.
+#
+# The attendance of the month and the approved leaves overlapping it come
+# back from one aggregation: the attendance is grouped into day numbers per
+# employee and status on the server (at most two small documents per
+# employee), and the leave ranges are appended with $unionWith (MongoDB 4.4+).
+# Servers and mocks without $unionWith (older MongoDB, mongomock) get the same
+# two pipelines as two round trips. Served by the (employee, -date) and
+# (employee, start_date, end_date) indexes.
+# ---------------------------------------------------------------------------
+
+PRESENT = 'P'
+ABSENT = 'A'
+ON_LEAVE = 'L'
+NO_RECORD = '.'
+
+LEGEND = {PRESENT: 'Present', ABSENT: 'Absent', ON_LEAVE: 'On leave', NO_RECORD: 'No record'}
+CODES = {'Present': PRESENT, 'Absent': ABSENT}
+
+# MongoDB error code for an unknown pipeline stage.
+UNRECOGNIZED_STAGE = 40324
+
+
+def month_bounds(month):
+    first = month.replace(day=1)
+    return first, first.replace(day=monthrange(first.year, first.month)[1])
+
+
+def _attendance_stages(pks, first, last):
+    return [
+        {'$match': {
+            'employee_id': {'$in': pks},
+            'date': {'$gte': to_mongo_date(first), '$lte': to_mongo_date(last)},
+        }},
+        {'$group': {
+            '_id': {'employee': '$employee_id', 'status': '$status'},
+            'days': {'$push': {'$dayOfMonth': '$date'}},
+        }},
+    ]
+
+
+def _leave_stages(pks, first, last):
+    return [
+        {'$match': {
+            'employee_id': {'$in': pks},
+            'start_date': {'$lte': to_mongo_date(last)},
+            'end_date': {'$gte': to_mongo_date(first)},
+            'status': 'Approved',
+        }},
+        {'$project': {'_id': 0, 'leave': '$employee_id', 'start': '$start_date', 'end': '$end_date'}},
+    ]
+
+
+# The attendance groups and the leave ranges, in one round trip when the server
+# has $unionWith. A report: may be read from a secondary
+# (MONGO_REPORT_READ_PREFERENCE).
+def _month_documents(pks, first, last):
+    attendance = get_report_collection(Attendance)
+    leave_stages = _leave_stages(pks, first, last)
+    try:
+        return list(attendance.aggregate(
+            _attendance_stages(pks, first, last)
+            + [{'$unionWith': {'coll': Leave._meta.db_table, 'pipeline': leave_stages}}]
+        ))
+    except NotImplementedError:
+        # mongomock (benchmarks/environment.py).
+        pass
+    except OperationFailure as exc:
+        if exc.code != UNRECOGNIZED_STAGE:
+            raise
+    return (
+        list(attendance.aggregate(_attendance_stages(pks, first, last)))
+        + list(get_report_collection(Leave).aggregate(leave_stages))
+    )
+
+
+# {pk: day string} for the given employee pks and the month of `month`.
+def attendance_calendar(pks, month):
+    first, last = month_bounds(month)
+    days = {pk: [NO_RECORD] * last.day for pk in pks}
+    if not days:
+        return {}
+
+    leaves = []
+    for doc in _month_documents(list(days), first, last):
+        if 'leave' in doc:
+            leaves.append(doc)
+            continue
+        row = days.get(doc['_id']['employee'])
+        code = CODES.get(doc['_id']['status'])
+        if row is None or code is None:
+            continue
+        for day in doc['days']:
+            row[day - 1] = code
+
+    for leave in leaves:
+        row = days.get(leave['leave'])
+        if row is None:
+            continue
+        start = max(leave['start'].date(), first).day
+        end = min(leave['end'].date(), last).day
+        for index in range(start - 1, end):
+            if row[index] != PRESENT:
+                row[index] = ON_LEAVE
+
+    return {pk: ''.join(row) for pk, row in days.items()}
@@ -1,15 +1,51 @@
-from rest_framework import viewsets, permissions, serializers
+from collections import Counter
+
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import viewsets, permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .models import Attendance
-from .serializers import AttendanceSerializer
+from .serializers import AttendanceSerializer, BulkAttendanceSerializer, AttendanceMonthlySummarySerializer
+from .bulk import mark_attendance_bulk, CREATED, UPDATED, DUPLICATE, ERROR
+from .team_calendar import LEGEND, attendance_calendar, month_bounds
+from .repository import AttendanceRepository, AttendanceSummaryRepository
+from employees.directory import get_department_members
 from employees.models import Employee
+from hrms_core.conditional import ConditionalGetMixin
+from hrms_core.export import ExportMixin
+from hrms_core.filters import ChoiceFilter, DateFilter, DepartmentFilter, EmployeeFilter, FilterMixin
+from hrms_core.mixins import MongoReadMixin
+from hrms_core.mongo import to_mongo_date
+from hrms_core.sparse import SparseFieldsMixin
 
 # Exceptions we might need to catch when saving to stats
 from django.db import IntegrityError, DatabaseError
 from pymongo.errors import BulkWriteError
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(ConditionalGetMixin, SparseFieldsMixin, ExportMixin, FilterMixin, MongoReadMixin,
+                        viewsets.ModelViewSet):
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Conditional GET: rows show the employee's employee_id.
+    etag_dependencies = ('attendance', 'employee')
+    # List reads go straight to MongoDB when 'attendance' is in MONGO_READ_ENDPOINTS.
+    repository_class = AttendanceRepository
+    mongo_reads_name = 'attendance'
+    # GET .../export/?output=csv|ndjson&from=&to=&department= streams the full history.
+    export_range_fields = ('date', 'date')
+    # GET /api/attendance/?employee_id=&department=&status=&from=&to=&ordering=
+    # (hrms_core/filters.py; only index-backed combinations are accepted).
+    filterset = {
+        'employee_id': EmployeeFilter('employee'),
+        'department': DepartmentFilter('employee'),
+        'status': ChoiceFilter('status'),
+        'from': DateFilter('date', 'gte'),
+        'to': DateFilter('date', 'lte'),
+    }
+    ordering_fields = ('date',)
 
     # Custom QuerySet:
     # Admins see all records.
@@ -24,6 +60,16 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         except AttributeError:
             return Attendance.objects.none()
 
+    # Same scoping as get_queryset(), as a raw Mongo filter.
+    def get_mongo_filter(self):
+        try:
+            employee = self.request.user.employee
+        except AttributeError:
+            return None
+        if employee.role == 'admin':
+            return {}
+        return {'employee_id': employee.pk}
+
     def perform_create(self, serializer):
         user = self.request.user
         try:
@@ -38,3 +84,108 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError("User is not linked to an Employee profile.")
         except (IntegrityError, BulkWriteError, DatabaseError):
             raise serializers.ValidationError("Attendance already marked for this date.")
+
+    # POST /api/attendance/bulk/
+    # {"date": "2024-05-01", "records": [{"employee_id": "JDOE", "status": "Present"}, ...]}
+    # Marks a whole roster in one request and one batched write (admins only).
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        try:
+            employee = request.user.employee
+        except AttributeError:
+            raise serializers.ValidationError("User is not linked to an Employee profile.")
+        if employee.role != 'admin':
+            return Response({'error': 'Only admins can mark attendance in bulk'}, status=status.HTTP_403_FORBIDDEN)
+
+        payload = BulkAttendanceSerializer(
+            data=request.data,
+            context={'max_rows': settings.ATTENDANCE_BULK_MAX_ROWS},
+        )
+        payload.is_valid(raise_exception=True)
+        results = mark_attendance_bulk(payload.validated_data['date'], payload.validated_data['records'])
+
+        counts = Counter(row['result'] for row in results)
+        return Response({
+            'date': payload.validated_data['date'],
+            'created': counts[CREATED],
+            'updated': counts[UPDATED],
+            'duplicate': counts[DUPLICATE],
+            'errors': counts[ERROR],
+            'results': results,
+        })
+
+    # GET /api/attendance/monthly_summary/?from=2024-01&to=2024-12&department=Engineering
+    # Present/absent counts per employee per month, read from the precomputed
+    # rollup rows rather than the daily records. Same role scoping as the list.
+    @action(detail=False, methods=['get'])
+    def monthly_summary(self, request):
+        mongo_filter = self.get_mongo_filter()
+        if mongo_filter is None:
+            raise serializers.ValidationError("User is not linked to an Employee profile.")
+        mongo_filter = dict(mongo_filter)
+
+        month_range = {}
+        for param, operator in (('from', '$gte'), ('to', '$lte')):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                month_range[operator] = to_mongo_date(datetime.strptime(value, '%Y-%m').date())
+            except ValueError:
+                raise serializers.ValidationError({param: 'Use the YYYY-MM format.'})
+        if month_range:
+            mongo_filter['month'] = month_range
+
+        department = request.query_params.get('department')
+        if department:
+            in_department = list(Employee.objects.filter(department=department).values_list('id', flat=True))
+            mongo_filter = {'$and': [mongo_filter, {'employee_id': {'$in': in_department}}]}
+
+        # A report: may be read from a secondary (MONGO_REPORT_READ_PREFERENCE).
+        query = AttendanceSummaryRepository(report=True).query(mongo_filter, ['-month', 'employee'])
+        page = self.paginate_queryset(query)
+        if page is not None:
+            return self.get_paginated_response(AttendanceMonthlySummarySerializer(page, many=True).data)
+        return Response(AttendanceMonthlySummarySerializer(list(query), many=True).data)
+
+    # GET /api/attendance/calendar/?month=2024-05&department=Engineering
+    # The month as an employee x day matrix (attendance/team_calendar.py): the
+    # employees as parallel arrays and one string per employee with a
+    # character per day. Admins choose the department; employees get their
+    # own row. `month` defaults to the current one.
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        try:
+            employee = request.user.employee
+        except AttributeError:
+            raise serializers.ValidationError("User is not linked to an Employee profile.")
+
+        value = request.query_params.get('month')
+        if value:
+            try:
+                month = datetime.strptime(value, '%Y-%m').date()
+            except ValueError:
+                raise serializers.ValidationError({'month': 'Use the YYYY-MM format.'})
+        else:
+            month = timezone.localdate().replace(day=1)
+
+        if employee.role == 'admin':
+            department = request.query_params.get('department', '').strip()
+            if not department:
+                raise serializers.ValidationError({'department': 'This parameter is required.'})
+            members = get_department_members(department)
+        else:
+            members = [employee]
+
+        rows = attendance_calendar([member.pk for member in members], month)
+        return Response({
+            'month': month.strftime('%Y-%m'),
+            'days': month_bounds(month)[1].day,
+            'legend': LEGEND,
+            'employees': {
+                'id': [member.pk for member in members],
+                'employee_id': [member.employee_id for member in members],
+                'name': [member.name for member in members],
+            },
+            'rows': [rows[member.pk] for member in members],
+        })
@@ -0,0 +1,105 @@
+"""
+Django bootstrap shared by the benchmark scripts.
+
+By default the scripts talk to the MongoDB configured in settings (MONGODB_URL,
+MONGODB_NAME); point them at a local `mongod` and a throwaway database name.
+With `mongomock=True` the whole stack (djongo, the pymongo repositories and the
+aggregations) runs against an in-memory mongomock client instead, so the suite
+works on a laptop or in CI without a server. mongomock timings are only
+comparable with other mongomock runs.
+"""
+import contextlib
+import io
+import os
+import threading
+
+import django
+
+
+# Counts the MongoDB operations issued by the process, whichever layer issues
+# them (djongo's SQL translation or the raw pymongo repositories).
+class MongoOperationCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def increment(self):
+        with self._lock:
+            self.count += 1
+
+
+operations = MongoOperationCounter()
+
+# mongomock.Collection methods that hit the "server".
+_MONGOMOCK_OPERATIONS = (
+    'find', 'find_one', 'aggregate', 'count_documents', 'distinct',
+    'insert_one', 'insert_many', 'update_one', 'update_many', 'replace_one',
+    'delete_one', 'delete_many', 'bulk_write',
+    'find_one_and_update', 'find_one_and_replace', 'find_one_and_delete',
+)
+
+
+def _count_mongomock_operations():
+    from mongomock.collection import Collection
+
+    def counted(method):
+        def wrapper(self, *args, **kwargs):
+            operations.increment()
+            return method(self, *args, **kwargs)
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    for name in _MONGOMOCK_OPERATIONS:
+        setattr(Collection, name, counted(getattr(Collection, name)))
+
+
+def _count_pymongo_operations():
+    from pymongo import monitoring
+
+    class Listener(monitoring.CommandListener):
+        def started(self, event):
+            operations.increment()
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    # Must be registered before djongo creates its MongoClient.
+    monitoring.register(Listener())
+
+
+# Dataset options shared by the seed_benchmark_data command and the load runner
+# (see benchmarks/seed.py). Defined here because seed.py needs Django set up.
+def add_seed_arguments(parser):
+    parser.add_argument('--employees', type=int, default=200)
+    parser.add_argument('--days', type=int, default=60, help='days of attendance history')
+    parser.add_argument('--projects', type=int, default=25)
+    parser.add_argument('--tasks-per-project', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42, help='random seed; same seed, same dataset')
+
+
+def setup(mongomock=False):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hrms_core.settings')
+
+    if mongomock:
+        import djongo.database
+        import mongomock as mongomock_module
+        from django.conf import settings
+
+        # djongo caches one MongoClient per database name; planting ours
+        # makes every connection (ORM and raw pymongo) share it.
+        djongo.database.clients[settings.DATABASES['default']['NAME']] = mongomock_module.MongoClient()
+        _count_mongomock_operations()
+    else:
+        _count_pymongo_operations()
+
+    django.setup()
+
+    if mongomock:
+        from django.core.management import call_command
+
+        # djongo prints a warning per unsupported DDL feature while migrating.
+        with contextlib.redirect_stdout(io.StringIO()):
+            call_command('migrate', verbosity=0)
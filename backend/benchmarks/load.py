@@ -0,0 +1,211 @@
+"""
+Runs the load scenarios (benchmarks/scenarios.py) against hrms_core.urls through
+Django's test client and reports, per request type: p50/p95/p99 latency, ORM
+queries (statements djongo had to translate), MongoDB operations (everything
+that reached the database, raw pymongo included) and response size.
+
+Self-contained run on an in-memory mongomock database, seeded first:
+
+    python -m benchmarks.load --mongomock --iterations 100 --save benchmarks/baselines/mongomock.json
+
+Against a local mongod (a throwaway MONGODB_NAME, seeded with the
+seed_benchmark_data command):
+
+    MONGODB_URL=mongodb://localhost:27017 MONGODB_NAME=hrms_bench python -m benchmarks.load
+
+--compare BASELINE.json prints the change against an earlier run and exits with
+status 1 when a request got slower than --threshold percent at p95, larger than
+--threshold percent, or issues more queries than before. Run it before and
+after touching a hot path.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.environment import add_seed_arguments, operations, setup
+from benchmarks.scenarios import SCENARIOS
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+# Issues requests as a given user (with a real JWT, so authentication is part
+# of the measurement) and records one sample per request.
+class Session:
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client(raise_request_exception=False)
+        self.samples = {}
+        self._tokens = {}
+
+    def _authorization(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        if user.pk not in self._tokens:
+            self._tokens[user.pk] = f'Bearer {AccessToken.for_user(user)}'
+        return self._tokens[user.pk]
+
+    def request(self, label, method, path, user, data=None):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        send = getattr(self.client, method)
+        kwargs = {'HTTP_AUTHORIZATION': self._authorization(user)}
+        if data is not None:
+            kwargs.update(data=json.dumps(data), content_type='application/json')
+
+        with CaptureQueriesContext(connection) as queries:
+            operations_before = operations.count
+            started = time.perf_counter()
+            response = send(path, **kwargs)
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            elapsed = (time.perf_counter() - started) * 1000
+
+        self.samples.setdefault(label, []).append({
+            'ms': elapsed,
+            'queries': len(queries),
+            'mongo_ops': operations.count - operations_before,
+            'bytes': size,
+            'error': response.status_code >= 400,
+        })
+        return response
+
+    def get(self, label, path, user):
+        return self.request(label, 'get', path, user)
+
+    def post(self, label, path, user, data):
+        return self.request(label, 'post', path, user, data)
+
+    def patch(self, label, path, user, data=None):
+        return self.request(label, 'patch', path, user, data)
+
+
+def summarize(samples):
+    count = len(samples)
+    return {
+        'requests': count,
+        'errors': sum(sample['error'] for sample in samples),
+        'p50_ms': round(percentile([sample['ms'] for sample in samples], 50), 3),
+        'p95_ms': round(percentile([sample['ms'] for sample in samples], 95), 3),
+        'p99_ms': round(percentile([sample['ms'] for sample in samples], 99), 3),
+        'queries': round(sum(sample['queries'] for sample in samples) / count, 2),
+        'mongo_ops': round(sum(sample['mongo_ops'] for sample in samples) / count, 2),
+        'bytes': round(sum(sample['bytes'] for sample in samples) / count),
+    }
+
+
+def run(scenarios, iterations, warmup):
+    from benchmarks.scenarios import Context
+
+    context = Context()
+    results = {}
+    for name in scenarios:
+        scenario = SCENARIOS[name]
+        session = Session()
+        for iteration in range(warmup):
+            scenario(Session(), context, iteration)
+        for iteration in range(warmup, warmup + iterations):
+            scenario(session, context, iteration)
+        for label, samples in session.samples.items():
+            results[f'{name}/{label}'] = summarize(samples)
+    return results
+
+
+COLUMNS = (
+    ('requests', 'n', '{:>6}'), ('errors', 'err', '{:>5}'),
+    ('p50_ms', 'p50 ms', '{:>9.2f}'), ('p95_ms', 'p95 ms', '{:>9.2f}'), ('p99_ms', 'p99 ms', '{:>9.2f}'),
+    ('queries', 'queries', '{:>9.2f}'), ('mongo_ops', 'mongo ops', '{:>10.2f}'), ('bytes', 'bytes', '{:>10}'),
+)
+
+
+def print_results(results):
+    width = max(len(name) for name in results) + 2
+    header = ''.join(f'{title:>{len(fmt.format(0))}}' for _, title, fmt in COLUMNS)
+    print(f'{"request":<{width}}{header}')
+    for name, stats in results.items():
+        print(f'{name:<{width}}' + ''.join(fmt.format(stats[key]) for key, _, fmt in COLUMNS))
+
+
+# Prints the change against a baseline and returns the regressed requests.
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f'\nCompared with {baseline["created"]} ({baseline["backend"]}):')
+    for name, stats in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f'  {name}: new')
+            continue
+        changes, regressed = [], False
+        for key in ('p95_ms', 'bytes'):
+            delta = (stats[key] - before[key]) / before[key] * 100 if before[key] else 0
+            changes.append(f'{key} {delta:+.0f}%')
+            regressed |= delta > threshold
+        for key in ('queries', 'mongo_ops'):
+            changes.append(f'{key} {before[key]:g} -> {stats[key]:g}')
+            regressed |= stats[key] > before[key]
+        if regressed:
+            regressions.append(name)
+        print(f'  {name}: {", ".join(changes)}{"  <-- REGRESSION" if regressed else ""}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongomock', action='store_true',
+                        help='run against an in-memory mongomock database (seeded automatically)')
+    parser.add_argument('--no-seed', action='store_true',
+                        help='use the data already in the database (the default without --mongomock)')
+    add_seed_arguments(parser)
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help='scenario to run; repeat for several (default: all)')
+    parser.add_argument('--iterations', type=int, default=50, help='iterations per scenario')
+    parser.add_argument('--warmup', type=int, default=3, help='unmeasured iterations per scenario')
+    parser.add_argument('--save', metavar='PATH', help='write the results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='baseline JSON to compare with')
+    parser.add_argument('--threshold', type=float, default=20,
+                        help='allowed p95 latency / size growth in percent (default 20)')
+    args = parser.parse_args()
+
+    setup(mongomock=args.mongomock)
+    if args.mongomock and not args.no_seed:
+        from benchmarks.seed import seed_from_options
+        seed_from_options(vars(args))
+
+    results = run(args.scenario or list(SCENARIOS), args.iterations, args.warmup)
+    print_results(results)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'backend': 'mongomock' if args.mongomock else 'mongod',
+        'python': platform.python_version(),
+        'options': {key: getattr(args, key) for key in
+                    ('employees', 'days', 'projects', 'tasks_per_project', 'seed', 'iterations', 'warmup')},
+        'results': results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as handle:
+            json.dump(report, handle, indent=2)
+            handle.write('\n')
+        print(f'\nSaved {args.save}')
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
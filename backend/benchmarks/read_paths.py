@@ -0,0 +1,81 @@
+"""
+Compares the djongo ORM read path with the native pymongo repositories
+(hrms_core/mongo.py) for the attendance, leave and task list endpoints.
+
+Both paths build the same serializer output; only the data access differs.
+Run from the backend/ directory against a populated database:
+
+    python -m benchmarks.read_paths --iterations 50 --limit 200
+"""
+import argparse
+import os
+import statistics
+import time
+
+import django
+
+
+def _timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'mean': statistics.mean(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--limit', type=int, default=100, help='rows per list call')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hrms_core.settings')
+    django.setup()
+
+    from attendance.models import Attendance
+    from attendance.repository import AttendanceRepository
+    from attendance.serializers import AttendanceSerializer
+    from leaves.models import Leave
+    from leaves.repository import LeaveRepository
+    from leaves.serializers import LeaveSerializer
+    from tasks.models import Task
+    from tasks.repository import TaskRepository
+    from tasks.serializers import TaskSerializer
+    from tasks.views import TASK_RELATIONS
+
+    # (name, ORM queryset, repository, serializer) with the viewsets' admin scope.
+    cases = [
+        ('attendance', Attendance.objects.all().select_related('employee').order_by('-date'),
+         AttendanceRepository(), AttendanceSerializer),
+        ('leaves', Leave.objects.all().select_related('employee').order_by('-applied_on'),
+         LeaveRepository(), LeaveSerializer),
+        ('tasks', Task.objects.all().prefetch_related(*TASK_RELATIONS).order_by('-created_at'),
+         TaskRepository(), TaskSerializer),
+    ]
+
+    print(f'{"endpoint":<12}{"path":<8}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"rows":>8}')
+    for name, queryset, repository, serializer_class in cases:
+        ordering = queryset.query.order_by
+
+        def orm():
+            return serializer_class(list(queryset.all()[:args.limit]), many=True).data
+
+        def mongo():
+            return serializer_class(list(repository.query({}, ordering)[:args.limit]), many=True).data
+
+        rows = len(orm())
+        if orm() != mongo():
+            print(f'{name:<12}WARNING: the two paths produced different output')
+        for path, fn in (('orm', orm), ('mongo', mongo)):
+            stats = _timed(fn, args.iterations)
+            print(f'{name:<12}{path:<8}{stats["mean"]:>10.2f}{stats["p50"]:>10.2f}{stats["p95"]:>10.2f}{rows:>8}')
+
+
+if __name__ == '__main__':
+    main()
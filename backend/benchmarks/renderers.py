@@ -0,0 +1,131 @@
+"""
+Compares DRF's JSONRenderer/JSONParser with the orjson ones in
+hrms_core/renderers.py (enabled with API_FAST_JSON) on real HRMS payloads.
+
+The payloads are the `data` of actual API responses for an admin: the unpaginated
+lists the React app loads (?paginate=false), the project list with tasks and
+members expanded, and the dashboard summary. Each one is rendered with both
+renderers, the outputs are checked to decode to the same JSON, and the median
+time per render is reported. Parsing is measured on a bulk attendance upload
+built from the attendance list.
+
+    python -m benchmarks.renderers --mongomock
+    MONGODB_URL=mongodb://localhost:27017 MONGODB_NAME=hrms_bench python -m benchmarks.renderers
+"""
+import argparse
+import io
+import json
+import statistics
+import time
+
+from benchmarks.environment import add_seed_arguments, setup
+
+PAYLOADS = (
+    ('tasks', '/api/tasks/?paginate=false'),
+    ('attendance', '/api/attendance/?paginate=false'),
+    ('leaves', '/api/leaves/?paginate=false'),
+    ('employees', '/api/employees/?paginate=false'),
+    ('projects (expanded)', '/api/projects/?paginate=false&expand=tasks,member_details'),
+    ('dashboard summary', '/api/dashboard/summary/'),
+)
+
+
+def load_payloads():
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from benchmarks.scenarios import Context
+
+    admin = Context().admin(0)
+    client = Client()
+    authorization = f'Bearer {AccessToken.for_user(admin)}'
+    payloads = {}
+    for name, path in PAYLOADS:
+        response = client.get(path, HTTP_AUTHORIZATION=authorization)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {path} returned {response.status_code}')
+        payloads[name] = response.data
+    return payloads
+
+
+# Median milliseconds per call of `function` over `repeat` timed calls.
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def compare_renderers(payloads, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    from hrms_core.renderers import ORJSONRenderer
+
+    standard, fast = JSONRenderer(), ORJSONRenderer()
+    results = {}
+    for name, data in payloads.items():
+        expected, actual = standard.render(data), fast.render(data)
+        if json.loads(expected) != json.loads(actual):
+            raise AssertionError(f'{name}: the renderers disagree')
+        results[name] = {
+            'bytes': len(expected),
+            'json_ms': timed(lambda: standard.render(data), repeat),
+            'orjson_ms': timed(lambda: fast.render(data), repeat),
+        }
+    return results
+
+
+def compare_parsers(payloads, repeat):
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from hrms_core.renderers import ORJSONParser
+
+    body = JSONRenderer().render([
+        {'employee': row['employee'], 'date': row['date'], 'status': row['status']}
+        for row in payloads['attendance']
+    ])
+    standard, fast = JSONParser(), ORJSONParser()
+    if standard.parse(io.BytesIO(body)) != fast.parse(io.BytesIO(body)):
+        raise AssertionError('the parsers disagree')
+    return {'bulk attendance upload': {
+        'bytes': len(body),
+        'json_ms': timed(lambda: standard.parse(io.BytesIO(body)), repeat),
+        'orjson_ms': timed(lambda: fast.parse(io.BytesIO(body)), repeat),
+    }}
+
+
+def print_results(title, results):
+    width = max(len(name) for name in results) + 2
+    print(f'{title:<{width}}{"bytes":>10}{"json ms":>10}{"orjson ms":>11}{"speedup":>9}')
+    for name, stats in results.items():
+        speedup = stats['json_ms'] / stats['orjson_ms'] if stats['orjson_ms'] else float('inf')
+        print(f'{name:<{width}}{stats["bytes"]:>10}{stats["json_ms"]:>10.3f}'
+              f'{stats["orjson_ms"]:>11.3f}{speedup:>8.1f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongomock', action='store_true',
+                        help='run against an in-memory mongomock database (seeded automatically)')
+    parser.add_argument('--no-seed', action='store_true',
+                        help='use the data already in the database (the default without --mongomock)')
+    add_seed_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=50, help='timed renders per payload')
+    args = parser.parse_args()
+
+    setup(mongomock=args.mongomock)
+    if args.mongomock and not args.no_seed:
+        from benchmarks.seed import seed_from_options
+        seed_from_options(vars(args))
+
+    payloads = load_payloads()
+    print_results('render', compare_renderers(payloads, args.repeat))
+    print()
+    print_results('parse', compare_parsers(payloads, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Scripted load scenarios for benchmarks/load.py.
+
+Each scenario is a function (session, context, iteration) that issues the
+requests one user makes for a screen of the React app, with the same URLs and
+query parameters as the frontend (list GETs carry ?paginate=false, like
+frontend/src/services/api.js). Every iteration acts as a different user where
+that matters, so caches keyed by user are exercised the way real traffic would.
+"""
+from datetime import date, timedelta
+
+
+# Users and ids the scenarios pick from, read from the database once.
+class Context:
+    def __init__(self):
+        from employees.models import Employee
+        from leaves.models import Leave
+        from tasks.models import Project, Task
+
+        people = Employee.objects.filter(user__isnull=False).select_related('user').order_by('pk')
+        self.admins = [person.user for person in people if person.role == 'admin']
+        self.employees = [person.user for person in people if person.role == 'employee']
+        if not self.admins or not self.employees:
+            raise RuntimeError('The database needs at least one admin and one employee with a login; '
+                               'run the seed_benchmark_data command first.')
+        users_by_employee = {person.pk: person.user for person in people}
+        self.employee_ids = {person.user.pk: person.employee_id for person in people}
+
+        self.pending_leaves = list(Leave.objects.filter(status='Pending').order_by('applied_on')
+                                   .values_list('pk', flat=True))
+        self.projects = list(Project.objects.order_by('pk').values_list('pk', flat=True))
+        self.tasks = [
+            (pk, users_by_employee[assignee])
+            for pk, assignee in Task.objects.order_by('pk').values_list('pk', 'assigned_to_id')
+            if assignee in users_by_employee
+        ]
+
+    def employee(self, iteration):
+        return self.employees[iteration % len(self.employees)]
+
+    def admin(self, iteration):
+        return self.admins[iteration % len(self.admins)]
+
+
+# Landing page after login: the profile, then the dashboard widgets.
+def dashboard(session, context, iteration):
+    user = context.employee(iteration)
+    session.get('me', '/api/me/', user)
+    session.get('dashboard summary', '/api/dashboard/summary/', user)
+
+
+# Morning check-in: every employee marks today's attendance and reloads the
+# page. Once everyone has checked in the run moves on to the following day.
+# The payload names the employee because AttendanceSerializer's unique-together
+# validator makes the field required, even though perform_create fills it in.
+def attendance_checkin(session, context, iteration):
+    user = context.employee(iteration)
+    day = date.today() + timedelta(days=iteration // len(context.employees))
+    payload = {'employee': context.employee_ids[user.pk], 'date': day.isoformat(), 'status': 'Present'}
+    session.post('mark attendance', '/api/attendance/', user, payload)
+    session.get('attendance list', '/api/attendance/?paginate=false', user)
+
+
+# An admin works through the pending leave queue: load the list, decide one
+# request (every third is rejected), repeat.
+def leave_review(session, context, iteration):
+    admin = context.admin(iteration)
+    session.get('leaves list', '/api/leaves/?paginate=false', admin)
+    if iteration < len(context.pending_leaves):
+        action = 'reject' if iteration % 3 == 0 else 'approve'
+        session.patch('leave decision', f'/api/leaves/{context.pending_leaves[iteration]}/{action}/', admin)
+
+
+# Project pages: an admin opens a project, an assignee opens one of its tasks.
+def project_detail(session, context, iteration):
+    if context.projects:
+        project = context.projects[iteration % len(context.projects)]
+        session.get('project detail', f'/api/projects/{project}/', context.admin(iteration))
+    if context.tasks:
+        task, assignee = context.tasks[iteration % len(context.tasks)]
+        session.get('task detail', f'/api/tasks/{task}/', assignee)
+
+
+SCENARIOS = {
+    'dashboard': dashboard,
+    'attendance_checkin': attendance_checkin,
+    'leave_review': leave_review,
+    'project_detail': project_detail,
+}
@@ -0,0 +1,221 @@
+"""
+Generates a realistic HRMS dataset for the benchmarks.
+
+    python manage.py seed_benchmark_data --employees 200 --days 60 --projects 25 --tasks-per-project 20
+
+Creates users and employees across weighted departments (a few of them admins),
+weekday attendance with per-employee reliability, leave requests (past ones
+decided, upcoming ones mostly pending), projects with members drawn mostly from
+one department, and tasks whose status follows their deadline. The same --seed
+always produces the same dataset.
+
+Documents are written in bulk with pymongo (ids drawn from djongo's counters,
+see hrms_core/mongo.py), then attendance rollups and leave balances are rebuilt
+and the cache version counters bumped, exactly as the app's own bulk paths do.
+
+Run it against a throwaway database (MONGODB_NAME); --flush empties the seeded
+collections first.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+
+from bson import ObjectId
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from attendance.models import Attendance, AttendanceMonthlySummary
+from attendance.rollups import rebuild_rollups
+from employees.models import Employee
+from hrms_core.cache import bump_version
+from hrms_core.mongo import allocate_ids, get_collection, to_document
+from leaves.balances import rebuild_balances
+from leaves.models import Leave, LeaveBalance
+from tasks.models import Project, Task
+
+DEPARTMENTS = {
+    'Engineering': 35, 'Sales': 20, 'Operations': 15, 'Support': 12,
+    'Marketing': 10, 'Finance': 5, 'HR': 3,
+}
+PRIORITIES = {'low': 30, 'medium': 50, 'high': 20}
+LEAVE_DAYS = {1: 35, 2: 25, 3: 20, 5: 15, 10: 5}
+LEAVE_REASONS = ('Vacation', 'Sick leave', 'Family event', 'Medical appointment', 'Personal')
+CHECKLIST_ITEMS = ('Draft', 'Review', 'Implement', 'Test', 'Document', 'Deploy', 'Sign-off')
+
+SEEDED_MODELS = (
+    User, Employee, Attendance, AttendanceMonthlySummary, Leave, LeaveBalance,
+    Project, Project.members.through, Task,
+)
+
+
+def _choice(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _aware(day, rng):
+    moment = datetime.combine(day, time(8)) + timedelta(minutes=rng.randrange(10 * 60))
+    return timezone.make_aware(moment, timezone.utc)
+
+
+# Inserts `rows` of (unsaved instance, field overrides) into the collection of
+# `model`, assigning auto-increment ids from djongo's counter first.
+# Returns the instances with their pk set.
+def _insert(model, rows):
+    if not rows:
+        return []
+    if model._meta.pk.column != '_id':
+        first = allocate_ids(model, len(rows))
+        for offset, (instance, _) in enumerate(rows):
+            instance.pk = first + offset
+    get_collection(model).insert_many([to_document(instance, **values) for instance, values in rows])
+    return [instance for instance, _ in rows]
+
+
+def _weekdays(start, end):
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            yield day
+        day += timedelta(days=1)
+
+
+def flush():
+    for model in SEEDED_MODELS:
+        get_collection(model).delete_many({})
+
+
+def seed(employees=200, days=60, projects=25, tasks_per_project=20, seed=42):
+    rng = random.Random(seed)
+    today = date.today()
+    first_day = today - timedelta(days=days)
+
+    # Users and employees. Usernames double as employee ids, like registration does.
+    password = make_password(None)
+    admins = max(1, employees // 25)
+    user_rows, staff = [], []
+    for number in range(employees):
+        username = f'bench{number:05d}'
+        joined = _aware(today - timedelta(days=rng.randrange(days, days + 365)), rng)
+        user_rows.append((User(username=username, email=f'{username}@example.com', password=password),
+                          {'date_joined': joined}))
+        staff.append((username, joined, 'admin' if number < admins else 'employee', _choice(rng, DEPARTMENTS)))
+    users = _insert(User, user_rows)
+    people = _insert(Employee, [
+        (Employee(user=user, employee_id=username.upper(), name=f'Employee {username[5:]}',
+                  email=user.email, department=department, role=role), {'created_at': joined})
+        for user, (username, joined, role, department) in zip(users, staff)
+    ])
+    by_department = {}
+    for person in people:
+        by_department.setdefault(person.department, []).append(person)
+    admin_people = [person for person in people if person.role == 'admin']
+
+    # Leaves: up to four requests per employee, one to ten days long, spread
+    # over the attendance window and the next month, never overlapping.
+    leave_rows, on_leave = [], set()
+    for person in people:
+        cursor = first_day + timedelta(days=rng.randrange(0, 20))
+        for _ in range(rng.choices((0, 1, 2, 3, 4), weights=(25, 35, 25, 10, 5))[0]):
+            length = _choice(rng, LEAVE_DAYS)
+            start = cursor + timedelta(days=rng.randrange(0, 25))
+            end = start + timedelta(days=length - 1)
+            if start > today + timedelta(days=30):
+                break
+            if end < today:
+                status = rng.choices(('Approved', 'Rejected'), weights=(80, 20))[0]
+            else:
+                status = rng.choices(('Pending', 'Approved', 'Rejected'), weights=(60, 30, 10))[0]
+            if status == 'Approved':
+                on_leave.update((person.pk, start + timedelta(days=n)) for n in range(length))
+            leave_rows.append((
+                Leave(employee=person, start_date=start, end_date=end,
+                      reason=rng.choice(LEAVE_REASONS), status=status),
+                {'applied_on': _aware(start - timedelta(days=rng.randrange(1, 21)), rng)},
+            ))
+            cursor = end + timedelta(days=1)
+    for instance, _ in leave_rows:
+        instance._id = ObjectId()
+    _insert(Leave, leave_rows)
+
+    # Weekday attendance up to yesterday (today is left for the check-in
+    # scenario). Each employee has their own reliability; a few days go unmarked.
+    attendance_rows = []
+    for person in people:
+        reliability = rng.betavariate(18, 1.5)
+        for day in _weekdays(first_day, today - timedelta(days=1)):
+            if (person.pk, day) in on_leave or rng.random() < 0.04:
+                continue
+            status = 'Present' if rng.random() < reliability else 'Absent'
+            attendance_rows.append((Attendance(employee=person, date=day, status=status), {}))
+    _insert(Attendance, attendance_rows)
+
+    # Projects with members mostly from one department, and their tasks.
+    project_rows, started, memberships, task_rows = [], [], [], []
+    for number in range(projects):
+        created = today - timedelta(days=rng.randrange(7, 180))
+        deadline = created + timedelta(days=rng.randrange(30, 120))
+        if deadline < today:
+            status = rng.choices(('completed', 'in_progress'), weights=(70, 30))[0]
+        else:
+            status = rng.choices(('pending', 'in_progress'), weights=(30, 70))[0]
+        home = by_department[_choice(rng, {name: weight for name, weight in DEPARTMENTS.items()
+                                           if name in by_department})]
+        members = rng.sample(home, min(len(home), rng.randrange(3, 12)))
+        outsiders = [person for person in people if person.department != home[0].department]
+        members += rng.sample(outsiders, min(len(outsiders), rng.randrange(0, 3)))
+        project = Project(title=f'Project {number + 1:03d}', description='Benchmark project',
+                          deadline=deadline, status=status)
+        project_rows.append((project, {'created_at': _aware(created, rng), 'updated_at': _aware(created, rng)}))
+        started.append(created)
+        memberships.append(members)
+
+    projects_saved = _insert(Project, project_rows)
+    Membership = Project.members.through
+    _insert(Membership, [
+        (Membership(project=project, employee=member), {})
+        for project, members in zip(projects_saved, memberships)
+        for member in members
+    ])
+
+    # Tasks are created over the project's life so far and due within a month
+    # (never after the project deadline).
+    for project, created_on, members in zip(projects_saved, started, memberships):
+        for number in range(max(1, round(rng.gauss(tasks_per_project, tasks_per_project / 4)))):
+            created = created_on + timedelta(days=rng.randrange(max(1, (min(today, project.deadline) - created_on).days)))
+            deadline = min(created + timedelta(days=rng.randrange(3, 31)), project.deadline)
+            if deadline < today:
+                status = rng.choices(('completed', 'overdue'), weights=(75, 25))[0]
+            else:
+                status = rng.choices(('pending', 'in_progress', 'completed'), weights=(50, 40, 10))[0]
+            checklist = [
+                {'text': item, 'completed': status == 'completed' or rng.random() < 0.4}
+                for item in rng.sample(CHECKLIST_ITEMS, rng.randrange(0, 6))
+            ]
+            task_rows.append((
+                Task(title=f'{project.title} / task {number + 1}', description='Benchmark task',
+                     assigned_to=rng.choice(members), assigned_by=rng.choice(admin_people), project=project,
+                     priority=_choice(rng, PRIORITIES), deadline=deadline, status=status, checklist=checklist,
+                     completion_notes='Done' if status == 'completed' else None),
+                {'created_at': _aware(created, rng), 'updated_at': _aware(created, rng)},
+            ))
+    _insert(Task, task_rows)
+
+    rebuild_rollups()
+    rebuild_balances()
+    for model in (Employee, Attendance, Leave, Project, Task):
+        bump_version(model._meta.model_name)
+
+    return {
+        'employees': len(people),
+        'admins': len(admin_people),
+        'attendance': len(attendance_rows),
+        'leaves': len(leave_rows),
+        'projects': len(projects_saved),
+        'memberships': sum(len(members) for members in memberships),
+        'tasks': len(task_rows),
+    }
+
+
+def seed_from_options(options):
+    return seed(employees=options['employees'], days=options['days'], projects=options['projects'],
+                tasks_per_project=options['tasks_per_project'], seed=options['seed'])
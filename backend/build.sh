@@ -9,3 +9,6 @@ python manage.py collectstatic --no-input
 
 # Apply any outstanding database migrations
 python manage.py migrate
+
+# Create the MongoDB indexes the queries rely on (idempotent)
+python manage.py ensure_indexes
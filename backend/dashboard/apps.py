@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    # App configuration for 'dashboard' (aggregated, read-only summaries).
+    name = 'dashboard'
@@ -0,0 +1,140 @@
+from django.utils import timezone
+
+from attendance.models import Attendance
+from employees.models import Employee
+from tasks.models import Project, Task
+from hrms_core.mongo import get_collection, to_mongo_date
+
+# Number of tasks returned in the "Recent Tasks" panel.
+RECENT_TASKS_LIMIT = 5
+
+
+# Builds the dashboard summary for one employee.
+# Every figure is computed inside MongoDB with an aggregation pipeline or an
+# indexed find, so the cost is a handful of small queries no matter how many
+# tasks, projects or employees exist.
+# Scoping mirrors the viewsets: admins see everything, employees only see
+# the tasks assigned to them, the projects they are members of and their own
+# attendance.
+# Unlike the other reports it is read from the primary: the view caches it under
+# the current version counters (dashboard/views.py), and a secondary lagging
+# behind the write that bumped them would pin stale figures to the new key.
+def build_summary(employee):
+    today = to_mongo_date(timezone.localdate())
+    is_admin = employee.role == 'admin'
+
+    if is_admin:
+        task_match = {}
+        project_match = {}
+    else:
+        task_match = {'assigned_to_id': employee.pk}
+        membership = get_collection(Project.members.through).find(
+            {'employee_id': employee.pk}, {'project_id': 1, '_id': 0}
+        )
+        project_match = {'id': {'$in': [row['project_id'] for row in membership]}}
+
+    return {
+        'scope': 'all' if is_admin else 'self',
+        'date': today.date().isoformat(),
+        'tasks': _task_counts(task_match, today),
+        'projects': _project_counts(project_match),
+        'employees': _headcount(),
+        'attendance_today': _attendance_today(employee, is_admin, today),
+        'recent_tasks': _recent_tasks(task_match),
+    }
+
+
+def _task_counts(match, today):
+    by_status = {key: 0 for key, _ in Task.STATUS_CHOICES}
+    past_deadline = 0
+    pipeline = [
+        {'$match': match},
+        {'$group': {
+            '_id': '$status',
+            'count': {'$sum': 1},
+            # A task is overdue once its deadline has passed and it is not done,
+            # whether or not its status has been switched to 'overdue' yet.
+            'past_deadline': {'$sum': {'$cond': [
+                {'$and': [{'$lt': ['$deadline', today]}, {'$ne': ['$status', 'completed']}]},
+                1, 0,
+            ]}},
+        }},
+    ]
+    for row in get_collection(Task).aggregate(pipeline):
+        by_status[row['_id']] = row['count']
+        past_deadline += row['past_deadline']
+
+    return {
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+        'overdue': past_deadline,
+    }
+
+
+def _project_counts(match):
+    by_status = {key: 0 for key, _ in Project.STATUS_CHOICES}
+    pipeline = [
+        {'$match': match},
+        {'$group': {'_id': '$status', 'count': {'$sum': 1}}},
+    ]
+    for row in get_collection(Project).aggregate(pipeline):
+        by_status[row['_id']] = row['count']
+    return {'total': sum(by_status.values()), 'by_status': by_status}
+
+
+def _headcount():
+    pipeline = [
+        {'$group': {'_id': '$department', 'count': {'$sum': 1}}},
+        {'$sort': {'_id': 1}},
+    ]
+    by_department = {
+        row['_id']: row['count'] for row in get_collection(Employee).aggregate(pipeline)
+    }
+    return {'total': sum(by_department.values()), 'by_department': by_department}
+
+
+def _attendance_today(employee, is_admin, today):
+    collection = get_collection(Attendance)
+    if not is_admin:
+        record = collection.find_one(
+            {'employee_id': employee.pk, 'date': today}, {'status': 1, '_id': 0}
+        )
+        return {'status': record['status'] if record else None}
+
+    by_status = {key: 0 for key, _ in Attendance.STATUS_CHOICES}
+    pipeline = [
+        {'$match': {'date': today}},
+        {'$group': {'_id': '$status', 'count': {'$sum': 1}}},
+    ]
+    for row in collection.aggregate(pipeline):
+        by_status[row['_id']] = row['count']
+    return {'marked': sum(by_status.values()), 'by_status': by_status}
+
+
+def _recent_tasks(match):
+    projection = {'id': 1, 'title': 1, 'status': 1, 'priority': 1, 'deadline': 1, 'project_id': 1, '_id': 0}
+    tasks = list(
+        get_collection(Task).find(match, projection)
+        .sort('created_at', -1)
+        .limit(RECENT_TASKS_LIMIT)
+    )
+
+    # Resolve all project titles with one query instead of one per task.
+    project_ids = list({task['project_id'] for task in tasks})
+    titles = {
+        row['id']: row['title']
+        for row in get_collection(Project).find({'id': {'$in': project_ids}}, {'id': 1, 'title': 1, '_id': 0})
+    }
+
+    return [
+        {
+            'id': task['id'],
+            'title': task['title'],
+            'status': task['status'],
+            'priority': task['priority'],
+            'deadline': task['deadline'].date().isoformat() if task.get('deadline') else None,
+            'project': task['project_id'],
+            'project_title': titles.get(task['project_id']),
+        }
+        for task in tasks
+    ]
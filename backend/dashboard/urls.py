@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import DashboardSummaryView
+
+urlpatterns = [
+    # GET /api/dashboard/summary/ (counts for the dashboard page)
+    path('dashboard/summary/', DashboardSummaryView.as_view(), name='dashboard_summary'),
+]
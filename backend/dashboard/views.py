@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import permissions
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from hrms_core.cache import get_versions, versioned_key
+from .summary import build_summary
+
+# The summary depends on these models; a write to any of them bumps its version
+# (see hrms_core/signals.py) and makes cached summaries stale immediately.
+SUMMARY_DEPENDENCIES = ('employee', 'attendance', 'project', 'task')
+
+
+class DashboardSummaryView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            employee = request.user.employee
+        except AttributeError:
+            raise PermissionDenied("User is not linked to an Employee profile.")
+
+        # Admins all share one cached summary; employees each get their own.
+        scope = 'admin' if employee.role == 'admin' else f'employee{employee.pk}'
+        key = versioned_key(
+            'dashboard',
+            get_versions(*SUMMARY_DEPENDENCIES),
+            scope,
+            timezone.localdate().isoformat(),
+        )
+
+        summary = cache.get(key)
+        if summary is None:
+            summary = build_summary(employee)
+            cache.set(key, summary, settings.DASHBOARD_CACHE_TTL)
+        return Response(summary)
@@ -0,0 +1,223 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+from .models import Employee
+
+# ---------------------------------------------------------------------------
+# Employee directory: a read-through cache of Employee rows.
+#
+# Almost every response names employees (attendance rows show an employee_id,
+# tasks the assignee's name, leaves both), and writes resolve employee_id slugs
+# and pks, while the employees themselves rarely change. Rows are cached by pk,
+# with a second key mapping employee_id to pk, in the 'directory' cache
+# (DIRECTORY_CACHE_URL: local memory by default, or a shared backend such as
+# Redis or Memcached so that all workers see each other's invalidations).
+#
+# Saves and deletes of an Employee drop its entries (connected in
+# hrms_core/signals.py); DIRECTORY_CACHE_TTL bounds how stale a process-local
+# cache can get when another worker made the change. Only field values are
+# cached: every lookup returns fresh instances.
+# ---------------------------------------------------------------------------
+
+PK_KEY = 'hrms:directory:pk:{}'
+SLUG_KEY = 'hrms:directory:slug:{}'
+DEPARTMENT_KEY = 'directory:department'
+
+
+def _cache():
+    return caches['directory']
+
+
+def _fields():
+    return Employee._meta.concrete_fields
+
+
+def _snapshot(employee):
+    return tuple(getattr(employee, field.attname) for field in _fields())
+
+
+def _restore(values):
+    return Employee.from_db('default', [field.attname for field in _fields()], list(values))
+
+
+def remember(employees):
+    entries = {}
+    for employee in employees:
+        entries[PK_KEY.format(employee.pk)] = _snapshot(employee)
+        entries[SLUG_KEY.format(employee.employee_id)] = employee.pk
+    if entries:
+        _cache().set_many(entries, timeout=settings.DIRECTORY_CACHE_TTL)
+
+
+# {pk: Employee} for the given pks; unknown pks are left out. Misses are
+# loaded with one query.
+def get_employees(pks):
+    pks = {pk for pk in pks if pk is not None}
+    if not pks:
+        return {}
+    keys = {PK_KEY.format(pk): pk for pk in pks}
+    found = _cache().get_many(keys.keys())
+    employees = {keys[key]: _restore(values) for key, values in found.items()}
+    missing = pks - employees.keys()
+    if missing:
+        loaded = Employee.objects.in_bulk(missing)
+        remember(loaded.values())
+        employees.update(loaded)
+    return employees
+
+
+def get_employee(pk):
+    return get_employees([pk]).get(pk)
+
+
+# {employee_id: Employee} for the given employee_id slugs; unknown ones are
+# left out.
+def get_employees_by_employee_id(employee_ids):
+    employee_ids = set(employee_ids)
+    if not employee_ids:
+        return {}
+    keys = {SLUG_KEY.format(employee_id): employee_id for employee_id in employee_ids}
+    pks = {keys[key]: pk for key, pk in _cache().get_many(keys.keys()).items()}
+    employees = {}
+    for employee in get_employees(pks.values()).values():
+        # A renamed employee leaves its old slug key behind: check it still matches.
+        if pks.get(employee.employee_id) == employee.pk:
+            employees[employee.employee_id] = employee
+    missing = employee_ids - employees.keys()
+    if missing:
+        loaded = list(Employee.objects.filter(employee_id__in=missing))
+        remember(loaded)
+        employees.update((employee.employee_id, employee) for employee in loaded)
+    return employees
+
+
+def get_employee_by_employee_id(employee_id):
+    return get_employees_by_employee_id([employee_id]).get(employee_id)
+
+
+# The employees of a department, ordered by name. The member pks are cached
+# under the 'employee' version counter (hrms_core/cache.py), which every
+# Employee write bumps, so a department change shows up at once.
+def get_department_members(department):
+    from hrms_core.cache import get_versions, versioned_key
+
+    digest = hashlib.blake2b(department.encode(), digest_size=12).hexdigest()
+    key = versioned_key(DEPARTMENT_KEY, get_versions('employee'), digest)
+    pks = _cache().get(key)
+    if pks is None:
+        members = list(Employee.objects.filter(department=department).order_by('name', 'employee_id'))
+        remember(members)
+        _cache().set(key, [employee.pk for employee in members], timeout=settings.DIRECTORY_CACHE_TTL)
+        return members
+    employees = get_employees(pks)
+    return [employees[pk] for pk in pks if pk in employees]
+
+
+# Plants the employees referenced by the `relations` foreign keys of each
+# instance in its relation cache, so `task.assigned_to` costs no query.
+# Instances that already have the relation loaded are left alone.
+def attach_employees(instances, relations):
+    if not instances or not relations:
+        return
+    model = type(instances[0])
+    fields = [model._meta.get_field(name) for name in relations]
+    pending = [(obj, field) for obj in instances for field in fields if not field.is_cached(obj)]
+    employees = get_employees(getattr(obj, field.attname) for obj, field in pending)
+    for obj, field in pending:
+        pk = getattr(obj, field.attname)
+        if pk in employees:
+            field.set_cached_value(obj, employees[pk])
+
+
+# Signal receiver (connected in hrms_core/signals.py).
+def invalidate(sender, instance, **kwargs):
+    _cache().delete_many([PK_KEY.format(instance.pk), SLUG_KEY.format(instance.employee_id)])
+
+
+def clear():
+    _cache().clear()
+
+
+# ---------------------------------------------------------------------------
+# Serializer fields reading and resolving employees through the directory.
+# ---------------------------------------------------------------------------
+
+
+# Resolves the employee behind the first step of the field's source (a foreign
+# key to Employee) from the directory instead of the related object descriptor.
+class DirectoryFieldMixin:
+    def get_attribute(self, instance):
+        field = instance._meta.get_field(self.source_attrs[0])
+        if field.is_cached(instance):
+            value = field.get_cached_value(instance)
+        else:
+            value = get_employee(getattr(instance, field.attname))
+        for attr in self.source_attrs[1:]:
+            if value is None:
+                break
+            value = getattr(value, attr)
+        return value
+
+
+# ReadOnlyField(source='employee.name') without the query.
+class EmployeeReadOnlyField(DirectoryFieldMixin, serializers.ReadOnlyField):
+    pass
+
+
+# SlugRelatedField(slug_field='employee_id') over the directory.
+class EmployeeSlugRelatedField(DirectoryFieldMixin, serializers.SlugRelatedField):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'employee_id')
+        if not kwargs.get('read_only'):
+            kwargs.setdefault('queryset', Employee.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        employee = get_employee_by_employee_id(data)
+        if employee is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return employee
+
+
+# PrimaryKeyRelatedField to Employee over the directory (writes only: reads
+# already use the raw foreign key value).
+class EmployeePrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    def __init__(self, **kwargs):
+        if not kwargs.get('read_only'):
+            kwargs.setdefault('queryset', Employee.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            pk = self.queryset.model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        employee = get_employee(pk)
+        if employee is None:
+            self.fail('does_not_exist', pk_value=data)
+        return employee
+
+
+# List serializer that loads the employees of a whole page from the directory
+# (one cache round trip, plus one query for the misses) before the rows are
+# rendered.
+class DirectoryListSerializer(serializers.ListSerializer):
+    # Also called by a parent list serializer nesting this one, with the rows
+    # of every parent at once (e.g. the tasks of all the projects of a page).
+    def load_employees(self, instances):
+        relations = {
+            field.source_attrs[0] for field in self.child.fields.values()
+            if isinstance(field, DirectoryFieldMixin)
+        }
+        attach_employees(instances, relations)
+
+    def to_representation(self, data):
+        instances = list(data.all() if hasattr(data, 'all') else data)
+        self.load_employees(instances)
+        return super().to_representation(instances)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Employee, generate_employee_id
 from django.contrib.auth.models import User
+from hrms_core.sparse import SparseFieldsSerializerMixin
 
 # Serializers convert complex data (like model instances) into native Python data types 
 # that can then be easily rendered into JSON, XML or other content types.
@@ -64,7 +65,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 # Serializer for the Employee model itself.
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Employee
         # '__all__' means we expose every field in the model to the API.
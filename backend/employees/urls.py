@@ -1,11 +1,19 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .serializers import UserSerializer
 from .views import EmployeeViewSet, MeView
 
 router = DefaultRouter()
 router.register(r'employees', EmployeeViewSet)
 
+me_view = MeView.as_view()
+if settings.ASYNC_READS:
+    from hrms_core.async_reads import async_me_view
+
+    me_view = async_me_view(me_view, UserSerializer)
+
 urlpatterns = [
-    path('me/', MeView.as_view(), name='me'),
+    path('me/', me_view, name='me'),
     path('', include(router.urls)),
 ]
@@ -4,6 +4,9 @@ from .models import Employee
 from .serializers import EmployeeSerializer, RegisterSerializer, UserSerializer
 from django.contrib.auth.models import User
 from rest_framework.views import APIView
+from hrms_core.conditional import ConditionalGetMixin
+from hrms_core.filters import Filter, FilterMixin, PrefixFilter
+from hrms_core.sparse import SparseFieldsMixin
 
 # RegisterView handles the user registration logic.
 # It uses generics.CreateAPIView, which comes with pre-built logic for handling POST requests to create resources.
@@ -20,10 +23,19 @@ class RegisterView(generics.CreateAPIView):
 
 # EmployeeViewSet handles CRUD operations (Create, Retrieve, Update, Delete) for Employees.
 # ModelViewSet automatically provides list, create, retrieve, update, and destroy actions.
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(ConditionalGetMixin, SparseFieldsMixin, FilterMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all().order_by('-created_at')
     serializer_class = EmployeeSerializer
     lookup_field = 'employee_id'
+    # Conditional GET on list/retrieve (see hrms_core/conditional.py).
+    etag_dependencies = ('employee',)
+    # GET /api/employees/?department=&search=&ordering= (hrms_core/filters.py);
+    # search is a prefix match on the name or the employee_id.
+    filterset = {
+        'department': Filter('department'),
+        'search': PrefixFilter(('name', 'employee_id')),
+    }
+    ordering_fields = ('created_at', 'name')
 
 class MeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -0,0 +1,24 @@
+# gunicorn configuration, read automatically when gunicorn starts in this
+# directory. Command-line flags (e.g. --bind in the Dockerfile) take precedence.
+#
+# WEB_CONCURRENCY and WEB_THREADS also size each worker's MongoDB connection
+# pool (see MONGO_MAX_POOL_SIZE in hrms_core/settings.py), so set them here
+# rather than with --workers / --threads.
+import os
+
+# One worker unless the default cache is shared (CACHE_URL, see CACHES in
+# hrms_core/settings.py): workers with local-memory caches answer from their own
+# copies, and the change feed only publishes in-process with a single worker.
+workers = int(os.environ.get('WEB_CONCURRENCY', 2 if os.environ.get('CACHE_URL') else 1))
+threads = int(os.environ.get('WEB_THREADS', 1))
+
+# Load the application once in the master and fork it into the workers: faster
+# restarts and shared memory. The MongoDB clients and background job threads
+# are rebuilt in each worker by post_fork below.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() in ('1', 'true', 'yes')
+
+
+def post_fork(server, worker):
+    from hrms_core.mongo_client import after_fork
+
+    after_fork()
@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+
+
+class HrmsCoreConfig(AppConfig):
+    # Project-wide plumbing (cache versioning, shared helpers).
+    # Registered as an app so that signal handlers are connected at startup.
+    name = 'hrms_core'
+
+    def ready(self):
+        from django.conf import settings
+
+        from .signals import connect_signals
+        connect_signals()
+
+        if settings.MONGO_POOL_METRICS:
+            from .mongo_client import install as install_pool_metrics
+            install_pool_metrics()
+
+        if settings.PERF_PROFILING:
+            from .profiling import install
+            install()
@@ -9,12 +9,37 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 # Set the default settings module for the 'asgi' application.
 # ASGI is the asynchronous version of WSGI, allowing for things like WebSockets.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hrms_core.settings')
 
+# Under ASGI the read endpoints are served by the async (motor) views in
+# hrms_core/async_reads.py. Set ASYNC_READS=false to use the sync viewsets only.
+os.environ.setdefault('ASYNC_READS', 'true')
+
+# Leaves the sync-only WhiteNoise middleware out of MIDDLEWARE (settings.py);
+# static files are served by hrms_core/static_files.py below instead.
+os.environ['SERVER_MODE'] = 'asgi'
+
 # Get the ASGI application.
 # This 'application' object is what an ASGI server (like Uvicorn or Daphne) talks to.
-application = get_asgi_application()
+# Django's own handler, except that streaming responses (exports) are produced
+# off the event loop (hrms_core/handlers.py).
+django.setup(set_prefix=False)
+from hrms_core.handlers import StreamingASGIHandler  # noqa: E402
+application = StreamingASGIHandler()
+
+# The change feed (GET /api/changes/, hrms_core/changefeed.py) streams for as
+# long as the client stays, so it is served beside Django rather than through it.
+from hrms_core.changefeed import asgi_router  # noqa: E402
+application = asgi_router(application)
+
+# Static files (collectstatic output), read off the event loop.
+from hrms_core.static_files import asgi_static  # noqa: E402
+application = asgi_static(application)
+
+# Periodic maintenance jobs (hrms_core/jobs.py), e.g. the overdue-task sweeper.
+from hrms_core.jobs import start_periodic_jobs  # noqa: E402
+start_periodic_jobs()
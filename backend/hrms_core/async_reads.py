@@ -0,0 +1,206 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import path, re_path
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .authentication import CachedJWTAuthentication
+
+# ---------------------------------------------------------------------------
+# Async read path (ASGI deployments only, enabled by ASYNC_READS).
+#
+# Under uvicorn, GET list/retrieve requests for attendance, leaves and tasks,
+# and GET /api/me/, are served by async views that talk to MongoDB through
+# motor. While a query is in flight the event loop serves other requests, so
+# one worker process holds hundreds of concurrent reads instead of blocking a
+# thread per request. The views reuse the viewsets' role scoping, repositories,
+# pagination and serializers, so responses are identical to the sync path.
+#
+# Every other method (POST/PUT/PATCH/DELETE) and every extra action is handed to
+# the regular DRF viewset.
+# ---------------------------------------------------------------------------
+
+_client = None
+
+
+# One motor client per process; its connection pool is shared by every request.
+def get_async_client():
+    global _client
+    if _client is None:
+        # motor is only needed in ASGI mode, so it is imported lazily.
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        # The sync client's options (timeouts, compression), with a pool sized
+        # for the concurrent requests of an event loop rather than for threads.
+        options = dict(settings.DATABASES['default'].get('CLIENT', {}))
+        options['maxPoolSize'] = settings.ASYNC_MONGO_POOL_SIZE
+        options['minPoolSize'] = min(options.get('minPoolSize', 0), settings.ASYNC_MONGO_POOL_SIZE)
+        _client = AsyncIOMotorClient(**options)
+    return _client
+
+
+def get_async_collection(model):
+    return get_async_client()[settings.DATABASES['default']['NAME']][model._meta.db_table]
+
+
+# Runs a MongoQuery (hrms_core/mongo.py) with motor and returns model
+# instances, using the repository's projection, hydration and relation loading.
+async def fetch(query):
+    repository = query.repository
+    model = repository.model
+    cursor = get_async_collection(model).find(
+        query.filter, repository.projection(model, query.fields), sort=query.sort_spec()
+    )
+    if query.start:
+        cursor = cursor.skip(query.start)
+    if query.stop is not None:
+        cursor = cursor.limit(max(query.stop - query.start, 0))
+    instances = [repository.hydrate(model, doc, query.fields) for doc in await cursor.to_list(length=None)]
+
+    # The directory loads its misses through the ORM, which must not run here.
+    if repository.directory_related:
+        await sync_to_async(repository.attach_directory)(instances, query.fields)
+
+    for related_model, fields, related_filter in repository.related_lookups(instances, query.fields):
+        related_cursor = get_async_collection(related_model).find(
+            related_filter, repository.projection(related_model)
+        )
+        repository.attach_related(instances, related_model, fields, await related_cursor.to_list(length=None))
+    return instances
+
+
+def _json(data, status_code=status.HTTP_200_OK):
+    # The first configured renderer: JSONRenderer, or ORJSONRenderer with API_FAST_JSON.
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(renderer.render(data), status=status_code, content_type='application/json')
+
+
+# Authenticates the request with the same JWT + cached principal lookup as the
+# sync API. Returns a DRF Request with .user set, or an error response.
+async def _authenticate(request):
+    drf_request = Request(request)
+    try:
+        result = await sync_to_async(CachedJWTAuthentication().authenticate)(drf_request)
+    except APIException as exc:
+        return None, _json({'detail': exc.detail}, exc.status_code)
+    if result is None:
+        return None, _json(
+            {'detail': 'Authentication credentials were not provided.'}, status.HTTP_401_UNAUTHORIZED
+        )
+    drf_request.user, drf_request.auth = result
+    return drf_request, None
+
+
+def _async_view(viewset_class, basename, detail):
+    if detail:
+        actions = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+    else:
+        actions = {'get': 'list', 'post': 'create'}
+    sync_view = viewset_class.as_view(actions, basename=basename, detail=detail)
+    run_sync_view = sync_to_async(sync_view)
+
+    async def view(request, **kwargs):
+        if request.method != 'GET':
+            return await run_sync_view(request, **kwargs)
+
+        drf_request, error = await _authenticate(request)
+        if error is not None:
+            return error
+
+        viewset = viewset_class(
+            request=drf_request, args=(), kwargs=kwargs, format_kwarg=None,
+            action=actions['get'], basename=basename, detail=detail,
+        )
+        mongo_filter = viewset.get_mongo_filter() if viewset.use_mongo_reads() else None
+        if mongo_filter is None:
+            return await run_sync_view(request, **kwargs)
+
+        # Conditional GET (hrms_core/conditional.py): answered from the version
+        # counters before any query runs. They are read with the sync client.
+        validators = None
+        if hasattr(viewset, 'get_validators'):
+            validators = await sync_to_async(viewset.get_validators)()
+            if viewset.is_not_modified(request, validators):
+                return viewset.set_validators(HttpResponse(status=status.HTTP_304_NOT_MODIFIED), validators)
+
+        response = await _read(viewset, drf_request, mongo_filter, detail, kwargs)
+        if validators is not None and response.status_code == status.HTTP_200_OK:
+            viewset.set_validators(response, validators)
+        return response
+
+    # DRF views are CSRF-exempt (they use token auth); keep that for the
+    # requests we hand over to the sync viewset.
+    view.csrf_exempt = True
+    return view
+
+
+# Runs the list or retrieve query for an async GET and renders the response.
+async def _read(viewset, drf_request, mongo_filter, detail, kwargs):
+    if detail:
+        ordering = viewset.get_queryset().query.order_by
+    else:
+        # List filters may look up employees: resolve them off the event loop.
+        try:
+            mongo_filter = await sync_to_async(viewset.filter_mongo)(mongo_filter)
+        except APIException as exc:
+            return _json(exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail},
+                         exc.status_code)
+        ordering = viewset.get_list_ordering()
+    query = viewset.repository_class().query(mongo_filter, ordering, fields=viewset.get_sparse_fields())
+
+    if detail:
+        pk_field = query.model._meta.pk
+        try:
+            pk = pk_field.to_python(kwargs['pk'])
+        except Exception:
+            return _json({'detail': 'Not found.'}, status.HTTP_404_NOT_FOUND)
+        query.filter = {'$and': [mongo_filter, {pk_field.column: pk}]}
+        instances = await fetch(query[:1])
+        if not instances:
+            return _json({'detail': 'Not found.'}, status.HTTP_404_NOT_FOUND)
+        return _json(viewset.get_serializer(instances[0]).data)
+
+    paginator = viewset.paginator
+    if paginator is not None and paginator.is_enabled(drf_request):
+        try:
+            page_query = paginator.get_page_query(query, drf_request)
+        except APIException as exc:
+            return _json({'detail': exc.detail}, exc.status_code)
+        page = paginator.set_page(await fetch(page_query))
+        return _json(paginator.get_paginated_response(viewset.get_serializer(page, many=True).data).data)
+
+    return _json(viewset.get_serializer(await fetch(query), many=True).data)
+
+
+# URL patterns for the list and detail routes of a viewset, served by the async
+# views above. Include them *before* the router so they take precedence.
+# `pk_pattern` must not match the extra action names (e.g. 'bulk', 'export').
+def async_read_urls(prefix, viewset_class, basename, pk_pattern=r'\d+'):
+    return [
+        path(f'{prefix}/', _async_view(viewset_class, basename, detail=False), name=f'{basename}-list'),
+        re_path(
+            rf'^{prefix}/(?P<pk>{pk_pattern})/$',
+            _async_view(viewset_class, basename, detail=True),
+            name=f'{basename}-detail',
+        ),
+    ]
+
+
+# Async GET /api/me/: the principal cache already holds the Employee profile,
+# so on a warm cache this never touches the database.
+def async_me_view(sync_view, serializer_class):
+    run_sync_view = sync_to_async(sync_view)
+
+    async def view(request):
+        if request.method != 'GET':
+            return await run_sync_view(request)
+        drf_request, error = await _authenticate(request)
+        if error is not None:
+            return error
+        return _json(serializer_class(drf_request.user).data)
+
+    view.csrf_exempt = True
+    return view
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from employees.models import Employee
+
+
+# A small thread-safe LRU cache whose entries expire after `ttl` seconds.
+# It is process-local: each gunicorn worker keeps its own copy, and signal-based
+# invalidation only reaches the worker that performed the write. The TTL bounds
+# how long other workers can serve a stale role or department.
+class TTLCache:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# user pk -> (user field values, employee field values or None)
+principal_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL)
+
+
+def _snapshot(instance):
+    return tuple(getattr(instance, field.attname) for field in instance._meta.concrete_fields)
+
+
+def _restore(model, values):
+    return model.from_db('default', [field.attname for field in model._meta.concrete_fields], list(values))
+
+
+# JWTAuthentication that resolves the User *and* its Employee profile from a
+# process-local cache, so the viewsets' `request.user.employee.role` checks cost
+# no database round trips on a warm cache.
+#
+# Only plain field values are cached; every request gets fresh model instances,
+# so nothing a view does to request.user can leak into another request.
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cached = principal_cache.get(user_id)
+        if cached is None:
+            cached = self._load(user_id)
+            principal_cache.set(user_id, cached)
+
+        user_values, employee_values = cached
+        user = _restore(User, user_values)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        # Plant the profile in the reverse one-to-one cache. A cached None makes
+        # `user.employee` raise RelatedObjectDoesNotExist exactly as before.
+        employee = _restore(Employee, employee_values) if employee_values is not None else None
+        User.employee.related.set_cached_value(user, employee)
+        if employee is not None:
+            Employee.user.field.set_cached_value(employee, user)
+        return user
+
+    def _load(self, user_id):
+        try:
+            user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        employee = Employee.objects.filter(user=user).first()
+        return _snapshot(user), (_snapshot(employee) if employee is not None else None)
+
+
+# Signal receivers (connected in hrms_core/signals.py).
+def invalidate_user(sender, instance, **kwargs):
+    principal_cache.delete(instance.pk)
+
+
+def invalidate_employee(sender, instance, **kwargs):
+    if instance.user_id is not None:
+        principal_cache.delete(instance.user_id)
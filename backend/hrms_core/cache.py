@@ -0,0 +1,82 @@
+from datetime import timezone as dt_timezone
+
+from django.db import connections
+from django.utils import timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+# Version counters let us invalidate whole families of cached values without
+# knowing every key that was written. Each tracked model has a counter that is
+# bumped on writes (see hrms_core/signals.py). Cache keys embed the counters they
+# depend on, so a bump makes the old entries unreachable and they simply expire.
+#
+# The counters live in MongoDB, one document per name in the 'hrms_versions'
+# collection ({_id: name, version, modified}), so that every server worker and
+# the cron-run maintenance commands see the same values: a write anywhere
+# invalidates everywhere. Reading any number of them is one find on _id.
+VERSIONS_COLLECTION = 'hrms_versions'
+
+
+def _versions(using='default'):
+    return connections[using].cursor().db_conn[VERSIONS_COLLECTION]
+
+
+def _epoch(value):
+    # pymongo returns naive UTC datetimes.
+    if timezone.is_naive(value):
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return value.timestamp()
+
+
+# {name: (version, last modification time in epoch seconds)}.
+# A counter never bumped yet is created at version 1, modified now: the first
+# reader fixes the time, so that it does not move from one request to the next.
+def get_counters(*names):
+    collection = _versions()
+    found = {doc['_id']: doc for doc in collection.find({'_id': {'$in': list(names)}})}
+    missing = [name for name in names if name not in found]
+    if missing:
+        now = timezone.now()
+        for name in missing:
+            try:
+                collection.update_one(
+                    {'_id': name}, {'$setOnInsert': {'version': 1, 'modified': now}}, upsert=True,
+                )
+            except DuplicateKeyError:
+                # Created concurrently by another reader.
+                pass
+        found.update((doc['_id'], doc) for doc in collection.find({'_id': {'$in': missing}}))
+    return {name: (found[name]['version'], _epoch(found[name]['modified'])) for name in names}
+
+
+def get_version(name):
+    return get_versions(name)[name]
+
+
+def get_versions(*names):
+    return {name: version for name, (version, _) in get_counters(*names).items()}
+
+
+# Last modification time (epoch seconds) of each named collection.
+def get_modified_times(*names):
+    return {name: modified for name, (_, modified) in get_counters(*names).items()}
+
+
+def bump_version(name):
+    # $max: a worker with a slightly late clock never moves the time backwards.
+    doc = _versions().find_one_and_update(
+        {'_id': name},
+        {'$inc': {'version': 1}, '$max': {'modified': timezone.now()}},
+        projection={'version': 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc['version']
+
+
+# Builds a cache key that changes whenever one of the given versions changes.
+def versioned_key(prefix, versions, *parts):
+    stamp = '.'.join(f'{name}{versions[name]}' for name in sorted(versions))
+    suffix = ':'.join(str(part) for part in parts)
+    return f'hrms:{prefix}:{stamp}:{suffix}'
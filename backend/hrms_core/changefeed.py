@@ -0,0 +1,699 @@
+import asyncio
+import itertools
+import logging
+import threading
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Change feed (ASGI deployments only).
+#
+#   POST /api/changes/ticket/                {"ticket": "..."}: see issue_ticket()
+#   GET /api/changes/?models=task,leave&ticket=...      text/event-stream
+#
+# Pushes the writes to leaves, tasks and attendance to connected clients as
+# Server-Sent Events, so they can patch the lists they already hold instead of
+# refetching them:
+#
+#   event: change
+#   data: {"model": "task", "op": "update", "id": 17, "data": {"status": "done", ...}}
+#
+# "insert" and "replace" carry the full representation (the same serializer as
+# the API), "update" only the fields that changed, "delete" no data. "refresh"
+# ({"model": "task"}) means deltas were missed or cannot be told precisely:
+# refetch that list.
+#
+# Role scoping follows the viewsets: admins see every row, employees the rows
+# they own (employee / assigned_to). A row that leaves an employee's scope
+# (a reassigned task) reaches them as a delete when the previous owner is
+# known, otherwise as a refresh.
+#
+# Sources, per process (CHANGE_FEED_SOURCE):
+#   - MongoDB change streams (replica sets and Atlas): one watcher thread
+#     follows the three collections and so sees the writes of every worker,
+#     cron job and raw pymongo write;
+#   - in-process publishing (standalone servers and local runs): the model
+#     signals, and record_writes() from the raw-write paths, publish to the
+#     subscribers of the same process only. A client would miss every write
+#     handled by another worker, so this mode is only used when the server
+#     runs a single worker (WEB_CONCURRENCY=1); with more, and no change
+#     streams, the feed is unavailable (503).
+# Either way each change is serialized once and fanned out to the connection
+# queues; nothing is done while a process has no subscribers.
+#
+# The endpoint is a plain ASGI application mounted in front of Django
+# (asgi.py): a long-lived stream must not hold a worker thread. Under WSGI the
+# path answers 501.
+# ---------------------------------------------------------------------------
+
+CHANGES_PATH = '/api/changes/'
+
+CHANGE_STREAMS = 'change_streams'
+LOCAL = 'local'
+AUTO = 'auto'
+UNAVAILABLE = 'unavailable'
+
+UNAVAILABLE_DETAIL = (
+    'The change feed needs MongoDB change streams (a replica set) when the server runs more than one worker.'
+)
+
+# feed name -> (model, repository, serializer, field of the owning employee)
+FEEDS = {
+    'attendance': (
+        'attendance.models.Attendance', 'attendance.repository.AttendanceRepository',
+        'attendance.serializers.AttendanceSerializer', 'employee',
+    ),
+    'leave': (
+        'leaves.models.Leave', 'leaves.repository.LeaveRepository',
+        'leaves.serializers.LeaveSerializer', 'employee',
+    ),
+    'task': (
+        'tasks.models.Task', 'tasks.repository.TaskRepository',
+        'tasks.serializers.TaskSerializer', 'assigned_to',
+    ),
+}
+
+# MongoDB error codes: change streams need a replica set; the resume point
+# fell off the oplog; the stream cannot be resumed at all.
+NOT_A_REPLICA_SET = 40573
+HISTORY_LOST = 286
+STREAM_FATAL = 280
+
+# Marks a previous owner that cannot be told (see Change).
+UNKNOWN = object()
+
+
+class Feed:
+    def __init__(self, name, model, repository_class, serializer_class, owner_field):
+        self.name = name
+        self.model = model
+        self.repository = repository_class()
+        self.serializer_class = serializer_class
+        self.owner = model._meta.get_field(owner_field)
+        self._sources = None
+
+    # Model field names each serializer field reads; None for any field.
+    def sources(self):
+        if self._sources is None:
+            model = self.model
+            concrete = {field.name for field in model._meta.concrete_fields}
+            serializer = self.serializer_class()
+            sources = {}
+            for name, field in serializer.fields.items():
+                if field.source == '*':
+                    names = serializer.field_sources.get(name)
+                else:
+                    names = field.source_attrs[:1]
+                names = [model._meta.pk.name if source == 'pk' else source for source in names or ()]
+                sources[name] = set(names) if names and set(names) <= concrete else None
+            self._sources = sources
+        return self._sources
+
+    # The representation of `instance`, or of the fields reading `changed`
+    # (model field names) when given.
+    def represent(self, instance, changed=None):
+        data = self.serializer_class(instance).data
+        if changed is None:
+            return dict(data)
+        keep = {
+            name for name, names in self.sources().items()
+            if names is None or names & changed or name == 'id'
+        }
+        return {name: value for name, value in data.items() if name in keep}
+
+    # Model field names of the changed columns of a change stream update.
+    def fields_of_columns(self, columns):
+        names = {field.column: field.name for field in self.model._meta.concrete_fields}
+        return {names[column] for column in columns if column in names}
+
+
+_feeds = None
+
+
+def get_feeds():
+    global _feeds
+    if _feeds is None:
+        feeds = {}
+        for name, (model, repository, serializer, owner) in FEEDS.items():
+            feeds[name] = Feed(
+                name, import_string(model), import_string(repository), import_string(serializer), owner
+            )
+        _feeds = feeds
+    return _feeds
+
+
+def feed_for_model(model):
+    for feed in get_feeds().values():
+        if feed.model is model:
+            return feed
+    return None
+
+
+def _render(data):
+    # The first configured renderer, as for the API responses.
+    return api_settings.DEFAULT_RENDERER_CLASSES[0]().render(data)
+
+
+_event_ids = itertools.count(1)
+
+
+def _event(kind, data):
+    return b'id: %d\nevent: %s\ndata: %s\n\n' % (next(_event_ids), kind.encode(), _render(data))
+
+
+# One write, rendered at most once per message kind whoever receives it.
+#   owner          - pk of the employee owning the row, None if unknown
+#   previous_owner - the owner before the write; UNKNOWN if it may have changed
+#                    to something that cannot be told
+class Change:
+    def __init__(self, feed, op, pk=None, data=None, owner=None, previous_owner=None):
+        self.feed = feed
+        self.op = op
+        self.pk = pk
+        self.data = data
+        self.owner = owner
+        self.previous_owner = owner if previous_owner is None else previous_owner
+        self._messages = {}
+
+    def _message(self, kind):
+        if kind not in self._messages:
+            if kind == 'refresh':
+                message = _event('refresh', {'model': self.feed})
+            else:
+                payload = {
+                    'model': self.feed,
+                    'op': 'delete' if kind == 'removal' else self.op,
+                    # ObjectId keys (Leave) are strings in the API.
+                    'id': self.pk if isinstance(self.pk, int) else str(self.pk),
+                }
+                if kind == 'change' and self.data is not None:
+                    payload['data'] = self.data
+                message = _event('change', payload)
+            self._messages[kind] = message
+        return self._messages[kind]
+
+    # The message a subscriber gets, or None.
+    def message_for(self, subscriber):
+        if self.feed not in subscriber.models:
+            return None
+        if subscriber.admin:
+            return self._message('change' if self.pk is not None else 'refresh')
+        if self.pk is not None and self.owner is not None and self.owner == subscriber.employee:
+            return self._message('change')
+        if self.owner is None or self.previous_owner is UNKNOWN:
+            return self._message('refresh')
+        if self.pk is not None and self.previous_owner == subscriber.employee:
+            return self._message('removal')
+        return None
+
+
+def refresh(feed):
+    return Change(feed, 'refresh')
+
+
+# One connection. Messages are queued on the connection's event loop from
+# whichever thread publishes them.
+class Subscriber:
+    def __init__(self, loop, models, employee, admin):
+        self.loop = loop
+        self.models = frozenset(models)
+        self.employee = employee
+        self.admin = admin
+        self.queue = asyncio.Queue(maxsize=settings.CHANGE_FEED_QUEUE_SIZE)
+
+    # `message` None ends the stream.
+    def offer(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The loop is closed: the connection is gone.
+            pass
+
+    # A client too slow to keep up loses its backlog and is told to refetch.
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            if message is None:
+                # Nothing else matters once the stream ends.
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(None)
+                return
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            for feed in sorted(self.models):
+                self.queue.put_nowait(refresh(feed)._message('refresh'))
+
+
+class Hub:
+    def __init__(self):
+        # Reentrant: subscribe() may give up on in-process publishing itself.
+        self._lock = threading.RLock()
+        self._subscribers = set()
+        self.mode = None
+        self.watcher = None
+
+    @property
+    def active(self):
+        return bool(self._subscribers)
+
+    # Whether writes of this process must be published by the process itself.
+    @property
+    def publishing_locally(self):
+        return self.mode == LOCAL and bool(self._subscribers)
+
+    # Returns the Subscriber, or None when the process has too many or the
+    # feed is unavailable (see `mode`).
+    def subscribe(self, loop, models, employee, admin):
+        with self._lock:
+            self._start()
+            if self.mode == UNAVAILABLE or len(self._subscribers) >= settings.CHANGE_FEED_MAX_SUBSCRIBERS:
+                return None
+            subscriber = Subscriber(loop, models, employee, admin)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _start(self):
+        if self.mode is not None or self.watcher is not None:
+            return
+        source = settings.CHANGE_FEED_SOURCE
+        if source == LOCAL:
+            self.go_local()
+            return
+        self.watcher = ChangeStreamWatcher(self, fallback=source == AUTO)
+        self.watcher.start()
+
+    # Publishes in-process when this is the only worker; otherwise gives up
+    # and ends the open streams.
+    def go_local(self):
+        if settings.WEB_CONCURRENCY > 1:
+            logger.error(
+                'Change feed disabled: no MongoDB change streams and %d workers (WEB_CONCURRENCY); '
+                'in-process publishing would only reach the clients of the worker handling each write',
+                settings.WEB_CONCURRENCY,
+            )
+            with self._lock:
+                self.mode = UNAVAILABLE
+                subscribers = list(self._subscribers)
+            for subscriber in subscribers:
+                subscriber.offer(None)
+            return False
+        self.mode = LOCAL
+        return True
+
+    def publish(self, change):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            message = change.message_for(subscriber)
+            if message is not None:
+                subscriber.offer(message)
+
+    def refresh_all(self):
+        for feed in get_feeds():
+            self.publish(refresh(feed))
+
+
+hub = Hub()
+
+
+# After a fork (hrms_core.mongo_client.after_fork): the watcher thread and the
+# subscribers belong to the parent.
+def reset_after_fork():
+    global hub
+    hub = Hub()
+
+
+# ---------------------------------------------------------------------------
+# Change streams.
+# ---------------------------------------------------------------------------
+
+def _change_from_stream(event):
+    feed = next(
+        (feed for feed in get_feeds().values() if feed.model._meta.db_table == event['ns']['coll']), None
+    )
+    if feed is None:
+        return None
+    op = event['operationType']
+    pk_column = feed.model._meta.pk.column
+    if op == 'delete':
+        # Only the _id is left: the pk of models keyed by _id (Leave), nothing
+        # about the owner.
+        key = event['documentKey'].get('_id')
+        return Change(feed.name, 'delete', pk=key if pk_column == '_id' else None)
+
+    doc = event.get('fullDocument')
+    if doc is None:
+        # Deleted before the lookup; its delete event follows.
+        return None
+    instance = feed.repository.hydrate(feed.model, doc)
+    feed.repository.load_related([instance])
+    owner = getattr(instance, feed.owner.attname)
+    if op != 'update':
+        return Change(feed.name, op, instance.pk, feed.represent(instance), owner)
+
+    description = event.get('updateDescription') or {}
+    columns = {name.split('.')[0] for name in description.get('updatedFields', {})}
+    columns.update(name.split('.')[0] for name in description.get('removedFields', []))
+    changed = feed.fields_of_columns(columns)
+    previous = UNKNOWN if feed.owner.name in changed else owner
+    return Change(feed.name, op, instance.pk, feed.represent(instance, changed), owner, previous)
+
+
+# Follows the feed collections with one change stream per process and
+# publishes to the hub. Resumes after the last event it saw when the stream
+# breaks; if that point is gone, clients are told to refresh.
+class ChangeStreamWatcher(threading.Thread):
+    def __init__(self, hub, fallback):
+        super().__init__(name='hrms-change-stream', daemon=True)
+        self.hub = hub
+        self.fallback = fallback
+        self.stopped = threading.Event()
+
+    def _open(self, resume_after):
+        from django.db import connections
+
+        tables = [feed.model._meta.db_table for feed in get_feeds().values()]
+        pipeline = [{'$match': {
+            'ns.coll': {'$in': tables},
+            'operationType': {'$in': ['insert', 'update', 'replace', 'delete']},
+        }}]
+        return connections['default'].cursor().db_conn.watch(
+            pipeline, full_document='updateLookup', resume_after=resume_after, max_await_time_ms=1000,
+        )
+
+    def run(self):
+        from pymongo.errors import OperationFailure, PyMongoError
+
+        token, delay = None, 1
+        while not self.stopped.is_set():
+            try:
+                with self._open(token) as stream:
+                    if self.hub.mode != CHANGE_STREAMS:
+                        logger.info('Change feed: following MongoDB change streams')
+                    self.hub.mode = CHANGE_STREAMS
+                    delay = 1
+                    while not self.stopped.is_set():
+                        event = stream.try_next()
+                        token = stream.resume_token
+                        if event is not None:
+                            self._publish(event)
+            except OperationFailure as exc:
+                if exc.code in (HISTORY_LOST, STREAM_FATAL):
+                    logger.warning('Change feed: cannot resume the change stream (%s); starting over', exc)
+                    token = None
+                    self.hub.refresh_all()
+                    continue
+                if exc.code == NOT_A_REPLICA_SET and self._fall_back():
+                    return
+                logger.error('Change feed: cannot open a change stream: %s', exc)
+            except PyMongoError as exc:
+                logger.warning('Change feed: change stream interrupted: %s', exc)
+            except Exception:
+                # A client without change streams at all (e.g. mongomock).
+                if self._fall_back():
+                    return
+                logger.exception('Change feed: change stream failed')
+            self.stopped.wait(delay)
+            delay = min(delay * 2, 30)
+
+    def _fall_back(self):
+        if not self.fallback or self.hub.mode == CHANGE_STREAMS:
+            return False
+        if self.hub.go_local():
+            logger.info('Change feed: no change streams on this server; publishing in-process')
+        return True
+
+    def _publish(self, event):
+        # The stream keeps running (and its resume point current) while nobody
+        # listens, but the lookups and serialization are skipped.
+        if not self.hub.active:
+            return
+        try:
+            change = _change_from_stream(event)
+        except Exception:
+            logger.exception('Change feed: cannot translate a %s event', event.get('operationType'))
+            return
+        if change is not None:
+            self.hub.publish(change)
+
+    def stop(self):
+        self.stopped.set()
+
+
+# ---------------------------------------------------------------------------
+# In-process publishing (LOCAL mode). Receivers connected in
+# hrms_core/signals.py; raw pymongo writes call record_writes().
+# ---------------------------------------------------------------------------
+
+# post_init: remembers the values a row was loaded with, so a save publishes
+# only the fields it changed and can tell the previous owner of a row that
+# moved to someone else.
+def remember_state(sender, instance, **kwargs):
+    if hub.publishing_locally:
+        instance._changefeed_loaded = {
+            field.attname: instance.__dict__[field.attname]
+            for field in sender._meta.concrete_fields if field.attname in instance.__dict__
+        }
+
+
+def record_save(sender, instance, created, update_fields=None, **kwargs):
+    if not hub.publishing_locally:
+        return
+    feed = feed_for_model(sender)
+    owner = getattr(instance, feed.owner.attname)
+    loaded = getattr(instance, '_changefeed_loaded', None)
+    if created:
+        changed, previous = None, owner
+    elif loaded is None:
+        changed, previous = None if update_fields is None else set(update_fields), UNKNOWN
+    else:
+        changed = {
+            field.name for field in sender._meta.concrete_fields
+            if field.attname in loaded and loaded[field.attname] != getattr(instance, field.attname)
+        }
+        if not changed:
+            return
+        previous = loaded.get(feed.owner.attname, UNKNOWN)
+    remember_state(sender, instance)
+    hub.publish(Change(
+        feed.name, 'insert' if created else 'update', instance.pk,
+        feed.represent(instance, changed), owner, previous,
+    ))
+
+
+def record_delete(sender, instance, **kwargs):
+    if hub.publishing_locally:
+        feed = feed_for_model(sender)
+        hub.publish(Change(feed.name, 'delete', instance.pk, owner=getattr(instance, feed.owner.attname)))
+
+
+# Publishes the rows matching `filter` after a raw write that bypassed the
+# model signals: 'insert' (full rows) or 'update' of `fields`. More rows than
+# CHANGE_FEED_MAX_BATCH become one refresh. A no-op unless this process
+# publishes locally: change streams see raw writes by themselves.
+def record_writes(model, filter, op='update', fields=None):
+    if not hub.publishing_locally:
+        return
+    feed = feed_for_model(model)
+    limit = settings.CHANGE_FEED_MAX_BATCH
+    instances = feed.repository.fetch(filter, None, limit=limit + 1)
+    if len(instances) > limit:
+        hub.publish(refresh(feed.name))
+        return
+    changed = None if op == 'insert' or fields is None else set(fields)
+    for instance in instances:
+        owner = getattr(instance, feed.owner.attname)
+        previous = UNKNOWN if changed is not None and feed.owner.name in changed else owner
+        hub.publish(Change(feed.name, op, instance.pk, feed.represent(instance, changed), owner, previous))
+
+
+# ---------------------------------------------------------------------------
+# The endpoint.
+# ---------------------------------------------------------------------------
+
+async def _send_json(send, status, data, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')] + list(headers),
+    })
+    await send({'type': 'http.response.body', 'body': _render(data)})
+
+
+# Stream tickets.
+#
+# EventSource cannot set headers, and a query string ends up in access logs, so
+# browsers do not pass their access token to the stream. They exchange it first
+# (POST /api/changes/ticket/, an ordinary authenticated API call) for a ticket:
+# a signed note of the user and of the token's expiry, accepted only by this
+# endpoint and only for CHANGE_FEED_TICKET_TTL seconds. A logged ticket is
+# useless soon after, and never was an API credential.
+TICKET_SALT = 'hrms.changefeed.ticket'
+
+
+def issue_ticket(user, access_token):
+    from django.core import signing
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+    return signing.dumps({jwt_settings.USER_ID_CLAIM: user.pk, 'exp': access_token['exp']}, salt=TICKET_SALT)
+
+
+# The claims of a valid ticket, or raises AuthenticationFailed.
+def _read_ticket(ticket):
+    from django.core import signing
+    from rest_framework.exceptions import AuthenticationFailed
+
+    try:
+        return signing.loads(ticket, salt=TICKET_SALT, max_age=settings.CHANGE_FEED_TICKET_TTL)
+    except signing.SignatureExpired:
+        raise AuthenticationFailed('This stream ticket has expired.')
+    except signing.BadSignature:
+        raise AuthenticationFailed('Invalid stream ticket.')
+
+
+# ('bearer', access token) from the Authorization header, or ('ticket', ticket)
+# from the `ticket` query parameter; None without either.
+def _credentials(scope, query):
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            parts = value.split()
+            if len(parts) == 2 and parts[0].lower() == b'bearer':
+                return 'bearer', parts[1]
+    ticket = query.get('ticket', [None])[0]
+    return ('ticket', ticket) if ticket else None
+
+
+# (employee, admin, seconds until the access token expires) or an error
+# response. A ticket's stream ends with the token it was issued for.
+def _authenticate(credentials):
+    from rest_framework.exceptions import APIException
+
+    from .authentication import CachedJWTAuthentication
+
+    kind, value = credentials
+    authentication = CachedJWTAuthentication()
+    try:
+        token = authentication.get_validated_token(value) if kind == 'bearer' else _read_ticket(value)
+        user = authentication.get_user(token)
+    except APIException as exc:
+        return None, (exc.status_code, {'detail': exc.detail})
+    employee = getattr(user, 'employee', None)
+    if employee is None:
+        return None, (403, {'detail': 'No employee profile for this user.'})
+    from django.utils import timezone
+
+    lifetime = token['exp'] - timezone.now().timestamp()
+    return (employee.pk, employee.role == 'admin', lifetime), None
+
+
+async def _disconnected(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def stream_changes(scope, receive, send):
+    if scope['method'] != 'GET':
+        await _send_json(send, 405, {'detail': f'Method "{scope["method"]}" not allowed.'}, [(b'allow', b'GET')])
+        return
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    credentials = _credentials(scope, query)
+    if credentials is None:
+        await _send_json(send, 401, {'detail': 'Authentication credentials were not provided.'})
+        return
+    principal, error = await sync_to_async(_authenticate)(credentials)
+    if error:
+        await _send_json(send, *error)
+        return
+    employee, admin, lifetime = principal
+
+    feeds = await sync_to_async(get_feeds)()
+    models = [name.strip() for name in query.get('models', [','.join(feeds)])[0].split(',') if name.strip()]
+    unknown = sorted(set(models) - set(feeds))
+    if unknown or not models:
+        await _send_json(send, 400, {'models': f'Choose from: {", ".join(feeds)}.'})
+        return
+
+    subscriber = hub.subscribe(asyncio.get_running_loop(), models, employee, admin)
+    if subscriber is None and hub.mode == UNAVAILABLE:
+        await _send_json(send, 503, {'detail': UNAVAILABLE_DETAIL})
+        return
+    if subscriber is None:
+        await _send_json(send, 503, {'detail': 'Too many change feed connections.'}, [(b'retry-after', b'30')])
+        return
+
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                # Stops nginx from buffering the stream.
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        ready = {'models': sorted(subscriber.models), 'source': hub.mode}
+        body = b'retry: %d\n\n' % settings.CHANGE_FEED_RETRY_MS + _event('ready', ready)
+        # A reconnecting client may have missed changes meanwhile.
+        if any(name == b'last-event-id' for name, _ in scope.get('headers', [])):
+            body += b''.join(refresh(feed)._message('refresh') for feed in sorted(subscriber.models))
+        await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+        # The stream ends when the access token expires; the client reconnects
+        # with a fresh one.
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + lifetime
+        disconnected = asyncio.ensure_future(_disconnected(receive))
+        try:
+            while loop.time() < expires:
+                next_message = asyncio.ensure_future(subscriber.queue.get())
+                done, _ = await asyncio.wait(
+                    {next_message, disconnected}, return_when=asyncio.FIRST_COMPLETED,
+                    timeout=min(settings.CHANGE_FEED_HEARTBEAT, max(expires - loop.time(), 0)),
+                )
+                if disconnected in done:
+                    next_message.cancel()
+                    return
+                if next_message in done and next_message.result() is None:
+                    await send({
+                        'type': 'http.response.body', 'body': _event('unavailable', {'detail': UNAVAILABLE_DETAIL}),
+                        'more_body': False,
+                    })
+                    return
+                if next_message in done:
+                    await send({'type': 'http.response.body', 'body': next_message.result(), 'more_body': True})
+                else:
+                    next_message.cancel()
+                    # Keeps proxies from closing an idle stream.
+                    await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+            await send({'type': 'http.response.body', 'body': _event('expired', {}), 'more_body': False})
+        finally:
+            disconnected.cancel()
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+# Wraps the Django ASGI application: the change feed path is served here,
+# everything else by Django.
+def asgi_router(application):
+    async def router(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == CHANGES_PATH:
+            await stream_changes(scope, receive, send)
+        else:
+            await application(scope, receive, send)
+    return router
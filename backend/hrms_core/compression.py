@@ -0,0 +1,205 @@
+import asyncio
+import gzip
+import os
+import zlib
+from hashlib import blake2b
+from threading import Lock
+
+from django.conf import settings
+from django.template import engines
+from django.template.loader import get_template
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# ---------------------------------------------------------------------------
+# Response compression.
+#
+# CompressionMiddleware compresses API responses with Brotli or gzip, whichever
+# the client prefers in Accept-Encoding (Brotli on a tie, when the `brotli`
+# package is installed). Only data formats are compressed (JSON, NDJSON, CSV):
+# HTML pages that reflect secrets, like the admin with its CSRF token, are left
+# alone (BREACH). Regular responses are compressed when they are at least
+# COMPRESSION_MIN_SIZE bytes; streaming responses (exports) are compressed
+# incrementally as they are produced.
+#
+# The middleware is both sync and async capable: under ASGI (asgi.py) it awaits
+# the rest of the chain, so it does not pin requests to Django's single
+# sync thread. Compressing a finished response is CPU work on bytes that are
+# already in memory, so the async path does it inline.
+#
+# Static files are not touched: WhiteNoise serves its own precompressed copies,
+# and the SPA shell is precompressed once (spa_shell below).
+# ---------------------------------------------------------------------------
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv')
+
+# A streaming response is flushed to the client at least every this many
+# uncompressed bytes, so a slow export still arrives progressively.
+STREAM_FLUSH_BYTES = 64 * 1024
+
+
+def _accepted_encodings(header):
+    qualities = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+# 'br', 'gzip' or None for the request's Accept-Encoding header.
+def negotiate(request):
+    qualities = _accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    wildcard = qualities.get('*', 0.0)
+    candidates = ('br', 'gzip') if brotli is not None else ('gzip',)
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        # wbits=31: deflate with a gzip header and trailer.
+        compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)  # noqa: E731
+
+    pending = 0
+    for chunk in chunks:
+        pending += len(chunk)
+        data = process(chunk)
+        if pending >= STREAM_FLUSH_BYTES:
+            data += flush()
+            pending = 0
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Lets Django see an async middleware (as MiddlewareMixin does).
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not self._compressible(response):
+            return response
+
+        # The representation depends on Accept-Encoding even when we end up
+        # sending it uncompressed.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            # Compressed chunk by chunk as the server iterates the response.
+            response.streaming_content = _compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # Different bytes per encoding: a strong validator must not be shared.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def _compressible(response):
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES
+
+
+# ---------------------------------------------------------------------------
+# SPA shell (served by hrms_core.views.index).
+#
+# index.html is rendered once and kept in memory together with its gzip and
+# Brotli encodings and validators. The file is re-read only when its mtime
+# changes (a new frontend build), so an SPA route hit costs an os.stat() and,
+# usually, ends in a 304.
+# ---------------------------------------------------------------------------
+
+
+class _SPAShell:
+    def __init__(self, mtime, body):
+        self.mtime = mtime
+        self.bodies = {None: body, 'gzip': compress(body, 'gzip')}
+        if brotli is not None:
+            self.bodies['br'] = compress(body, 'br')
+        # Weak: the bytes differ per Content-Encoding, the document does not.
+        self.etag = 'W/"%s"' % blake2b(body, digest_size=16).hexdigest()
+        self.last_modified = http_date(mtime)
+
+
+_shell = None
+_shell_path = None
+_shell_lock = Lock()
+
+
+def spa_shell():
+    global _shell, _shell_path
+    if _shell_path is None:
+        _shell_path = get_template('index.html').origin.name
+    mtime = os.stat(_shell_path).st_mtime
+    shell = _shell
+    if shell is not None and shell.mtime == mtime:
+        return shell
+    with _shell_lock:
+        if _shell is None or _shell.mtime != mtime:
+            # Read the file itself: the cached template loader would keep serving
+            # the old build. Rendered without a request, as index.html has no
+            # template tags that need one.
+            with open(_shell_path, encoding='utf-8') as handle:
+                body = engines['django'].from_string(handle.read()).render().encode()
+            _shell = _SPAShell(mtime, body)
+        return _shell
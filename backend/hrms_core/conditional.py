@@ -0,0 +1,82 @@
+import hashlib
+import math
+import time
+
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import get_counters
+
+
+# Conditional GET for a viewset's list and retrieve actions.
+#
+# The validators come from the version counters in hrms_core/cache.py, not from
+# the data: the ETag hashes the counters (and last-modified times) of every
+# collection the response depends on, plus the user, the URL and the media
+# type. Checking If-None-Match therefore costs one indexed lookup of the
+# counters, and a match returns 304 before the queryset or the serializer run.
+#
+# The viewset lists the version names its serializer output depends on, e.g.
+# ('task', 'employee', 'project') for tasks, which show employee names and
+# project titles.
+#
+# Last-Modified has one-second resolution while writes do not. It is the second
+# after the last write once that second is over (the response then reflects
+# every write before it), the second of the write otherwise; If-Modified-Since
+# gets a 304 only when the last write happened strictly before the date sent
+# back. A write in the same second as the response therefore never hides
+# behind a 304; at worst a client refetches once more.
+class ConditionalGetMixin:
+    etag_dependencies = ()
+
+    def get_validators(self):
+        request = self.request
+        counters = get_counters(*self.etag_dependencies)
+        modified = max(modified for _, modified in counters.values())
+        media_type = getattr(request, 'accepted_media_type', None) or 'application/json'
+        state = '|'.join([
+            ','.join(f'{name}{version}@{at}' for name, (version, at) in sorted(counters.items())),
+            str(request.user.pk),
+            media_type,
+            request.get_full_path(),
+        ])
+        second = math.floor(modified)
+        return {
+            'etag': 'W/' + quote_etag(hashlib.blake2b(state.encode(), digest_size=12).hexdigest()),
+            'modified': modified,
+            'last_modified': second + 1 if time.time() >= second + 1 else second,
+        }
+
+    @staticmethod
+    def is_not_modified(request, validators):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            # Weak comparison: W/"x" matches "x" (RFC 7232, section 2.3.2).
+            etags = {etag[2:] if etag.startswith('W/') else etag for etag in parse_etags(if_none_match)}
+            return '*' in etags or validators['etag'][2:] in etags
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return if_modified_since is not None and validators['modified'] < if_modified_since
+
+    @staticmethod
+    def set_validators(response, validators):
+        response['ETag'] = validators['etag']
+        response['Last-Modified'] = http_date(validators['last_modified'])
+        # Responses are per user; let browsers keep them but always revalidate.
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def conditional(self, handler, request, *args, **kwargs):
+        validators = self.get_validators()
+        if self.is_not_modified(request, validators):
+            return self.set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), validators)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.set_validators(response, validators)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
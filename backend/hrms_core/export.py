@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.utils.encoders import JSONEncoder
+
+from employees.models import Employee
+from .mongo import to_mongo_date
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+# Adds GET <list-url>/export/ to a viewset that also uses MongoReadMixin.
+#
+#   ?output=csv|ndjson        (default csv)
+#   ?from=YYYY-MM-DD&to=...   date range, applied to export_range_fields
+#   ?department=Engineering   rows whose employee belongs to that department
+#
+# Rows are read from a server-side Mongo cursor in batches, serialized with the
+# viewset's own serializer and written to a StreamingHttpResponse as they come,
+# so memory use does not grow with the size of the export and the first bytes
+# leave immediately. Under ASGI the rows are produced off the event loop
+# (hrms_core/handlers.py).
+#
+# The viewset provides:
+#   export_range_fields   - (start field, end field); the same field twice for a
+#                           single date. A row matches if its range overlaps
+#                           [from, to].
+#   export_employee_field - the foreign key used for the department filter.
+class ExportMixin:
+    export_range_fields = None
+    export_employee_field = 'employee'
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            raise serializers.ValidationError({'output': f'Choose one of: {", ".join(EXPORT_FORMATS)}.'})
+
+        mongo_filter = self.get_mongo_filter()
+        if mongo_filter is None:
+            raise serializers.ValidationError("User is not linked to an Employee profile.")
+        mongo_filter = dict(mongo_filter, **self.get_export_filter(request))
+
+        # Exports are reports: read from a secondary when there is one.
+        repository = self.repository_class(report=True)
+        ordering = list(self.get_queryset().query.order_by) + ['-pk']
+        chunks = repository.iterate(
+            mongo_filter, repository.sort_spec(ordering), batch_size=settings.EXPORT_BATCH_SIZE
+        )
+        rows = self._rows(chunks)
+        lines = self._csv_lines(rows) if output == 'csv' else self._ndjson_lines(rows)
+
+        response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[output])
+        filename = f'{self.basename}-{timezone.localdate():%Y%m%d}.{output}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def get_export_filter(self, request):
+        mongo_filter = {}
+        repository = self.repository_class()
+
+        start_field, end_field = self.export_range_fields
+        date_from = self._parse_date(request, 'from')
+        date_to = self._parse_date(request, 'to')
+        if date_from:
+            mongo_filter.setdefault(repository.column(end_field), {})['$gte'] = to_mongo_date(date_from)
+        if date_to:
+            mongo_filter.setdefault(repository.column(start_field), {})['$lte'] = to_mongo_date(date_to)
+
+        department = request.query_params.get('department')
+        if department:
+            employee_ids = list(Employee.objects.filter(department=department).values_list('id', flat=True))
+            column = repository.column(self.export_employee_field)
+            if column in mongo_filter:
+                # Role scoping already pins the employee; keep both conditions.
+                mongo_filter['$and'] = [{column: mongo_filter.pop(column)}, {column: {'$in': employee_ids}}]
+            else:
+                mongo_filter[column] = {'$in': employee_ids}
+        return mongo_filter
+
+    @staticmethod
+    def _parse_date(request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise serializers.ValidationError({name: 'Use the YYYY-MM-DD format.'})
+        return parsed
+
+    def _rows(self, chunks):
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        for chunk in chunks:
+            yield from serializer_class(chunk, many=True, context=context).data
+
+    def _csv_lines(self, rows):
+        # The columns come from the serializer, so an export that matches no
+        # rows still has its header line.
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        fieldnames = [name for name, field in serializer.fields.items() if not field.write_only]
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            # Nested values (e.g. task checklists) are written as JSON.
+            writer.writerow({
+                key: json.dumps(value, cls=JSONEncoder) if isinstance(value, (list, dict)) else value
+                for key, value in row.items()
+            })
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def _ndjson_lines(self, rows):
+        for row in rows:
+            yield json.dumps(row, cls=JSONEncoder) + '\n'
@@ -0,0 +1,304 @@
+import re
+from functools import lru_cache
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from rest_framework import serializers
+
+from employees.models import Employee
+from .indexes import required_indexes
+from .mongo import to_mongo_date
+
+# ---------------------------------------------------------------------------
+# List filters.
+#
+#   GET /api/tasks/?status=pending&assigned_to=12&ordering=deadline
+#   GET /api/attendance/?from=2024-05-01&to=2024-05-31&department=Engineering
+#   GET /api/employees/?search=jo
+#
+# A viewset declares its filters (`filterset`: query parameter -> Filter) and
+# the fields ?ordering= may name. FilterMixin applies them to the list action
+# on both read paths: the Mongo filter (hrms_core/mixins.py and the async
+# views) and the ORM queryset.
+#
+# Every list request is checked against the indexes the collection is given by
+# `manage.py ensure_indexes` (hrms_core/indexes.py), together with the role
+# scoping of the viewset. A combination no index serves is rejected with a 400
+# instead of running as a collection scan; supporting a new one means adding
+# its index to QUERY_INDEXES. An index serves a request when (equality, sort,
+# range):
+#   - its first keys are the fields compared for equality, in any order (a
+#     department filter is an $in on the employee and counts as equality);
+#   - the next keys are the ordering, primary key tiebreak included, all in
+#     the same or all in the opposite directions;
+#   - every field with a date range is one of its keys.
+# Prefix search is checked per searched field instead: an index must follow
+# the equality fields with that field. Its matches are sorted in memory.
+# ---------------------------------------------------------------------------
+
+EQUALITY = 'equality'
+RANGE = 'range'
+PREFIX = 'prefix'
+
+MONGO_OPERATORS = {'in': '$in', 'gt': '$gt', 'gte': '$gte', 'lt': '$lt', 'lte': '$lte'}
+
+
+# One filter applied to a list: `lookup` on `fields` (several only for prefix
+# search, which matches any of them).
+class Condition:
+    def __init__(self, kind, fields, lookup, value):
+        self.kind = kind
+        self.fields = fields
+        self.lookup = lookup
+        self.value = value
+
+    def columns(self, model):
+        return [model._meta.get_field(name).column for name in self.fields]
+
+    def mongo(self, model):
+        columns = self.columns(model)
+        if self.lookup == 'startswith':
+            return {'$or': [
+                {column: {'$regex': '^' + re.escape(prefix)}} for column in columns for prefix in self.value
+            ]}
+        if self.lookup == 'exact':
+            return {columns[0]: to_mongo_date(self.value)}
+        if self.lookup == 'in':
+            return {columns[0]: {'$in': [to_mongo_date(value) for value in self.value]}}
+        return {columns[0]: {MONGO_OPERATORS[self.lookup]: to_mongo_date(self.value)}}
+
+    def q(self):
+        if self.lookup == 'startswith':
+            q = Q()
+            for name in self.fields:
+                for prefix in self.value:
+                    q |= Q(**{f'{name}__startswith': prefix})
+            return q
+        return Q(**{f'{self.fields[0]}__{self.lookup}': self.value})
+
+
+# Filters turn the raw query parameter into a Condition, raising ValueError
+# with a message for the client when it is invalid.
+class Filter:
+    kind = EQUALITY
+    lookup = 'exact'
+
+    def __init__(self, field):
+        self.field = field
+
+    def parse(self, model, value):
+        return value
+
+    def condition(self, model, value):
+        return Condition(self.kind, (self.field,), self.lookup, self.parse(model, value))
+
+
+# Equality on a field with choices: the value must be one of them.
+class ChoiceFilter(Filter):
+    def parse(self, model, value):
+        choices = [choice for choice, _ in model._meta.get_field(self.field).choices]
+        if value not in choices:
+            raise ValueError(f'Choose one of: {", ".join(choices)}.')
+        return value
+
+
+# Equality on a foreign key, given the related row's primary key.
+class PrimaryKeyFilter(Filter):
+    def parse(self, model, value):
+        target = model._meta.get_field(self.field).target_field
+        try:
+            return target.to_python(value)
+        except DjangoValidationError:
+            raise ValueError('Enter a valid id.')
+
+
+# Equality on a foreign key to Employee, given the employee_id.
+class EmployeeFilter(Filter):
+    def parse(self, model, value):
+        from employees.directory import get_employee_by_employee_id
+
+        employee = get_employee_by_employee_id(value)
+        if employee is None:
+            raise ValueError(f'No employee with employee_id "{value}".')
+        return employee.pk
+
+
+# The employees of a department, as an $in on a foreign key to Employee.
+class DepartmentFilter(Filter):
+    lookup = 'in'
+
+    def parse(self, model, value):
+        return list(Employee.objects.filter(department=value).values_list('id', flat=True))
+
+
+# One bound of a date range, inclusive with 'gte' / 'lte'.
+class DateFilter(Filter):
+    kind = RANGE
+
+    def __init__(self, field, lookup):
+        super().__init__(field)
+        self.lookup = lookup
+
+    def parse(self, model, value):
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValueError('Use the YYYY-MM-DD format.')
+        return parsed
+
+
+# Case-sensitive prefix match on any of `fields`, so it can use their indexes.
+# The value is also tried capitalized and upper-cased: 'jo' finds "John" and
+# "JOHN_D".
+class PrefixFilter(Filter):
+    kind = PREFIX
+    lookup = 'startswith'
+
+    def __init__(self, fields):
+        super().__init__(fields[0])
+        self.fields = tuple(fields)
+
+    def parse(self, model, value):
+        return list(dict.fromkeys((value, value[:1].upper() + value[1:], value.upper())))
+
+    def condition(self, model, value):
+        return Condition(self.kind, self.fields, self.lookup, self.parse(model, value))
+
+
+# Key lists of the indexes a model's collection has.
+@lru_cache(maxsize=None)
+def _index_keys(model):
+    keys = [tuple(spec.keys) for spec in required_indexes() if spec.model is model]
+    return keys + [(('_id', 1),)]
+
+
+def _serves(keys, equality, sort, ranges):
+    count = len(equality)
+    if {column for column, _ in keys[:count]} != equality:
+        return False
+    rest = keys[count:]
+    head = rest[:len(sort)]
+    if [column for column, _ in head] != [column for column, _ in sort]:
+        return False
+    if len({direction * wanted for (_, direction), (_, wanted) in zip(head, sort)}) > 1:
+        return False
+    return ranges <= {column for column, _ in rest}
+
+
+def _serves_prefix(keys, equality, column):
+    count = len(equality)
+    return (
+        len(keys) > count
+        and {name for name, _ in keys[:count]} == equality
+        and keys[count][0] == column
+    )
+
+
+# Whether some index of `model` serves a query with these equality, range and
+# prefix columns, sorted by `ordering` (Django names).
+def is_indexed(model, equality, ranges, prefixes, ordering):
+    indexes = _index_keys(model)
+    if prefixes:
+        return all(any(_serves_prefix(keys, equality, column) for keys in indexes) for column in prefixes)
+
+    names = list(ordering)
+    if not any(name.lstrip('-') in ('pk', model._meta.pk.name) for name in names):
+        names.append(('-' if names and names[-1].startswith('-') else '') + 'pk')
+    sort = []
+    for name in names:
+        field = model._meta.pk if name.lstrip('-') == 'pk' else model._meta.get_field(name.lstrip('-'))
+        sort.append((field.column, -1 if name.startswith('-') else 1))
+    return any(_serves(keys, equality, sort, ranges) for keys in indexes)
+
+
+# The viewset provides:
+#   filterset       - {query parameter: Filter}
+#   ordering_fields - fields ?ordering=<field> or ?ordering=-<field> may name;
+#                     without it the list keeps the queryset's ordering.
+# Place it before MongoReadMixin: it overrides filter_mongo() and
+# get_list_ordering().
+class FilterMixin:
+    filterset = {}
+    ordering_fields = ()
+    ordering_param = 'ordering'
+
+    # (conditions, ordering) of the list request, validated against the indexes.
+    def get_list_filter(self):
+        if not hasattr(self, '_list_filter'):
+            self._list_filter = self._build_list_filter()
+        return self._list_filter
+
+    def _build_list_filter(self):
+        params = self.request.query_params
+        model = self.get_queryset().model
+        conditions, used, errors = [], [], {}
+        for param, filter in self.filterset.items():
+            value = params.get(param, '').strip()
+            if not value:
+                continue
+            try:
+                conditions.append(filter.condition(model, value))
+            except ValueError as exc:
+                errors[param] = str(exc)
+            used.append(param)
+
+        ordering = list(self.get_queryset().query.order_by)
+        value = params.get(self.ordering_param)
+        if value:
+            if value.lstrip('-') not in self.ordering_fields:
+                allowed = ', '.join(f'{name}, -{name}' for name in self.ordering_fields)
+                errors[self.ordering_param] = f'Choose one of: {allowed}.' if allowed else 'Not supported.'
+            else:
+                ordering = [value]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        if not is_indexed(model, *self._plan_columns(model, conditions), ordering):
+            raise serializers.ValidationError({
+                'filters': f'This combination is not supported: {", ".join(used) or "no filters"} '
+                           f'ordered by {", ".join(ordering)}.'
+            })
+        return conditions, ordering
+
+    # (equality, range, prefix) columns, including the role scoping of
+    # get_mongo_filter() when the viewset has one.
+    def _plan_columns(self, model, conditions):
+        scope = self.get_mongo_filter() if hasattr(self, 'get_mongo_filter') else None
+        equality = {
+            column for column, value in (scope or {}).items()
+            if not column.startswith('$') and not isinstance(value, dict)
+        }
+        ranges, prefixes = set(), []
+        for condition in conditions:
+            columns = condition.columns(model)
+            if condition.kind == EQUALITY:
+                equality.update(columns)
+            elif condition.kind == RANGE:
+                ranges.update(columns)
+            else:
+                prefixes.extend(columns)
+        return equality, ranges, prefixes
+
+    def get_list_ordering(self):
+        if self.action != 'list':
+            return self.get_queryset().query.order_by
+        return self.get_list_filter()[1]
+
+    def filter_mongo(self, mongo_filter):
+        conditions = self.get_list_filter()[0] if self.action == 'list' else ()
+        if not conditions:
+            return mongo_filter
+        model = self.repository_class.model
+        return {'$and': [mongo_filter] + [condition.mongo(model) for condition in conditions]}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action != 'list':
+            return queryset
+        conditions, ordering = self.get_list_filter()
+        for condition in conditions:
+            queryset = queryset.filter(condition.q())
+        return queryset.order_by(*ordering)
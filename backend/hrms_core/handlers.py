@@ -0,0 +1,55 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+# A streaming response is pulled from its iterator in batches of at least this
+# many bytes per hop to the sync thread.
+STREAM_BATCH_BYTES = 64 * 1024
+
+
+def _next_parts(iterator):
+    parts, size = [], 0
+    for part in iterator:
+        parts.append(part)
+        size += len(part)
+        if size >= STREAM_BATCH_BYTES:
+            break
+    return parts
+
+
+# Django 3.2's ASGIHandler iterates a StreamingHttpResponse on the event loop.
+# The exports (hrms_core/export.py) produce their rows from blocking Mongo
+# cursors and ORM lookups, which raise SynchronousOnlyOperation there, after the
+# 200 headers have been sent, leaving an empty body. This handler iterates
+# streaming responses in the sync thread, where Django ran the sync view and
+# where its database connection lives, and sends the parts from the event loop.
+class StreamingASGIHandler(ASGIHandler):
+    async def send_response(self, response, send):
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+
+        # Headers and cookies as in ASGIHandler.send_response.
+        response_headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            response_headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            response_headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': response_headers,
+        })
+
+        next_parts = sync_to_async(_next_parts, thread_sensitive=True)
+        iterator = iter(response)
+        parts = await next_parts(iterator)
+        while parts:
+            for part in parts:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            parts = await next_parts(iterator)
+        await send({'type': 'http.response.body'})
@@ -0,0 +1,162 @@
+from django.apps import apps
+
+from attendance.models import Attendance, AttendanceMonthlySummary
+from employees.models import Employee
+from leaves.models import Leave
+from tasks.models import Project, Task
+
+# Apps whose collections are managed by `manage.py ensure_indexes`.
+MANAGED_APPS = ('employees', 'attendance', 'leaves', 'tasks')
+
+# Access patterns that are not visible in model Meta: the role scoping in each
+# viewset's get_queryset() (equality on the employee first, then the sort) and
+# the orderings and filters of list endpoints. Keys are Django field names; a
+# leading '-' means descending. Keep this in sync when adding new query shapes:
+# list filters (hrms_core/filters.py) reject combinations no index here serves.
+QUERY_INDEXES = {
+    Employee: [
+        ('-created_at',),                   # EmployeeViewSet ordering
+        ('name', 'pk'),                     # ?ordering=name, ?search= on the name
+        ('department', '-created_at'),      # ?department=
+        ('department', 'name', 'pk'),       # ?department=&ordering=name, with ?search=
+        ('department', 'employee_id'),      # ?department=&search= on the employee_id
+    ],
+    Attendance: [
+        ('employee', '-date'),              # employee's own attendance, newest first
+        ('date', 'status'),                 # today's attendance on the dashboard
+        ('status', '-date'),                # ?status= (admins)
+        ('employee', 'status', '-date'),    # ?status= for one employee
+    ],
+    AttendanceMonthlySummary: [
+        ('employee', '-month'),             # employee's own monthly summary
+        ('-month', 'employee', 'pk'),       # monthly_summary action ordering
+    ],
+    Leave: [
+        # List orderings, followed by the ?from=&to= overlap range.
+        ('-applied_on', '-pk', 'start_date', 'end_date'),              # admins
+        ('employee', '-applied_on', '-pk', 'start_date', 'end_date'),  # employee's own leaves
+        ('status', '-applied_on', '-pk', 'start_date', 'end_date'),    # ?status=
+        ('employee', 'status', '-applied_on', '-pk', 'start_date', 'end_date'),
+        ('employee', 'start_date', 'end_date'),  # overlap check on apply (leaves/balances.py)
+    ],
+    Project: [
+        ('-created_at',),                   # ProjectViewSet ordering
+    ],
+    Task: [
+        ('assigned_to', '-created_at'),     # employee's own tasks, newest first
+        ('-created_at',),                   # TaskViewSet ordering (admins)
+        ('status', '-created_at'),          # ?status= (admins)
+        ('assigned_to', 'status', '-created_at'),  # employee's own tasks in one status, e.g. overdue
+        ('project', '-created_at'),         # ?project=
+        ('assigned_to', 'project', '-created_at'),  # employee's own tasks in one project
+        ('project', 'status', '-created_at'),  # ?project=&status=; task counts per project
+        # ?ordering=deadline, with ?deadline_after=&deadline_before=
+        ('deadline', 'pk'),
+        ('status', 'deadline', 'pk'),       # also the overdue sweeper (tasks/overdue.py)
+        ('assigned_to', 'deadline', 'pk'),
+        ('assigned_to', 'status', 'deadline', 'pk'),
+        ('project', 'deadline', 'pk'),
+    ],
+}
+
+
+class IndexSpec:
+    # `collection` names a collection without a model (model None);
+    # `expire_after` (seconds) makes a TTL index.
+    def __init__(self, model, keys, unique=False, reason='', collection=None, expire_after=None):
+        self.model = model
+        # List of (column, direction) pairs, as pymongo expects.
+        self.keys = keys
+        self.unique = unique
+        self.reason = reason
+        self._collection = collection
+        self.expire_after = expire_after
+
+    @property
+    def collection(self):
+        return self._collection or self.model._meta.db_table
+
+    @property
+    def name(self):
+        return '_'.join(f'{column}_{direction}' for column, direction in self.keys)
+
+    def covers(self, other):
+        # An index serves any query on a prefix of its keys with the same directions.
+        return (
+            not other.unique
+            and other.expire_after is None
+            and len(other.keys) <= len(self.keys)
+            and self.keys[:len(other.keys)] == other.keys
+        )
+
+    def __repr__(self):
+        return f'<IndexSpec {self.collection}.{self.name}{" unique" if self.unique else ""}>'
+
+
+def _keys(model, names, tiebreak=False):
+    keys = []
+    for name in names:
+        direction = -1 if name.startswith('-') else 1
+        name = name.lstrip('-')
+        field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        keys.append((field.column, direction))
+    # List endpoints sort by the primary key as a tiebreaker (hrms_core/pagination.py),
+    # so ordering indexes include it in the same direction as the last key.
+    pk_column = model._meta.pk.column
+    if tiebreak and keys and all(column != pk_column for column, _ in keys):
+        keys.append((pk_column, keys[-1][1]))
+    return keys
+
+
+# Derives the indexes every managed collection needs from model metadata
+# (unique fields, unique_together, foreign keys, Meta.ordering) plus the
+# QUERY_INDEXES above. Indexes that are a prefix of a wider one are dropped.
+def required_indexes():
+    specs = []
+    for model in apps.get_models(include_auto_created=True):
+        if model._meta.app_label not in MANAGED_APPS:
+            continue
+        opts = model._meta
+
+        for field in opts.concrete_fields:
+            if field.primary_key and field.column == '_id':
+                continue
+            if field.unique:
+                specs.append(IndexSpec(model, [(field.column, 1)], unique=True, reason=f'unique {field.name}'))
+            elif field.is_relation:
+                specs.append(IndexSpec(model, [(field.column, 1)], reason=f'foreign key {field.name}'))
+
+        for fields in opts.unique_together:
+            specs.append(IndexSpec(model, _keys(model, fields), unique=True, reason=f'unique_together {fields}'))
+
+        if opts.ordering:
+            specs.append(IndexSpec(model, _keys(model, opts.ordering, tiebreak=True), reason='Meta.ordering'))
+
+        for names in QUERY_INDEXES.get(model, ()):
+            sort_only = all(name.startswith('-') for name in names) or names[-1].startswith('-')
+            specs.append(IndexSpec(model, _keys(model, names, tiebreak=sort_only), reason='query pattern'))
+
+    # The incremental sync log (hrms_core/sync.py).
+    from .sync import log_indexes
+    specs.extend(log_indexes())
+
+    return _drop_redundant(specs)
+
+
+def _drop_redundant(specs):
+    # Same keys declared twice: keep one, unique if either one is.
+    by_keys = {}
+    for spec in specs:
+        key = (spec.collection, tuple(spec.keys))
+        if key not in by_keys or (spec.unique and not by_keys[key].unique):
+            by_keys[key] = spec
+    unique_specs = list(by_keys.values())
+
+    # A plain index that is a prefix of a longer one is served by the longer one.
+    return [
+        spec for spec in unique_specs
+        if not any(
+            other.collection == spec.collection and len(other.keys) > len(spec.keys) and other.covers(spec)
+            for other in unique_specs
+        )
+    ]
@@ -0,0 +1,97 @@
+import logging
+import threading
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Background jobs.
+#
+# Maintenance jobs (e.g. tasks/overdue.py) run either from cron through their
+# management command or, with a non-zero interval setting, on a daemon thread
+# inside each server worker (started from wsgi.py / asgi.py, never from
+# management commands). Jobs must be idempotent: every worker runs its own
+# thread, and a cron run may overlap with them.
+#
+# Progress that must survive restarts (watermarks) is stored in the
+# 'hrms_jobs' collection, one document per job, so cron runs and the
+# in-process threads share it.
+# ---------------------------------------------------------------------------
+
+JOBS_COLLECTION = 'hrms_jobs'
+
+# name -> (interval setting, dotted path of the job function)
+PERIODIC_JOBS = {
+    'overdue_tasks': ('OVERDUE_SWEEP_INTERVAL', 'tasks.overdue.sweep_overdue'),
+    'overdue_tasks_full': ('OVERDUE_FULL_SWEEP_INTERVAL', 'tasks.overdue.sweep_all_overdue'),
+}
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def _jobs(using='default'):
+    return connections[using].cursor().db_conn[JOBS_COLLECTION]
+
+
+def get_watermark(name):
+    doc = _jobs().find_one({'_id': name}, {'watermark': 1})
+    return doc.get('watermark') if doc else None
+
+
+# Moves the watermark forward only: an older run finishing late never undoes a
+# newer one.
+def set_watermark(name, value):
+    _jobs().update_one({'_id': name}, {'$max': {'watermark': value}}, upsert=True)
+
+
+class PeriodicJob(threading.Thread):
+    def __init__(self, name, interval, function):
+        super().__init__(name=f'hrms-job-{name}', daemon=True)
+        self.job_name = name
+        self.interval = interval
+        self.function = function
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.function()
+            except Exception:
+                # Keep the thread alive; the next run retries.
+                logger.exception('Background job %s failed', self.job_name)
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+
+
+# After a fork (hrms_core.mongo_client.after_fork) the job threads are gone but
+# the flag says they run. Clears it; returns whether they had been started.
+def reset_after_fork():
+    global _started, _start_lock
+    started, _started = _started, False
+    _start_lock = threading.Lock()
+    return started
+
+
+# Starts the periodic jobs whose interval setting is non-zero. Called once per
+# server process; later calls do nothing.
+def start_periodic_jobs():
+    global _started
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    with _start_lock:
+        if _started:
+            return []
+        _started = True
+        threads = []
+        for name, (setting, path) in PERIODIC_JOBS.items():
+            interval = getattr(settings, setting)
+            if interval > 0:
+                thread = PeriodicJob(name, interval, import_string(path))
+                thread.start()
+                threads.append(thread)
+        return threads
@@ -0,0 +1,115 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from pymongo import MongoClient
+from pymongo.errors import OperationFailure
+
+from hrms_core.indexes import required_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates the MongoDB indexes derived from model metadata and viewset query patterns '
+        '(see hrms_core/indexes.py), and reports missing or unused indexes using $indexStats.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report; do not create anything.',
+        )
+        parser.add_argument(
+            '--database', default='default',
+            help='Database alias to use (default: "default").',
+        )
+
+    def handle(self, *args, **options):
+        db = connections[options['database']].cursor().db_conn
+        dry_run = options['dry_run']
+        build_db = None if dry_run else self._build_database(options['database'])
+
+        specs_by_collection = defaultdict(list)
+        for spec in required_indexes():
+            specs_by_collection[spec.collection].append(spec)
+
+        created = missing = failed = 0
+        for collection_name in sorted(specs_by_collection):
+            collection = db[collection_name]
+            self.stdout.write(self.style.MIGRATE_HEADING(collection_name))
+
+            existing = {}
+            for name, info in collection.index_information().items():
+                existing[tuple((column, int(direction)) for column, direction in info['key'])] = name
+            usage = self._index_usage(collection)
+
+            wanted = set()
+            for spec in specs_by_collection[collection_name]:
+                keys = tuple(spec.keys)
+                wanted.add(keys)
+                if keys in existing:
+                    self.stdout.write(f'  ok       {existing[keys]}{self._usage_label(usage, existing[keys])}')
+                    continue
+
+                missing += 1
+                label = f'{spec.name}{" (unique)" if spec.unique else ""}  [{spec.reason}]'
+                if dry_run:
+                    self.stdout.write(self.style.WARNING(f'  missing  {label}'))
+                    continue
+                try:
+                    # create_index is idempotent for an identical key pattern and options.
+                    options = {'unique': spec.unique, 'background': True}
+                    if spec.expire_after is not None:
+                        options['expireAfterSeconds'] = spec.expire_after
+                    build_db[collection_name].create_index(spec.keys, **options)
+                except OperationFailure as exc:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'  failed   {label}: {exc}'))
+                else:
+                    created += 1
+                    self.stdout.write(self.style.SUCCESS(f'  created  {label}'))
+
+            # Indexes nobody asked for: report them, never drop them automatically.
+            for keys, name in existing.items():
+                if name == '_id_' or keys in wanted:
+                    continue
+                ops = usage.get(name)
+                if ops == 0:
+                    self.stdout.write(self.style.WARNING(f'  unused   {name} (0 ops since last restart)'))
+                else:
+                    self.stdout.write(f'  extra    {name}{self._usage_label(usage, name)}')
+
+        summary = f'{missing} missing, {created} created, {failed} failed.'
+        if dry_run:
+            summary = f'{missing} missing (dry run, nothing created).'
+        self.stdout.write(self.style.SUCCESS(summary) if not failed else self.style.ERROR(summary))
+        if build_db is not None:
+            build_db.client.close()
+
+    # An index build on a large collection can outlast the application's socket
+    # timeout (MONGO_SOCKET_TIMEOUT_MS): create_index would then raise
+    # NetworkTimeout while the server is still building. Builds go through a
+    # client of their own, with the same options but no socket timeout.
+    @staticmethod
+    def _build_database(alias):
+        database = settings.DATABASES[alias]
+        client = MongoClient(**dict(database.get('CLIENT', {}), socketTimeoutMS=None))
+        return client[database['NAME']]
+
+    def _index_usage(self, collection):
+        # $indexStats counts accesses per index since the server started.
+        # It needs the clusterMonitor role on hosted clusters; skip if unavailable.
+        try:
+            return {
+                row['name']: row['accesses']['ops']
+                for row in collection.aggregate([{'$indexStats': {}}])
+            }
+        except OperationFailure:
+            return {}
+
+    @staticmethod
+    def _usage_label(usage, name):
+        if name not in usage:
+            return ''
+        return f' ({usage[name]} ops)'
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from benchmarks.environment import add_seed_arguments
+from benchmarks.seed import flush, seed_from_options
+
+
+class Command(BaseCommand):
+    help = (
+        'Fills the database with a generated HRMS dataset for the benchmarks (see benchmarks/seed.py). '
+        'Use a throwaway database (MONGODB_NAME).'
+    )
+
+    def add_arguments(self, parser):
+        add_seed_arguments(parser)
+        parser.add_argument(
+            '--flush', action='store_true',
+            help='Empty the seeded collections (users included) before seeding.',
+        )
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']['NAME']
+        if options['flush']:
+            flush()
+            self.stdout.write(f'Emptied the seeded collections in "{database}".')
+
+        for name, count in seed_from_options(options).items():
+            self.stdout.write(f'{name:<14}{count:>8}')
+        self.stdout.write(self.style.SUCCESS(f'Seeded "{database}".'))
@@ -0,0 +1,56 @@
+from django.conf import settings
+from rest_framework.response import Response
+
+
+# Serves a viewset's list endpoint from a MongoRepository (hrms_core/mongo.py)
+# instead of the djongo ORM path.
+#
+# The viewset provides:
+#   repository_class - the repository for its model
+#   mongo_reads_name - its key in settings.MONGO_READ_ENDPOINTS
+#   get_mongo_filter() - the same role scoping as get_queryset(), written as a
+#                        Mongo filter; returns None when nothing is visible.
+#
+# Removing the name from MONGO_READ_ENDPOINTS switches that endpoint back to the
+# ORM without a code change. Writes and detail views always use the ORM.
+class MongoReadMixin:
+    repository_class = None
+    mongo_reads_name = None
+
+    def use_mongo_reads(self):
+        return (
+            self.repository_class is not None
+            and self.mongo_reads_name in settings.MONGO_READ_ENDPOINTS
+        )
+
+    def get_mongo_filter(self):
+        raise NotImplementedError('%s must implement get_mongo_filter().' % self.__class__.__name__)
+
+    # Model fields to load; None loads all. Overridden by SparseFieldsMixin.
+    def get_sparse_fields(self):
+        return None
+
+    # The list's query parameter filters and ordering. Overridden by FilterMixin
+    # (hrms_core/filters.py).
+    def filter_mongo(self, mongo_filter):
+        return mongo_filter
+
+    def get_list_ordering(self):
+        return self.get_queryset().query.order_by
+
+    def list(self, request, *args, **kwargs):
+        mongo_filter = self.get_mongo_filter() if self.use_mongo_reads() else None
+        if mongo_filter is None:
+            return super().list(request, *args, **kwargs)
+
+        # Same ordering as the ORM queryset, so pagination cursors are interchangeable.
+        query = self.repository_class().query(
+            self.filter_mongo(mongo_filter), self.get_list_ordering(), fields=self.get_sparse_fields()
+        )
+        page = self.paginate_queryset(query)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(list(query), many=True)
+        return Response(serializer.data)
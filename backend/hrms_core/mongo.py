@@ -0,0 +1,314 @@
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.db import connections
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+
+
+# Returns the raw pymongo collection behind a Django model.
+# djongo keeps one pymongo Database per connection alias; we borrow it so that
+# hot paths can run aggregation pipelines directly instead of going through
+# djongo's SQL-to-Mongo translation.
+def get_collection(model, using='default'):
+    return connections[using].cursor().db_conn[model._meta.db_table]
+
+
+# The collection for report queries (monthly summaries, team calendar,
+# exports), read with MONGO_REPORT_READ_PREFERENCE: from a secondary when there
+# is one, so long aggregations stay off the primary. Results may lag behind
+# writes by the replication delay, so nothing read this way may be cached under
+# a version key (hrms_core/cache.py): it would outlive the lag.
+def get_report_collection(model, using='default'):
+    preference = make_read_preference(
+        read_pref_mode_from_name(settings.MONGO_REPORT_READ_PREFERENCE), None,
+        settings.MONGO_REPORT_MAX_STALENESS,
+    )
+    return get_collection(model, using).with_options(read_preference=preference)
+
+
+# djongo stores DateField values as BSON datetimes at midnight, because BSON has
+# no pure "date" type. Any raw query on a date column must use the same shape.
+def to_mongo_date(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    return value
+
+
+# Reserves `count` consecutive values of a model's auto-increment primary key.
+# djongo emulates AUTO_INCREMENT with a counter document per collection in
+# '__schema__'; documents written directly with pymongo must draw their ids from
+# the same counter or later ORM inserts would collide with them.
+# Returns the first reserved id.
+def allocate_ids(model, count, using='default'):
+    if count <= 0:
+        return None
+    schema = connections[using].cursor().db_conn['__schema__']
+    counter = schema.find_one_and_update(
+        {'name': model._meta.db_table, 'auto': {'$exists': True}},
+        {'$inc': {'auto.seq': count}},
+        return_document=ReturnDocument.AFTER,
+    )
+    return counter['auto']['seq'] - count + 1
+
+
+# Converts an unsaved model instance into the document djongo would store
+# (auto_now/auto_now_add fields filled in), for bulk inserts with pymongo.
+# `values` override field values by field name.
+def to_document(instance, using='default', **values):
+    connection = connections[using]
+    doc = {}
+    for field in instance._meta.concrete_fields:
+        value = values[field.name] if field.name in values else field.pre_save(instance, add=True)
+        doc[field.column] = field.get_db_prep_save(value, connection)
+    return doc
+
+
+# ---------------------------------------------------------------------------
+# Native read path
+#
+# Every ORM query is compiled to SQL by Django and then parsed back into a Mongo
+# query by djongo's sql2mongo layer, on every request. For the read-heavy list
+# endpoints we skip both steps: a repository issues the find() directly (with a
+# projection and an index-friendly sort), then turns the documents into regular
+# model instances with the same db converters the ORM would apply. The existing
+# serializers run unchanged, so the JSON output is identical.
+# ---------------------------------------------------------------------------
+
+class MongoRepository:
+    # The Django model backing the collection.
+    model = None
+    # Foreign keys the serializer reads (e.g. 'employee' for employee.name).
+    # They are loaded with one $in query per related model, not one per row.
+    related = ()
+    # Foreign keys to Employee the serializer reads. They come from the employee
+    # directory cache (employees/directory.py) rather than the database.
+    directory_related = ()
+
+    # `report`: read with the report read preference (get_report_collection).
+    def __init__(self, using='default', report=False):
+        self.using = using
+        self.report = report
+
+    def collection(self, model):
+        if self.report:
+            return get_report_collection(model, self.using)
+        return get_collection(model, self.using)
+
+    # `fields` optionally limits the model fields loaded (sparse fieldsets, see
+    # hrms_core/sparse.py); the others are deferred, as with QuerySet.only().
+    def query(self, filter=None, ordering=None, fields=None):
+        ordering = ordering or self.model._meta.ordering or ('-pk',)
+        return MongoQuery(self, filter or {}, list(ordering), fields=fields)
+
+    # Runs a find() and returns model instances with their relations loaded.
+    def fetch(self, filter, sort, skip=0, limit=None, fields=None):
+        cursor = self.collection(self.model).find(
+            filter, self.projection(self.model, fields), sort=sort
+        )
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        instances = [self.hydrate(self.model, doc, fields) for doc in cursor]
+        self.load_related(instances, fields)
+        return instances
+
+    def count(self, filter):
+        return self.collection(self.model).count_documents(filter)
+
+    # Streams the matching rows in chunks of `batch_size` model instances.
+    # The server-side cursor hands over one batch at a time and relations are
+    # resolved per chunk, so memory stays flat however many rows match.
+    def iterate(self, filter, sort, batch_size=500):
+        cursor = self.collection(self.model).find(
+            filter, self.projection(self.model), sort=sort, batch_size=batch_size
+        )
+        chunk = []
+        for doc in cursor:
+            chunk.append(self.hydrate(self.model, doc))
+            if len(chunk) >= batch_size:
+                self.load_related(chunk)
+                yield chunk
+                chunk = []
+        if chunk:
+            self.load_related(chunk)
+            yield chunk
+
+    def load_related(self, instances, fields=None):
+        self.attach_directory(instances, fields)
+        for related_model, related_fields, query in self.related_lookups(instances, fields):
+            docs = self.collection(related_model).find(query, self.projection(related_model))
+            self.attach_related(instances, related_model, related_fields, docs)
+
+    # Plans the relation queries for a batch of instances: one (model, fields,
+    # filter) per related model. Foreign keys are grouped by target model so
+    # that, for example, a task's assigned_to and assigned_by are resolved with
+    # a single query. Relations outside `fields` (when given) are skipped.
+    def related_lookups(self, instances, fields=None):
+        related = [name for name in self.related if fields is None or name in fields]
+        if not instances or not related:
+            return []
+        fields_by_model = {}
+        for name in related:
+            field = self.model._meta.get_field(name)
+            fields_by_model.setdefault(field.related_model, []).append(field)
+
+        lookups = []
+        for related_model, fields in fields_by_model.items():
+            ids = {getattr(obj, field.attname) for obj in instances for field in fields}
+            ids.discard(None)
+            lookups.append((related_model, fields, {fields[0].target_field.column: {'$in': list(ids)}}))
+        return lookups
+
+    def attach_directory(self, instances, fields=None):
+        from employees.directory import attach_employees
+
+        attach_employees(instances, [name for name in self.directory_related if fields is None or name in fields])
+
+    # Hydrates the related documents once each (an identity map keyed by pk)
+    # and plants them in the foreign key caches of the instances.
+    def attach_related(self, instances, related_model, fields, docs):
+        target = fields[0].target_field
+        identity_map = {}
+        for doc in docs:
+            obj = self.hydrate(related_model, doc)
+            identity_map[getattr(obj, target.attname)] = obj
+        for obj in instances:
+            for field in fields:
+                value = getattr(obj, field.attname)
+                if value is not None and value in identity_map:
+                    field.set_cached_value(obj, identity_map[value])
+
+    def projection(self, model, fields=None):
+        return {field.column: 1 for field in _selected_fields(model, fields)}
+
+    # Builds a model instance from a raw document, applying the same value
+    # converters (dates, timezones, JSON) that the ORM applies to query results.
+    # Fields outside `fields` (when given) are left deferred.
+    def hydrate(self, model, doc, fields=None):
+        connection = connections[self.using]
+        columns = _model_columns(model, connection)
+        if fields is not None:
+            columns = [column for column in columns if column[0].name in fields or column[0].primary_key]
+        values = []
+        for field, expression, converters in columns:
+            value = doc.get(field.column)
+            for converter in converters:
+                value = converter(value, expression, connection)
+            values.append(value)
+        return model.from_db(self.using, [field.attname for field, _, _ in columns], values)
+
+    # Translates a Django ordering ('-date', 'pk') into a pymongo sort.
+    def sort_spec(self, ordering):
+        return [
+            (self.column(name.lstrip('-')), DESCENDING if name.startswith('-') else ASCENDING)
+            for name in ordering
+        ]
+
+    # Translates a Django field name ('employee', 'pk', 'date') to its column.
+    def column(self, name):
+        if name == 'pk':
+            return self.model._meta.pk.column
+        return self.model._meta.get_field(name).column
+
+
+# The concrete fields to load: all of them, or `fields` plus the primary key.
+def _selected_fields(model, fields):
+    return [
+        field for field in model._meta.concrete_fields
+        if fields is None or field.name in fields or field.primary_key
+    ]
+
+
+_columns_cache = {}
+
+
+def _model_columns(model, connection):
+    key = (model, connection.alias)
+    if key not in _columns_cache:
+        columns = []
+        for field in model._meta.concrete_fields:
+            expression = field.get_col(model._meta.db_table)
+            converters = connection.ops.get_db_converters(expression) + expression.get_db_converters(connection)
+            columns.append((field, expression, converters))
+        _columns_cache[key] = columns
+    return _columns_cache[key]
+
+
+# A lazily evaluated, QuerySet-like view over a repository. It supports the
+# operations list endpoints need: ordering, keyset seeks (for pagination),
+# slicing and iteration.
+class MongoQuery:
+    def __init__(self, repository, filter, ordering, start=0, stop=None, fields=None):
+        self.repository = repository
+        self.filter = filter
+        self.ordering = ordering
+        self.start = start
+        self.stop = stop
+        self.fields = fields
+        self._result_cache = None
+
+    @property
+    def model(self):
+        return self.repository.model
+
+    def _clone(self, **changes):
+        params = {
+            'filter': self.filter,
+            'ordering': self.ordering,
+            'start': self.start,
+            'stop': self.stop,
+            'fields': self.fields,
+        }
+        params.update(changes)
+        return MongoQuery(self.repository, **params)
+
+    def order_by(self, *ordering):
+        return self._clone(ordering=list(ordering))
+
+    # Keyset condition: rows that sort after `values` in `ordering`, i.e.
+    # (a < x) OR (a = x AND b < y) OR ... for descending fields.
+    def seek(self, ordering, values):
+        branches = []
+        equal = {}
+        for name, value in zip(ordering, values):
+            column = self.repository.column(name.lstrip('-'))
+            value = to_mongo_date(value)
+            operator = '$lt' if name.startswith('-') else '$gt'
+            branches.append(dict(equal, **{column: {operator: value}}))
+            equal[column] = value
+        return self._clone(filter={'$and': [self.filter, {'$or': branches}]})
+
+    def sort_spec(self):
+        return self.repository.sort_spec(self.ordering)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step is not None:
+            raise TypeError('MongoQuery only supports slicing without a step.')
+        start = self.start + (key.start or 0)
+        stop = self.stop
+        if key.stop is not None:
+            stop = self.start + key.stop if stop is None else min(stop, self.start + key.stop)
+        return self._clone(start=start, stop=stop)
+
+    def __iter__(self):
+        return iter(self._fetch_all())
+
+    def __len__(self):
+        return len(self._fetch_all())
+
+    def count(self):
+        if self._result_cache is not None:
+            return len(self._result_cache)
+        return self.repository.count(self.filter)
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            limit = None if self.stop is None else max(self.stop - self.start, 0)
+            self._result_cache = self.repository.fetch(
+                self.filter, self.sort_spec(), self.start, limit, self.fields
+            )
+        return self._result_cache
@@ -0,0 +1,232 @@
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# MongoDB client lifecycle and connection pool metrics.
+#
+# The client options (pool size, timeouts, compression) are set in settings.py
+# from the worker and thread counts. This module:
+#   - measures the connection pools through pymongo's pool events: how long
+#     requests wait to check out a connection, how close the pools run to
+#     their maxPoolSize, how many checkouts time out and how many connections
+#     are opened (each one a cold TCP/TLS/auth handshake). The numbers cover
+#     every client of the process (djongo's, and motor's under ASGI) and are
+#     served at /api/_perf/;
+#   - drops the clients a gunicorn worker inherits from the master when the
+#     application is preloaded (after_fork, called from gunicorn.conf.py):
+#     pymongo clients are not fork-safe, so each worker builds its own.
+# ---------------------------------------------------------------------------
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is open.
+WAIT_BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Gauges, kept across reset().
+        self.max_size = {}
+        self.open = 0
+        self.in_use = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.peak_in_use = self.in_use
+            self.checkouts = 0
+            self.saturated = 0
+            self.timeouts = 0
+            self.failures = 0
+            self.created = 0
+            self.cleared = 0
+            self.max_wait_ms = 0.0
+            self.histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    # A checkout starts and ends on the same thread.
+    def checkout_started(self):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            if self.in_use >= sum(self.max_size.values()) > 0:
+                self.saturated += 1
+
+    def _waited(self):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        return 0.0 if started is None else (time.perf_counter() - started) * 1000
+
+    def checked_out(self):
+        wait_ms = self._waited()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.histogram[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def checkout_failed(self, address, reason):
+        from pymongo.monitoring import ConnectionCheckOutFailedReason
+
+        wait_ms = self._waited()
+        with self._lock:
+            if reason == ConnectionCheckOutFailedReason.TIMEOUT:
+                self.timeouts += 1
+            else:
+                self.failures += 1
+        if reason == ConnectionCheckOutFailedReason.TIMEOUT:
+            logger.warning(
+                'MongoDB connection pool for %s:%s exhausted: no connection after %.0f ms', *address, wait_ms
+            )
+
+    def checked_in(self):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def pool_created(self, address, max_size):
+        with self._lock:
+            self.max_size[address] = self.max_size.get(address, 0) + max_size
+
+    def connection_created(self):
+        with self._lock:
+            self.created += 1
+            self.open += 1
+
+    def connection_closed(self):
+        with self._lock:
+            self.open = max(self.open - 1, 0)
+
+    def pool_cleared(self):
+        with self._lock:
+            self.cleared += 1
+
+    def snapshot(self):
+        with self._lock:
+            max_size = sum(self.max_size.values())
+            histogram = list(self.histogram)
+            result = {
+                'max_pool_size': max_size,
+                'open': self.open,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'saturation': round(self.peak_in_use / max_size, 3) if max_size else None,
+                'checkouts': self.checkouts,
+                'saturated_checkouts': self.saturated,
+                'wait_timeouts': self.timeouts,
+                'checkout_failures': self.failures,
+                'connections_created': self.created,
+                'pool_clears': self.cleared,
+                'max_wait_ms': round(self.max_wait_ms, 3),
+            }
+        count = sum(histogram)
+        for name, q in (('p50_wait_ms', 0.50), ('p95_wait_ms', 0.95), ('p99_wait_ms', 0.99)):
+            result[name] = _quantile(histogram, count, q)
+        return result
+
+
+# Upper bound of the bucket holding the q-th checkout; None for the open bucket
+# or when there were none.
+def _quantile(histogram, count, q):
+    if not count:
+        return None
+    seen = 0
+    for index, value in enumerate(histogram):
+        seen += value
+        if seen >= q * count:
+            return WAIT_BUCKETS_MS[index] if index < len(WAIT_BUCKETS_MS) else None
+    return None
+
+
+stats = PoolStats()
+
+
+def _pool_listener():
+    from pymongo import monitoring
+
+    class PoolMetricsListener(monitoring.ConnectionPoolListener):
+        def pool_created(self, event):
+            stats.pool_created(event.address, event.options.get('maxPoolSize', 100))
+
+        def pool_cleared(self, event):
+            stats.pool_cleared()
+
+        def pool_closed(self, event):
+            pass
+
+        def connection_created(self, event):
+            stats.connection_created()
+
+        def connection_ready(self, event):
+            pass
+
+        def connection_closed(self, event):
+            stats.connection_closed()
+
+        def connection_check_out_started(self, event):
+            # pymongo 3.12 publishes failed checkouts through this method too.
+            if isinstance(event, monitoring.ConnectionCheckOutFailedEvent):
+                self.connection_check_out_failed(event)
+            else:
+                stats.checkout_started()
+
+        def connection_check_out_failed(self, event):
+            stats.checkout_failed(event.address, event.reason)
+
+        def connection_checked_out(self, event):
+            stats.checked_out()
+
+        def connection_checked_in(self, event):
+            stats.checked_in()
+
+    return PoolMetricsListener()
+
+
+# Called from HrmsCoreConfig.ready() when MONGO_POOL_METRICS is on, before any
+# client exists (clients only see the listeners registered when they are built).
+def install():
+    from pymongo import monitoring
+
+    monitoring.register(_pool_listener())
+
+
+def snapshot():
+    return stats.snapshot()
+
+
+# gunicorn post_fork hook (gunicorn.conf.py). With a preloaded application the
+# master may already have opened MongoDB clients and started the background
+# job threads; a forked worker inherits the clients' sockets and locks but not
+# the threads. Forget the inherited clients without closing them (their
+# sockets are the master's) so the worker connects afresh, and start the jobs
+# again. Without preloading nothing is loaded yet and this does nothing.
+def after_fork():
+    database = sys.modules.get('djongo.database')
+    if database is None:
+        return
+    database.clients.clear()
+
+    from django.db import connections
+
+    for connection in connections.all():
+        connection.connection = None
+        connection.client_connection = None
+        connection.djongo_connection = None
+
+    async_reads = sys.modules.get('hrms_core.async_reads')
+    if async_reads is not None:
+        async_reads._client = None
+
+    changefeed = sys.modules.get('hrms_core.changefeed')
+    if changefeed is not None:
+        changefeed.reset_after_fork()
+
+    global stats
+    stats = PoolStats()
+
+    jobs = sys.modules.get('hrms_core.jobs')
+    if jobs is not None and jobs.reset_after_fork():
+        jobs.start_periodic_jobs()
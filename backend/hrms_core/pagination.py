@@ -0,0 +1,190 @@
+import base64
+import json
+from urllib import parse
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.encoding import force_str
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Keyset ("seek") pagination.
+#
+# Instead of skipping N rows (which MongoDB has to walk through one by one),
+# the cursor stores the sort values of the last row of the current page and the
+# next page is fetched with "WHERE (date, id) < (last_date, last_id)". The cost
+# of a page is O(page size) no matter how deep the client has scrolled.
+#
+# The ordering comes from the queryset (e.g. '-date' for attendance) and the
+# primary key is always appended as a tiebreaker, so rows that share a sort
+# value (thousands of attendance rows on the same day) are never skipped or
+# repeated between pages.
+#
+# Old clients that expect a plain JSON list can opt out with ?paginate=false.
+#
+# Works with Django querysets and with hrms_core.mongo.MongoQuery (the native
+# read path), which implements the seek directly as a Mongo filter.
+class KeysetCursorPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    opt_out_query_param = 'paginate'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_enabled(request):
+            return None
+        page_query = self.get_page_query(queryset, request)
+        return self.set_page(list(page_query))
+
+    # Paginating is split in two halves so that async views can run the query
+    # themselves: get_page_query() returns the sliced query for this page and
+    # set_page() takes the fetched rows and works out the links.
+    def get_page_query(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.fields = [self._get_field(queryset.model, name) for name in self.ordering]
+
+        self.cursor = self.decode_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor['r'])
+
+        # Walking backwards is done by flipping the ordering, seeking past the
+        # cursor and then flipping the page back into display order.
+        ordering = [self._flip(name) for name in self.ordering] if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor and hasattr(queryset, 'seek'):
+            queryset = queryset.seek(ordering, self.cursor['v'])
+        elif self.cursor:
+            queryset = queryset.filter(self._seek_filter(ordering, self.cursor['v']))
+
+        # Fetch one extra row to know whether another page exists.
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        if self.reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def is_enabled(self, request):
+        value = request.query_params.get(self.opt_out_query_param)
+        if value is None:
+            return settings.API_PAGINATE_BY_DEFAULT
+        return value.lower() not in ('false', '0', 'no', 'off')
+
+    def get_page_size(self, request):
+        default = settings.REST_FRAMEWORK['PAGE_SIZE']
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return default
+        if size <= 0:
+            return default
+        return min(size, settings.API_MAX_PAGE_SIZE)
+
+    # The queryset's explicit order_by() wins; otherwise Meta.ordering is used.
+    # The primary key is appended (same direction as the last field) so that
+    # every row has a unique position.
+    def get_ordering(self, queryset):
+        if hasattr(queryset, 'seek'):
+            ordering = list(queryset.ordering)
+        else:
+            ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        if not ordering:
+            ordering = ['-pk']
+        pk_names = {'pk', queryset.model._meta.pk.name}
+        if not any(name.lstrip('-') in pk_names for name in ordering):
+            direction = '-' if ordering[-1].startswith('-') else ''
+            ordering.append(f'{direction}pk')
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # An empty page after a forward seek: go back from where we were.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, obj, reverse):
+        values = []
+        for field in self.fields:
+            value = getattr(obj, field.attname)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else force_str(value))
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(parse.unquote(token).encode('ascii')))
+            values = payload['v']
+            if len(values) != len(self.fields):
+                raise ValueError('cursor does not match ordering')
+            # Convert the JSON strings back into dates, datetimes, ObjectIds...
+            payload['v'] = [field.to_python(value) for field, value in zip(self.fields, values)]
+            payload['r'] = bool(payload.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return payload
+
+    # Builds (a < x) OR (a = x AND b < y) OR ... for the given ordering.
+    def _seek_filter(self, ordering, values):
+        condition = Q()
+        equal = Q()
+        for name, value in zip(ordering, values):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    @staticmethod
+    def _get_field(model, name):
+        name = name.lstrip('-')
+        if name == 'pk':
+            return model._meta.pk
+        return model._meta.get_field(name)
@@ -0,0 +1,51 @@
+from collections import defaultdict
+
+
+# Bulk-loads a many-to-many relation for a list of instances.
+#
+# Django's prefetch_related() for M2M joins the related table with the through
+# table, which djongo cannot translate into a single Mongo query. Instead we
+# read the through collection once, load every referenced object once (an
+# identity map keyed by pk, so an employee shared by many projects is loaded a
+# single time) and plant the results in each instance's prefetch cache, exactly
+# where `instance.<field>.all()` looks for them.
+#
+# Cost: two queries for any number of instances. `load` ({pk: object} for a
+# set of pks) replaces the second one, e.g. with a cache lookup.
+def prefetch_many_to_many(instances, field_name, load=None):
+    pending = [obj for obj in instances if not _is_prefetched(obj, field_name)]
+    if not pending:
+        return
+
+    model = type(pending[0])
+    field = model._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = through._meta.get_field(field.m2m_field_name()).attname
+    target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+
+    links = defaultdict(list)
+    rows = through.objects.filter(**{f'{source}__in': [obj.pk for obj in pending]}).values_list(source, target)
+    for source_id, target_id in rows:
+        links[source_id].append(target_id)
+
+    related_ids = {target_id for ids in links.values() for target_id in ids}
+    if load is None:
+        load = field.related_model._default_manager.in_bulk
+    identity_map = load(related_ids)
+
+    for obj in pending:
+        related = [identity_map[pk] for pk in links.get(obj.pk, []) if pk in identity_map]
+        _set_prefetched(obj, field_name, related)
+
+
+def _is_prefetched(obj, field_name):
+    return field_name in getattr(obj, '_prefetched_objects_cache', {})
+
+
+def _set_prefetched(obj, field_name, related):
+    queryset = getattr(obj, field_name).get_queryset()
+    queryset._result_cache = related
+    queryset._prefetch_done = True
+    if not hasattr(obj, '_prefetched_objects_cache'):
+        obj._prefetched_objects_cache = {}
+    obj._prefetched_objects_cache[field_name] = queryset
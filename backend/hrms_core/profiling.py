@@ -0,0 +1,295 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# ---------------------------------------------------------------------------
+# Request profiling (opt-in with PERF_PROFILING).
+#
+# For a sample of requests (PERF_SAMPLE_RATE) we record:
+#   - mongo:     number and duration of MongoDB commands, from pymongo command
+#                monitoring, so raw pymongo reads and djongo's queries both count;
+#   - translate: time spent inside Django's cursor.execute() that was *not*
+#                spent waiting on MongoDB, i.e. djongo's SQL-to-Mongo translation;
+#   - serialize: time spent building serializer .data;
+#   - total:     wall time of the whole request.
+# The numbers go into a Server-Timing header (visible in the browser dev tools)
+# and into per-endpoint rolling histograms served at /api/_perf/.
+#
+# Unsampled requests only pay for one random() call. Stats are per process: each
+# gunicorn worker keeps its own.
+# ---------------------------------------------------------------------------
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# The profile of the request being handled on this thread, if it is sampled.
+_current = ContextVar('hrms_profile', default=None)
+
+
+class RequestProfile:
+    __slots__ = ('mongo_ops', 'mongo_ms', 'translate_ms', 'serialize_ms', 'serialize_depth')
+
+    def __init__(self):
+        self.mongo_ops = 0
+        self.mongo_ms = 0.0
+        self.translate_ms = 0.0
+        self.serialize_ms = 0.0
+        self.serialize_depth = 0
+
+
+# pymongo calls the listener on the thread that runs the command, so the
+# ContextVar tells us which request (if any) it belongs to.
+def _mongo_listener():
+    from pymongo import monitoring
+
+    class MongoCommandListener(monitoring.CommandListener):
+        def started(self, event):
+            profile = _current.get()
+            if profile is not None:
+                profile.mongo_ops += 1
+
+        def succeeded(self, event):
+            profile = _current.get()
+            if profile is not None:
+                profile.mongo_ms += event.duration_micros / 1000
+
+        def failed(self, event):
+            self.succeeded(event)
+
+    return MongoCommandListener()
+
+
+# Wraps a serializer's `data` property to time it. Nested serializers are
+# rendered through to_representation(), so only the outermost .data is timed;
+# the depth counter guards against a serializer reading another's .data.
+def _timed_data(prop):
+    def data(serializer):
+        profile = _current.get()
+        if profile is None:
+            return prop.fget(serializer)
+        profile.serialize_depth += 1
+        started = time.perf_counter()
+        try:
+            return prop.fget(serializer)
+        finally:
+            profile.serialize_depth -= 1
+            if profile.serialize_depth == 0:
+                profile.serialize_ms += (time.perf_counter() - started) * 1000
+    return property(data)
+
+
+# Called from HrmsCoreConfig.ready() when PERF_PROFILING is on. The listener has
+# to be registered before djongo opens its MongoClient, which happens lazily on
+# the first query.
+def install():
+    from pymongo import monitoring
+    from rest_framework import serializers
+
+    monitoring.register(_mongo_listener())
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        serializer_class.data = _timed_data(serializer_class.data)
+
+
+# Rolling per-endpoint stats: a ring of fixed-length time slots, each holding a
+# latency histogram and metric sums. Old slots fall out of the window.
+class EndpointStats:
+    def __init__(self, slot_seconds, slots):
+        self.slot_seconds = slot_seconds
+        self.slots = deque(maxlen=slots)
+        self._lock = threading.Lock()
+
+    def record(self, metrics):
+        slot_id = int(time.time() // self.slot_seconds)
+        bucket = bisect_left(BUCKETS_MS, metrics['total_ms'])
+        with self._lock:
+            if not self.slots or self.slots[-1]['id'] != slot_id:
+                self.slots.append({'id': slot_id, 'count': 0, 'histogram': [0] * (len(BUCKETS_MS) + 1),
+                                   'sums': dict.fromkeys(metrics, 0.0)})
+            slot = self.slots[-1]
+            slot['count'] += 1
+            slot['histogram'][bucket] += 1
+            for name, value in metrics.items():
+                slot['sums'][name] += value
+
+    def snapshot(self):
+        oldest = int(time.time() // self.slot_seconds) - self.slots.maxlen + 1
+        with self._lock:
+            slots = [slot for slot in self.slots if slot['id'] >= oldest]
+        count = sum(slot['count'] for slot in slots)
+        if not count:
+            return None
+        histogram = [sum(counts) for counts in zip(*(slot['histogram'] for slot in slots))]
+        means = {}
+        for slot in slots:
+            for name, total in slot['sums'].items():
+                means[name] = means.get(name, 0.0) + total
+        return {
+            'count': count,
+            'p50_ms': _quantile(histogram, count, 0.50),
+            'p95_ms': _quantile(histogram, count, 0.95),
+            'p99_ms': _quantile(histogram, count, 0.99),
+            'mean': {name: round(total / count, 3) for name, total in means.items()},
+            'histogram': {_bucket_label(index): value for index, value in enumerate(histogram) if value},
+        }
+
+
+# Upper bound of the bucket holding the q-th sample; None for the open bucket.
+def _quantile(histogram, count, q):
+    rank = q * count
+    seen = 0
+    for index, value in enumerate(histogram):
+        seen += value
+        if seen >= rank:
+            return BUCKETS_MS[index] if index < len(BUCKETS_MS) else None
+    return None
+
+
+def _bucket_label(index):
+    if index < len(BUCKETS_MS):
+        return f'<={BUCKETS_MS[index]}ms'
+    return f'>{BUCKETS_MS[-1]}ms'
+
+
+class PerfRegistry:
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, metrics):
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            with self._lock:
+                stats = self._endpoints.setdefault(
+                    endpoint, EndpointStats(settings.PERF_SLOT_SECONDS, settings.PERF_SLOTS)
+                )
+        stats.record(metrics)
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = list(self._endpoints.items())
+        result = {}
+        for endpoint, stats in sorted(endpoints):
+            summary = stats.snapshot()
+            if summary is not None:
+                result[endpoint] = summary
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+registry = PerfRegistry()
+
+
+def snapshot():
+    return {
+        'pid': os.getpid(),
+        'sample_rate': settings.PERF_SAMPLE_RATE,
+        'window_seconds': settings.PERF_SLOT_SECONDS * settings.PERF_SLOTS,
+        'endpoints': registry.snapshot(),
+    }
+
+
+# "ViewSet.action" for DRF viewsets, the view name otherwise.
+def endpoint_name(request, view_func):
+    cls = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None)
+    if cls is not None and actions:
+        return f'{cls.__name__}.{actions.get(request.method.lower(), request.method.lower())}'
+    if cls is not None:
+        return f'{cls.__name__}.{request.method.lower()}'
+    match = request.resolver_match
+    return match.view_name if match else getattr(view_func, '__name__', 'unknown')
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Lets Django see an async middleware (as MiddlewareMixin does).
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if random.random() >= settings.PERF_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profile, token, started = self._start(request)
+        try:
+            with connections['default'].execute_wrapper(self._time_translation):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile, started)
+
+    # Under ASGI. The profile is a ContextVar, so sync_to_async() carries it into
+    # the threads that run the sync parts of the request.
+    async def __acall__(self, request):
+        if random.random() >= settings.PERF_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        profile, token, started = self._start(request)
+        try:
+            with connections['default'].execute_wrapper(self._time_translation):
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, profile, started)
+
+    @staticmethod
+    def _start(request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        request._perf_endpoint = None
+        return profile, token, time.perf_counter()
+
+    @staticmethod
+    def _finish(request, response, profile, started):
+        total_ms = (time.perf_counter() - started) * 1000
+
+        metrics = {
+            'total_ms': total_ms,
+            'mongo_ops': profile.mongo_ops,
+            'mongo_ms': profile.mongo_ms,
+            'translate_ms': profile.translate_ms,
+            'serialize_ms': profile.serialize_ms,
+        }
+        response['Server-Timing'] = ', '.join((
+            f'mongo;dur={profile.mongo_ms:.2f};desc="{profile.mongo_ops} ops"',
+            f'translate;dur={profile.translate_ms:.2f}',
+            f'serialize;dur={profile.serialize_ms:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ))
+        if request._perf_endpoint is not None:
+            registry.record(request._perf_endpoint, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, '_perf_endpoint'):
+            request._perf_endpoint = endpoint_name(request, view_func)
+
+    # Django execute_wrapper: everything cursor.execute() spends outside MongoDB
+    # commands is djongo parsing the SQL and building the Mongo query.
+    @staticmethod
+    def _time_translation(execute, sql, params, many, context):
+        profile = _current.get()
+        mongo_before = profile.mongo_ms
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            profile.translate_ms += elapsed - (profile.mongo_ms - mongo_before)
@@ -0,0 +1,52 @@
+import orjson
+from bson import ObjectId
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson-based drop-in replacements for DRF's JSONRenderer and JSONParser,
+# enabled with API_FAST_JSON (see REST_FRAMEWORK in settings.py).
+#
+# Output is the same JSON as DRF's renderer produces. orjson encodes the common
+# types (str, int, float, dict, list, and the ReturnDict/ReturnList subclasses)
+# itself; everything else goes through _default, which reuses DRF's encoder so
+# dates ('...Z'), Decimals, lazy translation strings and querysets come out the
+# same way. ObjectIds become their hex string.
+
+_encoder = JSONEncoder()
+
+# Datetimes are passed to _default so they get DRF's formatting (orjson would
+# write '+00:00' rather than 'Z'); dict keys may be ints, as with json.dumps.
+_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return _encoder.default(obj)
+
+
+def dumps(data):
+    return orjson.dumps(data, default=_default, option=_OPTIONS)
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Indented output (Accept: application/json; indent=4) is for humans;
+        # leave it to the standard renderer.
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
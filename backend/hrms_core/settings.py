@@ -18,6 +18,9 @@ from pathlib import Path
 # This is crucial for keeping secrets (like database passwords) out of the code.
 import environ
 
+# importlib locates optional packages (Mongo wire compressors).
+import importlib.util
+
 # os usage is minimal here but sometimes needed for system-level operations.
 import os
 
@@ -96,21 +99,56 @@ INSTALLED_APPS = [
     'attendance',                    # Attendance tracking feature
     'leaves',                        # Leave management feature
     'tasks',                         # Task management feature
+    'dashboard',                     # Aggregated dashboard summary
+    'hrms_core',                     # Project-wide plumbing (cache versioning signals)
 ]
 
 # Configuration for Django Rest Framework (DRF)
 REST_FRAMEWORK = {
     # Default authentication classes determine how users identify themselves for API requests.
+    # CachedJWTAuthentication is simplejwt's JWTAuthentication plus a short-lived cache of the
+    # User and its Employee profile, so role checks do not hit the database on every request.
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication', # Uses JSON Web Tokens (access/refresh tokens)
+        'hrms_core.authentication.CachedJWTAuthentication', # Uses JSON Web Tokens (access/refresh tokens)
     ),
     # Default permission classes determine who can access the API.
     # IsAuthenticated means all endpoints are protected by default (require login).
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Keyset (cursor) pagination for every list endpoint. Pages are fetched by
+    # seeking past the last row's sort key, so deep pages stay as cheap as the first.
+    # Clients choose a size with ?page_size= (capped at API_MAX_PAGE_SIZE).
+    'DEFAULT_PAGINATION_CLASS': 'hrms_core.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': env.int('API_PAGE_SIZE', default=50),
 }
 
+# Render and parse API JSON with orjson (hrms_core/renderers.py) instead of the
+# stdlib json module. Same output, several times less CPU on large lists.
+API_FAST_JSON = env.bool('API_FAST_JSON', default=False)
+if API_FAST_JSON:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+        'hrms_core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    )
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = (
+        'hrms_core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    )
+
+# Cache of authenticated users and their Employee profiles (per process).
+# Entries are dropped on User/Employee saves; the TTL bounds staleness across workers.
+AUTH_CACHE_TTL = env.int('AUTH_CACHE_TTL', default=60)
+AUTH_CACHE_MAX_ENTRIES = env.int('AUTH_CACHE_MAX_ENTRIES', default=4096)
+
+# Upper bound for ?page_size= on list endpoints.
+API_MAX_PAGE_SIZE = env.int('API_MAX_PAGE_SIZE', default=500)
+
+# When True, list endpoints are paginated unless the client sends ?paginate=false
+# (backward-compatible escape hatch for older clients that expect a plain list).
+API_PAGINATE_BY_DEFAULT = env.bool('API_PAGINATE_BY_DEFAULT', default=True)
+
 # Configuration for Simple JWT (JSON Web Token) settings.
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -123,6 +161,7 @@ SIMPLE_JWT = {
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',                   # Adds CORS headers to responses (must be high up)
     'django.middleware.security.SecurityMiddleware',           # Security enhancements (SSL, XSS protection)
+    'hrms_core.compression.CompressionMiddleware',             # Brotli/gzip for API responses (must wrap the views' output)
     'whitenoise.middleware.WhiteNoiseMiddleware',              # Serves static files efficiently in production
     'django.contrib.sessions.middleware.SessionMiddleware',    # Manages sessions across requests
     'django.middleware.common.CommonMiddleware',               # Common conveniences (e.g. forbidding access to certain user agents)
@@ -132,6 +171,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',  # Protection against clickjacking
 ]
 
+# Under ASGI (hrms_core/asgi.py sets SERVER_MODE=asgi) every middleware must be
+# async-capable: a single sync-only one makes Django run the whole chain, views
+# included, through one shared thread, so concurrent requests queue behind each
+# other. WhiteNoise's middleware is sync-only; in ASGI mode it is left out and
+# hrms_core/static_files.py serves the same files in front of Django.
+WSGI_ONLY_MIDDLEWARE = ['whitenoise.middleware.WhiteNoiseMiddleware']
+SERVER_MODE = env.str('SERVER_MODE', default='wsgi')
+if SERVER_MODE == 'asgi':
+    MIDDLEWARE = [path for path in MIDDLEWARE if path not in WSGI_ONLY_MIDDLEWARE]
+
 # The Python module where the main URL configuration is defined.
 ROOT_URLCONF = 'hrms_core.urls'
 
@@ -164,7 +213,7 @@ WSGI_APPLICATION = 'hrms_core.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'djongo',             # The database backend to use
-        'NAME': 'hrms_db',              # Name of the database to create/connect to
+        'NAME': env('MONGODB_NAME', default='hrms_db'),  # Name of the database to create/connect to
         'ENFORCE_SCHEMA': False,        # MongoDB is schema-less, so we disable strict schema enforcement
         'CLIENT': {
             # Connection string for MongoDB
@@ -173,6 +222,159 @@ DATABASES = {
     }
 }
 
+# MongoDB client tuning (see hrms_core/mongo_client.py).
+# Every server process has its own client and connection pool. A sync worker
+# serves one request per thread, so its pool gets one connection per thread plus
+# MONGO_POOL_SPARE for background jobs, and keeps the per-thread ones open
+# (minPoolSize) so requests do not wait for a cold connection. WEB_CONCURRENCY
+# and WEB_THREADS are also read by gunicorn.conf.py. MONGO_MAX_CONNECTIONS, when
+# set, is the connection budget of all workers together.
+WEB_CONCURRENCY = env.int('WEB_CONCURRENCY', default=2 if env.str('CACHE_URL', default='') else 1)
+WEB_THREADS = env.int('WEB_THREADS', default=1)
+MONGO_POOL_SPARE = env.int('MONGO_POOL_SPARE', default=2)
+MONGO_MAX_CONNECTIONS = env.int('MONGO_MAX_CONNECTIONS', default=0)
+MONGO_MAX_POOL_SIZE = WEB_THREADS + MONGO_POOL_SPARE
+if MONGO_MAX_CONNECTIONS:
+    MONGO_MAX_POOL_SIZE = max(1, min(MONGO_MAX_POOL_SIZE, MONGO_MAX_CONNECTIONS // WEB_CONCURRENCY))
+MONGO_MAX_POOL_SIZE = env.int('MONGO_MAX_POOL_SIZE', default=MONGO_MAX_POOL_SIZE)
+MONGO_MIN_POOL_SIZE = env.int('MONGO_MIN_POOL_SIZE', default=min(WEB_THREADS, MONGO_MAX_POOL_SIZE))
+
+# Wire compression, in order of preference; the server picks the first one it
+# supports. Compressors whose Python package is missing are skipped.
+MONGO_COMPRESSORS = [
+    name for name in env.list('MONGO_COMPRESSORS', default=['zstd', 'snappy', 'zlib'])
+    if name == 'zlib' or importlib.util.find_spec({'zstd': 'zstandard', 'snappy': 'snappy'}.get(name, name))
+]
+
+DATABASES['default']['CLIENT'].update({
+    'maxPoolSize': MONGO_MAX_POOL_SIZE,
+    'minPoolSize': MONGO_MIN_POOL_SIZE,
+    # Idle connections above minPoolSize are closed after this long.
+    'maxIdleTimeMS': env.int('MONGO_MAX_IDLE_TIME_MS', default=300000),
+    # A request that finds the pool exhausted fails after this long instead of hanging.
+    'waitQueueTimeoutMS': env.int('MONGO_POOL_WAIT_TIMEOUT_MS', default=5000),
+    'connectTimeoutMS': env.int('MONGO_CONNECT_TIMEOUT_MS', default=5000),
+    'serverSelectionTimeoutMS': env.int('MONGO_SERVER_SELECTION_TIMEOUT_MS', default=5000),
+    'socketTimeoutMS': env.int('MONGO_SOCKET_TIMEOUT_MS', default=30000),
+})
+if MONGO_COMPRESSORS:
+    DATABASES['default']['CLIENT']['compressors'] = ','.join(MONGO_COMPRESSORS)
+
+# Read preference of report queries (monthly attendance summary, team
+# calendar, exports): secondaries take the heavy aggregations off the primary,
+# at the cost of replication lag. Use 'primary' for read-your-writes reports.
+# The cached dashboard summary always reads the primary.
+MONGO_REPORT_READ_PREFERENCE = env('MONGO_REPORT_READ_PREFERENCE', default='secondaryPreferred')
+# Secondaries lagging more than this many seconds are not read from (-1: no
+# limit; MongoDB requires at least 90).
+MONGO_REPORT_MAX_STALENESS = env.int('MONGO_REPORT_MAX_STALENESS', default=-1)
+
+# Connection pool metrics (checkout waits, saturation, timeouts) at /api/_perf/.
+MONGO_POOL_METRICS = env.bool('MONGO_POOL_METRICS', default=True)
+
+
+# Cache configuration.
+# Local memory by default, which is per-process; set CACHE_URL to a shared backend
+# (e.g. redis://localhost:6379/0) when running more than one worker so that all
+# of them see the same entries. Without it gunicorn.conf.py starts one worker.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://hrms-default'),
+    # Employee directory (employees/directory.py). Local memory by default; point
+    # DIRECTORY_CACHE_URL at a shared backend (e.g. redis://...) to share it
+    # between workers.
+    'directory': env.cache('DIRECTORY_CACHE_URL', default='locmemcache://hrms-directory'),
+}
+
+# How long (in seconds) a directory entry may be served. Writes through the app
+# invalidate it at once; this bounds staleness across workers with local memory.
+DIRECTORY_CACHE_TTL = env.int('DIRECTORY_CACHE_TTL', default=300)
+
+# How long (in seconds) a computed dashboard summary is reused.
+# Writes to tasks, projects, attendance or employees invalidate it earlier.
+DASHBOARD_CACHE_TTL = env.int('DASHBOARD_CACHE_TTL', default=30)
+
+
+# List endpoints served by the native pymongo read path (hrms_core/mongo.py)
+# instead of djongo's SQL translation. Remove a name to fall back to the ORM.
+MONGO_READ_ENDPOINTS = env.list('MONGO_READ_ENDPOINTS', default=['attendance', 'leaves', 'tasks'])
+
+# Rows fetched per Mongo batch when streaming CSV/NDJSON exports.
+EXPORT_BATCH_SIZE = env.int('EXPORT_BATCH_SIZE', default=500)
+
+# Leave days granted to every employee per calendar year (initial LeaveBalance.allowance).
+LEAVE_ANNUAL_ALLOWANCE = env.int('LEAVE_ANNUAL_ALLOWANCE', default=24)
+
+# Largest roster accepted by POST /api/attendance/bulk/ in one request.
+ATTENDANCE_BULK_MAX_ROWS = env.int('ATTENDANCE_BULK_MAX_ROWS', default=5000)
+
+# Seconds between runs of the overdue-task sweeper inside each server process
+# (tasks/overdue.py, started from wsgi.py/asgi.py). 0 disables it; run
+# `manage.py sweep_overdue_tasks` from cron instead.
+OVERDUE_SWEEP_INTERVAL = env.int('OVERDUE_SWEEP_INTERVAL', default=900)
+# Seconds between full sweeps (every open task, not just the deadlines passed
+# since the last run; catches tasks reopened behind the watermark). 0 disables
+# it; run `manage.py sweep_overdue_tasks --full` from cron instead.
+OVERDUE_FULL_SWEEP_INTERVAL = env.int('OVERDUE_FULL_SWEEP_INTERVAL', default=86400)
+
+# Most tasks accepted by the bulk task actions (/api/tasks/bulk_*/) in one request.
+TASK_BULK_MAX_ROWS = env.int('TASK_BULK_MAX_ROWS', default=500)
+
+# Serve GET list/detail reads and /api/me/ from async views backed by motor
+# (hrms_core/async_reads.py). Only meaningful under an ASGI server; asgi.py
+# turns it on by default.
+ASYNC_READS = env.bool('ASYNC_READS', default=False)
+
+# Connection pool size of the async (motor) Mongo client, per worker process.
+ASYNC_MONGO_POOL_SIZE = env.int('ASYNC_MONGO_POOL_SIZE', default=100)
+
+# Change feed at /api/changes/ (hrms_core/changefeed.py, ASGI only). Source of
+# the deltas: 'change_streams' (MongoDB change streams, needs a replica set),
+# 'local' (each process publishes its own writes; single-process local runs)
+# or 'auto' (change streams when the server has them, else local). Local
+# publishing needs WEB_CONCURRENCY=1; with more workers the feed answers 503.
+CHANGE_FEED_SOURCE = env.str('CHANGE_FEED_SOURCE', default='auto')
+# Seconds between keep-alive comments on an idle stream.
+CHANGE_FEED_HEARTBEAT = env.int('CHANGE_FEED_HEARTBEAT', default=15)
+# Reconnection delay (ms) suggested to EventSource clients.
+CHANGE_FEED_RETRY_MS = env.int('CHANGE_FEED_RETRY_MS', default=3000)
+# Messages queued per connection before a slow client is told to refetch.
+CHANGE_FEED_QUEUE_SIZE = env.int('CHANGE_FEED_QUEUE_SIZE', default=256)
+# Open streams per worker process.
+CHANGE_FEED_MAX_SUBSCRIBERS = env.int('CHANGE_FEED_MAX_SUBSCRIBERS', default=2000)
+# Seconds a stream ticket (POST /api/changes/ticket/) may be used to connect.
+CHANGE_FEED_TICKET_TTL = env.int('CHANGE_FEED_TICKET_TTL', default=30)
+# Rows of one raw bulk write published as deltas (local mode); more become a refresh.
+CHANGE_FEED_MAX_BATCH = env.int('CHANGE_FEED_MAX_BATCH', default=200)
+
+# Incremental sync at /api/sync/ (hrms_core/sync.py). Log entries (and so
+# tokens) are kept SYNC_RETENTION_DAYS days; entries younger than
+# SYNC_SETTLE_SECONDS wait for the next sync, covering writes still in flight
+# and clock skew between workers; one sync returns at most SYNC_MAX_CHANGES
+# entries' rows.
+SYNC_RETENTION_DAYS = env.int('SYNC_RETENTION_DAYS', default=30)
+SYNC_SETTLE_SECONDS = env.int('SYNC_SETTLE_SECONDS', default=2)
+SYNC_MAX_CHANGES = env.int('SYNC_MAX_CHANGES', default=1000)
+
+# Compression of API responses (hrms_core/compression.py). Bodies smaller than
+# COMPRESSION_MIN_SIZE bytes are sent as they are; Brotli quality 4 and gzip
+# level 6 trade a little ratio for far less CPU than the maximum settings.
+COMPRESSION_MIN_SIZE = env.int('COMPRESSION_MIN_SIZE', default=1024)
+COMPRESSION_BROTLI_QUALITY = env.int('COMPRESSION_BROTLI_QUALITY', default=4)
+COMPRESSION_GZIP_LEVEL = env.int('COMPRESSION_GZIP_LEVEL', default=6)
+
+# Request profiling (hrms_core/profiling.py): Server-Timing headers and
+# per-endpoint stats at /api/_perf/ for a sample of requests.
+PERF_PROFILING = env.bool('PERF_PROFILING', default=False)
+# Fraction of requests profiled (0-1).
+PERF_SAMPLE_RATE = env.float('PERF_SAMPLE_RATE', default=0.05)
+# The stats cover the last PERF_SLOTS slots of PERF_SLOT_SECONDS each.
+PERF_SLOT_SECONDS = env.int('PERF_SLOT_SECONDS', default=60)
+PERF_SLOTS = env.int('PERF_SLOTS', default=15)
+
+if PERF_PROFILING:
+    # Outermost, so the total covers every other middleware too.
+    MIDDLEWARE.insert(0, 'hrms_core.profiling.ProfilingMiddleware')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
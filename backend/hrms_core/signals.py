@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+
+from employees.models import Employee
+from attendance.models import Attendance
+from leaves.models import Leave
+from tasks.models import Project, Task
+
+from employees import directory
+
+from . import changefeed, sync
+from .authentication import invalidate_employee, invalidate_user
+from .cache import bump_version
+
+
+# Models whose writes invalidate cached, aggregated views (dashboard etc.).
+# The version name is the lowercased model name, e.g. 'task'.
+TRACKED_MODELS = (Employee, Attendance, Leave, Project, Task)
+
+
+def version_name(model):
+    return model._meta.model_name
+
+
+def _bump_on_write(sender, **kwargs):
+    bump_version(version_name(sender))
+
+
+def _bump_on_members_change(sender, action, **kwargs):
+    # Project membership changes alter which projects an employee can see.
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version(version_name(Project))
+
+
+def connect_signals():
+    for model in TRACKED_MODELS:
+        post_save.connect(_bump_on_write, sender=model, dispatch_uid=f'hrms_version_save_{version_name(model)}')
+        post_delete.connect(_bump_on_write, sender=model, dispatch_uid=f'hrms_version_delete_{version_name(model)}')
+    m2m_changed.connect(
+        _bump_on_members_change,
+        sender=Project.members.through,
+        dispatch_uid='hrms_version_project_members',
+    )
+
+    # Change feed deltas, when a process publishes its own writes (see
+    # hrms_core/changefeed.py).
+    for model in (Attendance, Leave, Task):
+        name = version_name(model)
+        post_init.connect(changefeed.remember_state, sender=model, dispatch_uid=f'hrms_changefeed_init_{name}')
+        post_save.connect(changefeed.record_save, sender=model, dispatch_uid=f'hrms_changefeed_save_{name}')
+        post_delete.connect(changefeed.record_delete, sender=model, dispatch_uid=f'hrms_changefeed_delete_{name}')
+
+    # The incremental sync log (hrms_core/sync.py).
+    for model in (Employee, Attendance, Leave, Task):
+        name = version_name(model)
+        if model is not Employee:
+            post_init.connect(sync.remember_owner, sender=model, dispatch_uid=f'hrms_sync_init_{name}')
+        post_save.connect(sync.log_save, sender=model, dispatch_uid=f'hrms_sync_save_{name}')
+        post_delete.connect(sync.log_delete, sender=model, dispatch_uid=f'hrms_sync_delete_{name}')
+    post_save.connect(sync.log_project_save, sender=Project, dispatch_uid='hrms_sync_save_project')
+    post_delete.connect(sync.log_project_delete, sender=Project, dispatch_uid='hrms_sync_delete_project')
+    m2m_changed.connect(
+        sync.log_project_members, sender=Project.members.through, dispatch_uid='hrms_sync_project_members',
+    )
+
+    # Drop cached authentication principals when a user or profile changes.
+    for signal in (post_save, post_delete):
+        signal.connect(invalidate_user, sender=User, dispatch_uid=f'hrms_auth_user_{signal is post_save}')
+        signal.connect(invalidate_employee, sender=Employee, dispatch_uid=f'hrms_auth_employee_{signal is post_save}')
+        # And the employee's directory entries (employees/directory.py).
+        signal.connect(directory.invalidate, sender=Employee, dispatch_uid=f'hrms_directory_{signal is post_save}')
@@ -0,0 +1,142 @@
+from rest_framework import serializers
+
+# ---------------------------------------------------------------------------
+# Sparse fieldsets.
+#
+#   GET /api/tasks/?fields=id,title,status    only these fields
+#   GET /api/projects/?expand=tasks           add fields left out by default
+#
+# The serializer drops the other fields, and the view loads only the model
+# fields (and relations) the remaining ones read: the Mongo read path trims its
+# projection, the ORM path uses only() and skips unneeded prefetches.
+# ---------------------------------------------------------------------------
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsSerializerMixin:
+    # Fields left out of the representation unless named in `expand` (or `fields`).
+    expandable_fields = ()
+    # Model fields read by SerializerMethodFields (source '*'), so the view
+    # knows what to load for them; () means they read nothing from the row.
+    field_sources = {}
+
+    # `fields` / `expand` are only passed by SparseFieldsMixin views for
+    # list/retrieve; without them the serializer is unchanged.
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and expand is None:
+            return
+
+        available = set(self.fields)
+        requested = set(fields or ()) | set(expand or ())
+        unknown = requested - available
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f'Unknown field(s): {", ".join(sorted(unknown))}. '
+                          f'Available: {", ".join(sorted(available))}.'
+            })
+
+        if fields:
+            keep = set(fields) | set(expand or ())
+        else:
+            keep = available - (set(self.expandable_fields) - set(expand or ()))
+        for name in available - keep:
+            self.fields.pop(name)
+
+    # Model fields and relations the selected serializer fields read:
+    # (concrete field names, relation names), or None if that can't be told.
+    def get_model_sources(self):
+        model = self.Meta.model
+        concrete = {field.name for field in model._meta.concrete_fields}
+        needed, relations = set(), set()
+        for name, field in self.fields.items():
+            if field.source == '*':
+                if name not in self.field_sources:
+                    return None
+                sources = self.field_sources[name]
+            else:
+                sources = field.source_attrs[:1]
+            for source in sources:
+                if source == 'pk':
+                    source = model._meta.pk.name
+                if source in concrete:
+                    needed.add(source)
+                elif any(relation.name == source for relation in model._meta.get_fields()):
+                    relations.add(source)
+                else:
+                    # A property or method on the model: it may read anything.
+                    return None
+        return needed, relations
+
+
+# View side: parses ?fields= / ?expand= for list and retrieve, hands them to the
+# serializer and trims what the queryset (or Mongo repository) loads.
+class SparseFieldsMixin:
+    sparse_actions = ('list', 'retrieve')
+
+    def get_sparse_params(self):
+        if self.action not in self.sparse_actions:
+            return None, None
+        params = self.request.query_params
+        fields = _names(params['fields']) if 'fields' in params else None
+        expand = _names(params.get('expand', ''))
+        # Detail views show the expandable fields unless ?fields= says otherwise.
+        if self.action == 'retrieve' and fields is None:
+            expand = list(getattr(self.get_serializer_class(), 'expandable_fields', ())) + expand
+        return fields, expand
+
+    def get_serializer(self, *args, **kwargs):
+        fields, expand = self.get_sparse_params()
+        if expand is not None and 'fields' not in kwargs:
+            kwargs.update(fields=fields, expand=expand)
+        return super().get_serializer(*args, **kwargs)
+
+    # (model fields, relations) the response needs, or None to load everything.
+    # Ordering fields are always loaded: pagination cursors read them.
+    def get_sparse_sources(self):
+        if not hasattr(self, '_sparse_sources'):
+            self._sparse_sources = self._compute_sparse_sources()
+        return self._sparse_sources
+
+    def _compute_sparse_sources(self):
+        fields, expand = self.get_sparse_params()
+        if expand is None:
+            return None
+        serializer = self.get_serializer()
+        sources = serializer.get_model_sources()
+        if sources is None:
+            return None
+        needed, relations = sources
+        if hasattr(self, 'get_list_ordering'):
+            ordering = self.get_list_ordering()
+        else:
+            ordering = self.get_queryset().query.order_by
+        needed |= {name.lstrip('-') for name in ordering if name.lstrip('-') != 'pk'}
+        return needed, relations
+
+    def get_sparse_fields(self):
+        sources = self.get_sparse_sources()
+        return None if sources is None else sources[0]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        sources = self.get_sparse_sources()
+        if sources is None:
+            return queryset
+        needed, relations = sources
+        wanted = needed | relations
+
+        lookups = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_through', lookup).split('__')[0] in wanted
+        ]
+        queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+        if isinstance(queryset.query.select_related, dict):
+            related = [name for name in queryset.query.select_related if name in wanted]
+            queryset = queryset.select_related(None)
+            if related:
+                queryset = queryset.select_related(*related)
+        return queryset.only(*needed)
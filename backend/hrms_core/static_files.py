@@ -0,0 +1,70 @@
+from asgiref.sync import sync_to_async
+
+# ---------------------------------------------------------------------------
+# Static files under ASGI.
+#
+# WhiteNoise's Django middleware is sync-only, so it is not in the ASGI
+# middleware chain (settings.SERVER_MODE). This application, mounted in front of
+# Django by asgi.py, serves the same files: it reuses WhiteNoise's file table
+# and responses (headers, precompressed variants, conditional and range
+# requests) and only does the I/O itself, in worker threads, so a file read
+# never blocks the event loop.
+# ---------------------------------------------------------------------------
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _in_thread(func):
+    return sync_to_async(func, thread_sensitive=False)
+
+
+# WhiteNoise reads the request headers from a WSGI environ.
+def _environ(scope):
+    environ = {}
+    for name, value in scope['headers']:
+        key = 'HTTP_' + name.decode('latin1').upper().replace('-', '_')
+        environ[key] = value.decode('latin1')
+    return environ
+
+
+async def _serve(static_file, scope, send):
+    response = await _in_thread(static_file.get_response)(scope['method'], _environ(scope))
+    await send({
+        'type': 'http.response.start',
+        'status': int(response.status),
+        'headers': [(name.encode('latin1'), value.encode('latin1')) for name, value in response.headers],
+    })
+    if response.file is None:
+        await send({'type': 'http.response.body'})
+        return
+    try:
+        read = _in_thread(response.file.read)
+        chunk = await read(CHUNK_SIZE)
+        while chunk:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            chunk = await read(CHUNK_SIZE)
+        await send({'type': 'http.response.body'})
+    finally:
+        await _in_thread(response.file.close)()
+
+
+# Wraps the Django ASGI application: paths that name a static file are served
+# here, everything else goes on to Django.
+def asgi_static(application):
+    from whitenoise.middleware import WhiteNoiseMiddleware
+
+    # Configured from the WHITENOISE_* / STATIC_* settings, as the middleware is.
+    whitenoise = WhiteNoiseMiddleware()
+
+    async def router(scope, receive, send):
+        if scope['type'] == 'http':
+            if whitenoise.autorefresh:
+                # DEBUG: looked up on disk on every request.
+                static_file = await _in_thread(whitenoise.find_file)(scope['path'])
+            else:
+                static_file = whitenoise.files.get(scope['path'])
+            if static_file is not None:
+                await _serve(static_file, scope, send)
+                return
+        await application(scope, receive, send)
+    return router
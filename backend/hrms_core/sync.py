@@ -0,0 +1,236 @@
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# ---------------------------------------------------------------------------
+# Incremental sync.
+#
+#   GET /api/sync/                     {"token": "..."}: the starting point
+#   GET /api/sync/?since=<token>       what changed since, and the next token
+#
+# Every write to a synced model appends one entry to the 'hrms_sync_log'
+# collection: the model, the row's pk, whether it was deleted and the
+# employees it concerns (owners; none for rows every user sees). The model
+# signals write it for ORM saves and deletes, the raw pymongo write paths call
+# log_changes() next to their bump_version().
+#
+# A sync reads the entries after the token that concern the caller, then
+# re-reads the rows they name through the viewset's own role-scoped queryset
+# and serializer: rows found are upserts (exactly as the list endpoints show
+# them), the others tombstones (deleted, or no longer visible to the caller,
+# e.g. a task reassigned to someone else). Its cost follows the number of
+# changed rows, not the size of the collections.
+#
+# Tokens are opaque: the (time, _id) of the last entry read. Entries younger
+# than SYNC_SETTLE_SECONDS are left for the next sync, so a write still in
+# flight on another worker (or a slightly late clock) is not stepped over.
+# Entries expire after SYNC_RETENTION_DAYS (a TTL index, see
+# `manage.py ensure_indexes`); an older token answers 410 and the client
+# reloads its lists.
+# ---------------------------------------------------------------------------
+
+SYNC_COLLECTION = 'hrms_sync_log'
+
+# version name -> (viewset serving the rows, field of the owning employee)
+# The owner is None for rows every user sees.
+SYNCED_MODELS = {
+    'employee': ('employees.views.EmployeeViewSet', None),
+    'project': ('tasks.views.ProjectViewSet', 'members'),
+    'task': ('tasks.views.TaskViewSet', 'assigned_to'),
+    'attendance': ('attendance.views.AttendanceViewSet', 'employee'),
+    'leave': ('leaves.views.LeaveViewSet', 'employee'),
+}
+
+LAST_ID = ObjectId('f' * 24)
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class TokenError(ValueError):
+    pass
+
+
+class TokenExpired(TokenError):
+    pass
+
+
+def _log(using='default'):
+    return connections[using].cursor().db_conn[SYNC_COLLECTION]
+
+
+# Indexes of the log, created by `manage.py ensure_indexes`: the admins' range
+# (all entries), the employees' (their own entries and the shared ones), and
+# the expiry.
+def log_indexes():
+    from .indexes import IndexSpec
+
+    retention = settings.SYNC_RETENTION_DAYS * 24 * 3600
+    return [
+        IndexSpec(None, [('at', 1), ('_id', 1)], reason='sync (admins)', collection=SYNC_COLLECTION),
+        IndexSpec(None, [('owners', 1), ('at', 1), ('_id', 1)], reason='sync (employees)',
+                  collection=SYNC_COLLECTION),
+        IndexSpec(None, [('at', 1)], reason='sync log expiry', collection=SYNC_COLLECTION,
+                  expire_after=retention),
+    ]
+
+
+# Records writes of `name` (a SYNCED_MODELS key): `rows` is [(pk, owners)],
+# owners being the employee pks the row concerns before and after the write,
+# or None for rows every user sees.
+def log_changes(name, rows, deleted=False):
+    now = timezone.now()
+    entries = []
+    for pk, owners in rows:
+        entry = {'model': name, 'pk': pk, 'deleted': deleted, 'at': now, 'owners': None}
+        if owners is not None:
+            entry['owners'] = sorted({owner for owner in owners if owner is not None})
+        entries.append(entry)
+    if entries:
+        _log().insert_many(entries, ordered=False)
+
+
+# ---------------------------------------------------------------------------
+# Signal receivers (connected in hrms_core/signals.py).
+# ---------------------------------------------------------------------------
+
+def _owner_attname(model):
+    owner = SYNCED_MODELS[model._meta.model_name][1]
+    return None if owner is None else model._meta.get_field(owner).attname
+
+
+# post_init: the owner a row was loaded with, so that moving it to another
+# employee also reaches the previous one.
+def remember_owner(sender, instance, **kwargs):
+    instance._sync_owner = instance.__dict__.get(_owner_attname(sender))
+
+
+def _owners(sender, instance):
+    attname = _owner_attname(sender)
+    if attname is None:
+        return None
+    return (getattr(instance, attname), getattr(instance, '_sync_owner', None))
+
+
+# Employees, tasks, attendance and leaves.
+def log_save(sender, instance, **kwargs):
+    log_changes(sender._meta.model_name, [(instance.pk, _owners(sender, instance))])
+    attname = _owner_attname(sender)
+    if attname is not None:
+        instance._sync_owner = getattr(instance, attname)
+
+
+def log_delete(sender, instance, **kwargs):
+    log_changes(sender._meta.model_name, [(instance.pk, _owners(sender, instance))], deleted=True)
+
+
+# Projects concern their members.
+def log_project_save(sender, instance, **kwargs):
+    log_changes('project', [(instance.pk, instance.members.values_list('pk', flat=True))])
+
+
+def log_project_delete(sender, instance, **kwargs):
+    # The memberships are gone by now: tell everyone.
+    log_changes('project', [(instance.pk, None)], deleted=True)
+
+
+# m2m_changed on Project.members, from either side (project.members.add() or
+# employee.projects.add()).
+def log_project_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove'):
+        if reverse:
+            rows = [(pk, [instance.pk]) for pk in pk_set]
+        else:
+            rows = [(instance.pk, pk_set)]
+    elif action == 'pre_clear':
+        if reverse:
+            rows = [(pk, [instance.pk]) for pk in instance.projects.values_list('pk', flat=True)]
+        else:
+            rows = [(instance.pk, instance.members.values_list('pk', flat=True))]
+    else:
+        return
+    log_changes('project', rows)
+
+
+# ---------------------------------------------------------------------------
+# Reading.
+# ---------------------------------------------------------------------------
+
+# BSON dates have millisecond precision, and so do tokens.
+def make_token(at, last_id=LAST_ID):
+    raw = f'{int(at.timestamp() * 1000)}.{last_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def parse_token(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        millis, last_id = raw.split('.')
+        at = EPOCH + timedelta(milliseconds=int(millis))
+        last_id = ObjectId(last_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, InvalidId, OverflowError):
+        raise TokenError('Invalid sync token.')
+    if at < timezone.now() - timedelta(days=settings.SYNC_RETENTION_DAYS):
+        raise TokenExpired('This sync token has expired: reload the lists and sync from a new token.')
+    return at, last_id
+
+
+# The newest point a sync may read up to.
+def settled_now():
+    now = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+# The log entries after `since` ((time, _id) from parse_token) for the given
+# models, concerning `employee` (None: every entry). Returns (entries, next
+# token, whether more entries remain).
+def read_log(since, names, employee=None):
+    at, last_id = since
+    until = settled_now()
+    limit = settings.SYNC_MAX_CHANGES
+    conditions = [
+        {'at': {'$lte': until}},
+        {'$or': [{'at': {'$gt': at}}, {'at': at, '_id': {'$gt': last_id}}]},
+        {'model': {'$in': list(names)}},
+    ]
+    if employee is not None:
+        conditions.append({'$or': [{'owners': employee}, {'owners': None}]})
+    cursor = _log().find({'$and': conditions}, {'model': 1, 'pk': 1, 'at': 1}).sort([('at', 1), ('_id', 1)])
+    entries = list(cursor.limit(limit + 1))
+    if len(entries) > limit:
+        entries = entries[:limit]
+        last = entries[-1]
+        return entries, make_token(last['at'].replace(tzinfo=dt_timezone.utc), last['_id']), True
+    return entries, make_token(until), False
+
+
+def synced_viewsets():
+    return {name: import_string(path) for name, (path, _) in SYNCED_MODELS.items()}
+
+
+# {name: {'upserts': [...], 'deleted': [...]}} for the rows named by `entries`,
+# read with the caller's viewset scoping and serializers.
+def collect_changes(request, entries):
+    pks = {}
+    for entry in entries:
+        pks.setdefault(entry['model'], {})[entry['pk']] = None
+
+    changes = {}
+    viewsets = synced_viewsets()
+    for name, wanted in pks.items():
+        viewset = viewsets[name](
+            request=request, args=(), kwargs={}, format_kwarg=None, action='list', basename=name, detail=False,
+        )
+        rows = list(viewset.get_queryset().filter(pk__in=list(wanted)))
+        found = {row.pk for row in rows}
+        changes[name] = {
+            'upserts': viewset.get_serializer(rows, many=True).data,
+            # Leave keys are ObjectIds, strings in the API.
+            'deleted': [pk if isinstance(pk, int) else str(pk) for pk in wanted if pk not in found],
+        }
+    return changes
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import path
+from django.utils.asyncio import async_unsafe
+from django.utils.module_loading import import_string
+
+from .handlers import StreamingASGIHandler
+
+
+# Stands in for an async read view (hrms_core/async_reads.py) waiting on MongoDB.
+async def slow_read(request):
+    await asyncio.sleep(0.5)
+    return JsonResponse({'ok': True})
+
+
+# Stands in for an export (hrms_core/export.py): its parts come from blocking
+# database reads, which raise SynchronousOnlyOperation on the event loop.
+@async_unsafe
+def blocking_read(n):
+    return f'{n}\n'
+
+
+def export(request):
+    return StreamingHttpResponse(blocking_read(n) for n in range(3))
+
+
+urlpatterns = [path('slow/', slow_read), path('export/', export)]
+
+ASGI_MIDDLEWARE = [path for path in settings.MIDDLEWARE if path not in settings.WSGI_ONLY_MIDDLEWARE]
+
+
+async def get(application, path):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    await application({
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+        'headers': [(b'host', b'testserver')], 'server': ('testserver', 80), 'client': ('127.0.0.1', 1),
+    }, receive, send)
+    return messages[0]['status'], b''.join(message.get('body', b'') for message in messages[1:])
+
+
+# Under ASGI, one sync-only middleware makes Django run the whole chain through
+# a single shared thread, so concurrent requests are served one after the other
+# (settings.SERVER_MODE). Ten concurrent requests to a view that awaits 0.5 s
+# must take about 0.5 s, not 5 s.
+#
+#   python manage.py test hrms_core.tests
+@override_settings(ROOT_URLCONF=__name__, MIDDLEWARE=ASGI_MIDDLEWARE)
+class ASGIConcurrencyTests(SimpleTestCase):
+    def test_middleware_is_async_capable(self):
+        for path in ASGI_MIDDLEWARE + ['hrms_core.profiling.ProfilingMiddleware']:
+            with self.subTest(path):
+                self.assertTrue(getattr(import_string(path), 'async_capable', False))
+
+    def test_concurrent_requests_overlap(self):
+        async def run():
+            application = StreamingASGIHandler()
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(get(application, '/slow/') for _ in range(10)))
+            return responses, time.perf_counter() - started
+
+        responses, elapsed = asyncio.run(run())
+        self.assertEqual([status for status, _ in responses], [200] * 10)
+        self.assertLess(elapsed, 1.5)
+
+    # Streaming responses are iterated off the event loop (hrms_core/handlers.py).
+    def test_streaming_response(self):
+        self.assertEqual(asyncio.run(get(StreamingASGIHandler(), '/export/')), (200, b'0\n1\n2\n'))
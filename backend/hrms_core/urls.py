@@ -34,12 +34,17 @@ urlpatterns = [
     path('api/', include('attendance.urls')),
     path('api/', include('leaves.urls')),
     path('api/', include('tasks.urls')),
+    path('api/', include('dashboard.urls')),
     
     # Example route comment: needs cleanup or consolidation into employees.urls
     path('api/auth/register/', include('employees.auth_urls')), 
 
     # Key authentication endpoints:
     path('api/deploy-info/', views.deploy_info, name='deploy_info'),
+    path('api/_perf/', views.PerfStatsView.as_view(), name='perf_stats'),
+    path('api/changes/', views.changes_unavailable, name='changes'),
+    path('api/changes/ticket/', views.ChangeTicketView.as_view(), name='changes_ticket'),
+    path('api/sync/', views.SyncView.as_view(), name='sync'),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
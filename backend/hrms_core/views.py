@@ -1,10 +1,46 @@
 from django.conf import settings
-from django.http import JsonResponse
-from django.views.generic import TemplateView
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+from rest_framework import permissions, serializers
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Serve Single Page Application
-index = never_cache(TemplateView.as_view(template_name='index.html'))
+from . import changefeed, mongo_client, profiling, sync
+from .compression import negotiate, spa_shell
+
+
+# Serve Single Page Application, from the in-memory precompressed copy of
+# index.html (see hrms_core/compression.py).
+@require_safe
+def index(request):
+    shell = spa_shell()
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and (if_none_match.strip() == '*' or _weak(shell.etag) in map(_weak, parse_etags(if_none_match))):
+        response = HttpResponseNotModified()
+    else:
+        encoding = negotiate(request)
+        if encoding not in shell.bodies:
+            encoding = None
+        response = HttpResponse(shell.bodies[encoding], content_type='text/html; charset=utf-8')
+        response['Content-Length'] = str(len(response.content))
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = shell.etag
+    response['Last-Modified'] = shell.last_modified
+    # Revalidated on every load so a new build shows up at once; the answer
+    # is almost always a bodiless 304.
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def _weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
 
 
 @never_cache
@@ -15,3 +51,87 @@ def deploy_info(request):
             'employee_id_strategy': 'generate_employee_id',
         }
     )
+
+
+# The change feed is served by the ASGI application (hrms_core/changefeed.py),
+# ahead of Django; a sync worker cannot hold a stream open per client.
+@never_cache
+def changes_unavailable(request):
+    return JsonResponse(
+        {'detail': 'The change feed needs the ASGI server (SERVER_MODE=asgi).'}, status=501
+    )
+
+
+# POST /api/changes/ticket/  {"ticket": "...", "expires_in": 30}
+# A short-lived ticket opening the change feed stream (?ticket=), so the access
+# token itself never goes in a URL (see hrms_core/changefeed.py).
+class ChangeTicketView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if getattr(request.user, 'employee', None) is None:
+            raise PermissionDenied('User is not linked to an Employee profile.')
+        return Response({
+            'ticket': changefeed.issue_ticket(request.user, request.auth),
+            'expires_in': settings.CHANGE_FEED_TICKET_TTL,
+        })
+
+
+# GET /api/_perf/     per-endpoint request stats and MongoDB connection pool
+#                     metrics of this worker process
+# DELETE /api/_perf/  reset them
+# Admin only. Request stats are empty unless PERF_PROFILING is on (see
+# hrms_core/profiling.py); pool metrics need MONGO_POOL_METRICS (on by default,
+# see hrms_core/mongo_client.py).
+class PerfStatsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        employee = getattr(request.user, 'employee', None)
+        if employee is None or employee.role != 'admin':
+            raise PermissionDenied('Only admins can view performance stats.')
+
+    def get(self, request):
+        data = dict(profiling.snapshot(), enabled=settings.PERF_PROFILING)
+        if settings.MONGO_POOL_METRICS:
+            data['mongo_pool'] = mongo_client.snapshot()
+        return Response(data)
+
+    def delete(self, request):
+        profiling.registry.clear()
+        mongo_client.stats.reset()
+        return Response(status=204)
+
+
+# GET /api/sync/?since=<token>&models=task,leave
+# Rows changed since the token, as upserts (list representation) and deleted
+# ids per model, plus the next token (hrms_core/sync.py). While `more` is true,
+# sync again at once. Without `since` it only returns a token to start from:
+# take it before loading the lists. `models` defaults to all of them.
+class SyncView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        employee = getattr(request.user, 'employee', None)
+        if employee is None:
+            raise PermissionDenied('User is not linked to an Employee profile.')
+
+        names = [name.strip() for name in request.query_params.get('models', '').split(',') if name.strip()]
+        unknown = set(names) - set(sync.SYNCED_MODELS)
+        if unknown:
+            raise serializers.ValidationError({'models': f'Choose from: {", ".join(sync.SYNCED_MODELS)}.'})
+        names = names or list(sync.SYNCED_MODELS)
+
+        since = request.query_params.get('since')
+        if not since:
+            return Response({'token': sync.make_token(sync.settled_now()), 'more': False, 'changes': {}})
+        try:
+            position = sync.parse_token(since)
+        except sync.TokenExpired as exc:
+            return Response({'detail': str(exc)}, status=410)
+        except sync.TokenError as exc:
+            raise serializers.ValidationError({'since': str(exc)})
+
+        entries, token, more = sync.read_log(position, names, None if employee.role == 'admin' else employee.pk)
+        return Response({'token': token, 'more': more, 'changes': sync.collect_changes(request, entries)})
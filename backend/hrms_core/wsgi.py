@@ -20,6 +20,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hrms_core.settings')
 # This 'application' object is what the web server (like Gunicorn) talks to.
 application = get_wsgi_application()
 
+# Periodic maintenance jobs (hrms_core/jobs.py), e.g. the overdue-task sweeper.
+from hrms_core.jobs import start_periodic_jobs  # noqa: E402
+start_periodic_jobs()
+
 logger = logging.getLogger(__name__)
 logger.warning(
     "Deployment metadata: environment=%s commit=%s branch=%s snapshot=%s domain=%s",
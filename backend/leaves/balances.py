@@ -0,0 +1,232 @@
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from bson import ObjectId
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from hrms_core.cache import bump_version
+from hrms_core.changefeed import record_writes
+from hrms_core.sync import log_changes
+from hrms_core.mongo import get_collection, to_mongo_date
+from .models import Leave, LeaveBalance
+
+# Leaves in these states block overlapping requests.
+ACTIVE_STATUSES = ('Pending', 'Approved')
+
+# Per-employee guards, see employee_guard().
+GUARDS_COLLECTION = 'hrms_leave_guards'
+# A guard left behind by a crashed worker is free again after this long.
+GUARD_LEASE_SECONDS = 30
+# How long a request waits for the guard before giving up.
+GUARD_WAIT_SECONDS = 5
+
+
+class LeaveBalanceError(Exception):
+    pass
+
+
+def leave_days(start_date, end_date):
+    # Calendar days, both ends included.
+    return (end_date - start_date).days + 1
+
+
+# Returns an active leave of `employee_id` overlapping [start_date, end_date],
+# or None. Two ranges overlap when each starts before the other ends; this is a
+# single range query on the (employee, start_date, end_date) index.
+def find_overlap(employee_id, start_date, end_date, exclude_pk=None):
+    query = {
+        'employee_id': employee_id,
+        'start_date': {'$lte': to_mongo_date(end_date)},
+        'end_date': {'$gte': to_mongo_date(start_date)},
+        'status': {'$in': list(ACTIVE_STATUSES)},
+    }
+    if exclude_pk is not None:
+        query['_id'] = {'$ne': exclude_pk}
+    return get_collection(Leave).find_one(query, {'_id': 1, 'start_date': 1, 'end_date': 1, 'status': 1})
+
+
+# Serializes the "check for an overlap, then write the leave" sequences of one
+# employee. The check and the write are separate operations, so without it two
+# concurrent requests for overlapping dates could both pass the check.
+#
+# The guard is a document {_id: employee_id, holder, expires}, claimed with one
+# find_one_and_update: the filter matches when the guard is free (missing, or
+# its lease has run out); while someone else holds it the upsert hits the unique
+# _id, and we wait and retry.
+@contextmanager
+def employee_guard(employee_id):
+    guards = connections['default'].cursor().db_conn[GUARDS_COLLECTION]
+    holder = ObjectId()
+    deadline = time.monotonic() + GUARD_WAIT_SECONDS
+    while True:
+        now = timezone.now()
+        try:
+            guards.find_one_and_update(
+                {'_id': employee_id, 'expires': {'$lt': now}},
+                {'$set': {'holder': holder, 'expires': now + timedelta(seconds=GUARD_LEASE_SECONDS)}},
+                upsert=True,
+            )
+            break
+        except DuplicateKeyError:
+            if time.monotonic() >= deadline:
+                raise LeaveBalanceError('Another leave request of this employee is being saved; try again.')
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        guards.delete_one({'_id': employee_id, 'holder': holder})
+
+
+def _balances():
+    return get_collection(LeaveBalance)
+
+
+# Creates the balance document for (employee, year) if it does not exist yet.
+def ensure_balance(employee_id, year):
+    _balances().update_one(
+        {'employee_id': employee_id, 'year': year},
+        {'$setOnInsert': {'allowance': settings.LEAVE_ANNUAL_ALLOWANCE, 'used': 0, 'pending': 0}},
+        upsert=True,
+    )
+
+
+def get_balance(employee_id, year):
+    ensure_balance(employee_id, year)
+    doc = _balances().find_one({'employee_id': employee_id, 'year': year}, {'_id': 0})
+    doc['available'] = doc['allowance'] - doc['used'] - doc['pending']
+    return doc
+
+
+# Atomically applies `changes` ($inc deltas on used/pending) to a balance.
+# When `require` days must fit in the allowance the condition is part of the
+# update filter, so two concurrent requests can never both pass the check.
+def _adjust(employee_id, year, changes, require=0):
+    ensure_balance(employee_id, year)
+    query = {'employee_id': employee_id, 'year': year}
+    if require:
+        query['$expr'] = {'$lte': [{'$add': ['$used', '$pending', require]}, '$allowance']}
+    doc = _balances().find_one_and_update(query, {'$inc': changes}, return_document=ReturnDocument.AFTER)
+    if doc is None:
+        raise LeaveBalanceError('Not enough leave balance for this request.')
+    bump_version('leavebalance')
+    return doc
+
+
+# Balance counter that holds the days of a leave in the given status.
+def _counter(status):
+    return {'Pending': 'pending', 'Approved': 'used'}.get(status)
+
+
+# Counts the days of a leave against the balance (new request: status Pending).
+def reserve(employee_id, start_date, end_date, status='Pending'):
+    counter = _counter(status)
+    if counter:
+        days = leave_days(start_date, end_date)
+        _adjust(employee_id, start_date.year, {counter: days}, require=days)
+
+
+# Gives the days of a leave back (request withdrawn or deleted).
+def release(employee_id, start_date, end_date, status='Pending'):
+    counter = _counter(status)
+    if counter:
+        _adjust(employee_id, start_date.year, {counter: -leave_days(start_date, end_date)})
+
+
+# Moves the days of an active leave to a new date range. If the new range does
+# not fit in the balance, the old reservation is restored.
+def reschedule(leave, start_date, end_date):
+    release(leave.employee_id, leave.start_date, leave.end_date, leave.status)
+    try:
+        reserve(leave.employee_id, start_date, end_date, leave.status)
+    except LeaveBalanceError:
+        _adjust(leave.employee_id, leave.start_date.year,
+                {_counter(leave.status): leave_days(leave.start_date, leave.end_date)})
+        raise
+
+
+# Moves a leave to `new_status` and updates the balance in step with it.
+#
+# The status change is claimed first with a conditional update (it only matches
+# if nobody else changed the leave meanwhile), then the balance is adjusted
+# atomically. If the balance does not allow it, the status is put back.
+def change_status(leave, new_status):
+    previous = leave.status
+    if previous == new_status:
+        return leave
+
+    claimed = get_collection(Leave).update_one(
+        {'_id': leave.pk, 'status': previous},
+        {'$set': {'status': new_status}},
+    )
+    if claimed.modified_count == 0:
+        raise LeaveBalanceError('This leave was updated by someone else; reload and try again.')
+
+    days = leave_days(leave.start_date, leave.end_date)
+    changes = {}
+    if _counter(previous):
+        changes[_counter(previous)] = -days
+    if _counter(new_status):
+        changes[_counter(new_status)] = changes.get(_counter(new_status), 0) + days
+    # Moving between Pending and Approved does not change the total held
+    # against the allowance; coming from Rejected it must fit.
+    require = days if _counter(new_status) and not _counter(previous) else 0
+
+    try:
+        if changes:
+            _adjust(leave.employee_id, leave.start_date.year, changes, require=require)
+    except LeaveBalanceError:
+        get_collection(Leave).update_one({'_id': leave.pk}, {'$set': {'status': previous}})
+        raise
+    finally:
+        # Raw writes bypass model signals.
+        bump_version('leave')
+        log_changes('leave', [(leave.pk, [leave.employee_id])])
+
+    leave.status = new_status
+    record_writes(Leave, {'_id': leave.pk}, fields=('status',))
+    return leave
+
+
+# Recomputes every balance from the leave history. Used after importing data
+# or to repair drift; returns the number of balance documents written.
+def rebuild_balances():
+    pipeline = [
+        {'$match': {'status': {'$in': list(ACTIVE_STATUSES)}}},
+        {'$group': {
+            '_id': {'employee_id': '$employee_id', 'year': {'$year': '$start_date'}},
+            'used': {'$sum': {'$cond': [
+                {'$eq': ['$status', 'Approved']},
+                {'$add': [{'$divide': [{'$subtract': ['$end_date', '$start_date']}, 86400000]}, 1]},
+                0,
+            ]}},
+            'pending': {'$sum': {'$cond': [
+                {'$eq': ['$status', 'Pending']},
+                {'$add': [{'$divide': [{'$subtract': ['$end_date', '$start_date']}, 86400000]}, 1]},
+                0,
+            ]}},
+        }},
+    ]
+    operations = [
+        UpdateOne(
+            {'employee_id': row['_id']['employee_id'], 'year': row['_id']['year']},
+            {
+                '$set': {'used': int(row['used']), 'pending': int(row['pending'])},
+                '$setOnInsert': {'allowance': settings.LEAVE_ANNUAL_ALLOWANCE},
+            },
+            upsert=True,
+        )
+        for row in get_collection(Leave).aggregate(pipeline)
+    ]
+
+    balances = _balances()
+    # Start from zero so that balances with no active leave left are reset too.
+    balances.update_many({}, {'$set': {'used': 0, 'pending': 0}})
+    if operations:
+        balances.bulk_write(operations, ordered=False)
+    bump_version('leavebalance')
+    return len(operations)
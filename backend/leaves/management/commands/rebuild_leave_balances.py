@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from leaves.balances import rebuild_balances
+
+
+class Command(BaseCommand):
+    help = 'Recomputes every LeaveBalance (used and pending days) from the leave history.'
+
+    def handle(self, *args, **options):
+        written = rebuild_balances()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} leave balances.'))
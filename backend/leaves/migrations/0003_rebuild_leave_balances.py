@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+# Balances were introduced with empty counters: compute them once from the
+# existing leave history (same as `manage.py rebuild_leave_balances`). The
+# rebuild works on the raw collections, so it does not depend on model state.
+def rebuild_leave_balances(apps, schema_editor):
+    from leaves.balances import rebuild_balances
+
+    rebuild_balances()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0002_leavebalance'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_leave_balances, migrations.RunPython.noop),
+    ]
@@ -37,3 +37,34 @@ class Leave(models.Model):
     def __str__(self):
         # String representation: "John Doe - Pending"
         return f"{self.employee.name} - {self.status}"
+
+
+# Per-employee, per-year leave balance, maintained on every apply, approve and
+# reject (see leaves/balances.py) so that checks are a single document update
+# instead of a scan of the employee's leave history.
+class LeaveBalance(models.Model):
+    _id = models.ObjectIdField()
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='leave_balances')
+
+    # Calendar year the balance applies to (leaves count towards the year they start in).
+    year = models.PositiveIntegerField()
+
+    # Days granted for the year.
+    allowance = models.PositiveIntegerField()
+
+    # Days of approved leave.
+    used = models.PositiveIntegerField(default=0)
+
+    # Days requested by leaves that are still Pending (reserved, not yet used).
+    pending = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('employee', 'year')
+
+    @property
+    def available(self):
+        return self.allowance - self.used - self.pending
+
+    def __str__(self):
+        return f"{self.employee.name} - {self.year} - {self.available}/{self.allowance}"
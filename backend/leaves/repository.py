@@ -0,0 +1,9 @@
+from hrms_core.mongo import MongoRepository
+from .models import Leave
+
+
+# Native Mongo read path for the leave list (see hrms_core/mongo.py).
+class LeaveRepository(MongoRepository):
+    model = Leave
+    # LeaveSerializer reads employee.name and employee.employee_id.
+    directory_related = ('employee',)
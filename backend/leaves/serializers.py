@@ -1,24 +1,38 @@
 from rest_framework import serializers
 from .models import Leave
+from employees.directory import DirectoryListSerializer, EmployeeReadOnlyField
+from hrms_core.sparse import SparseFieldsSerializerMixin
 
-class LeaveSerializer(serializers.ModelSerializer):
+class LeaveSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     # SerializerMethodField allows us to define a custom field that is calculated by a method.
     # Here, we mapped 'id' to get_id method.
     id = serializers.SerializerMethodField()
     
     # ReadOnlyField gets data from the related model (Employee) by dot notation.
     # This prevents the client from trying to change the employee name/id via this endpoint.
-    employee_name = serializers.ReadOnlyField(source='employee.name')
-    employee_id = serializers.ReadOnlyField(source='employee.employee_id')
+    # The employee comes from the directory cache (employees/directory.py).
+    employee_name = EmployeeReadOnlyField(source='employee.name')
+    employee_id = EmployeeReadOnlyField(source='employee.employee_id')
 
     # This method returns the string representation of the object's primary key.
     # This is often needed with MongoDB ObjectIds to ensure they are returned as strings, not objects.
     def get_id(self, obj):
         return str(obj.pk)
 
+    # get_id only reads the primary key (for ?fields= trimming, see hrms_core/sparse.py).
+    field_sources = {'id': ('pk',)}
+
+    def validate(self, attrs):
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError({'end_date': 'End date cannot be before start date.'})
+        return attrs
+
     class Meta:
         model = Leave
         fields = '__all__' # Expose all fields
         # These fields cannot be modified by the user in a request (like POST or PUT).
         # We don't want users arbitrarily changing the status (only admins should) or the employee link.
         read_only_fields = ('employee', 'status') 
+        list_serializer_class = DirectoryListSerializer
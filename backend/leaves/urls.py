@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import LeaveViewSet
@@ -11,3 +12,9 @@ urlpatterns = [
     # Include the URLs generated by the router.
     path('', include(router.urls)),
 ]
+
+# Async (motor) list/detail reads when running under ASGI; see hrms_core/async_reads.py.
+if settings.ASYNC_READS:
+    from hrms_core.async_reads import async_read_urls
+
+    urlpatterns = async_read_urls('leaves', LeaveViewSet, 'leave', pk_pattern=r'[0-9a-f]{24}') + urlpatterns
@@ -1,19 +1,49 @@
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from rest_framework import viewsets, permissions, status
+from django.utils import timezone
+from rest_framework import viewsets, permissions, serializers, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 # from bson import ObjectId # Imported inside method to avoid global dependency issues if not installed
 from .models import Leave
 from .serializers import LeaveSerializer
+from .repository import LeaveRepository
+from .balances import (
+    LeaveBalanceError, change_status, employee_guard, find_overlap, get_balance, release, reschedule, reserve,
+)
+from employees.directory import get_employee_by_employee_id
 from employees.models import Employee
+from hrms_core.conditional import ConditionalGetMixin
+from hrms_core.export import ExportMixin
+from hrms_core.filters import ChoiceFilter, DateFilter, DepartmentFilter, EmployeeFilter, FilterMixin
+from hrms_core.mixins import MongoReadMixin
+from hrms_core.sparse import SparseFieldsMixin
 
-class LeaveViewSet(viewsets.ModelViewSet):
+class LeaveViewSet(ConditionalGetMixin, SparseFieldsMixin, ExportMixin, FilterMixin, MongoReadMixin,
+                   viewsets.ModelViewSet):
     # Access all leave objects.
     queryset = Leave.objects.all()
     # Use the serializer we defined.
     serializer_class = LeaveSerializer
     # Ensure only logged-in users can access this API.
     permission_classes = [permissions.IsAuthenticated]
+    # Conditional GET: rows show the employee's name and employee_id.
+    etag_dependencies = ('leave', 'employee')
+    # List reads go straight to MongoDB when 'leaves' is in MONGO_READ_ENDPOINTS.
+    repository_class = LeaveRepository
+    mongo_reads_name = 'leaves'
+    # GET .../export/?output=csv|ndjson&from=&to=&department= streams the full history.
+    export_range_fields = ('start_date', 'end_date')
+    # GET /api/leaves/?employee_id=&department=&status=&from=&to=&ordering=
+    # from/to select the leaves overlapping that range (hrms_core/filters.py).
+    filterset = {
+        'employee_id': EmployeeFilter('employee'),
+        'department': DepartmentFilter('employee'),
+        'status': ChoiceFilter('status'),
+        'from': DateFilter('end_date', 'gte'),
+        'to': DateFilter('start_date', 'lte'),
+    }
+    ordering_fields = ('applied_on',)
 
     # Custom logic to determine which leave requests the current user sees.
     def get_queryset(self):
@@ -26,6 +56,16 @@ class LeaveViewSet(viewsets.ModelViewSet):
         except AttributeError:
             return Leave.objects.none()
 
+    # Same scoping as get_queryset(), as a raw Mongo filter.
+    def get_mongo_filter(self):
+        try:
+            employee = self.request.user.employee
+        except AttributeError:
+            return None
+        if employee.role == 'admin':
+            return {}
+        return {'employee_id': employee.pk}
+
     # Custom logic to retrieve a single object.
     # This is overridden mainly to handle MongoDB ObjectIds which are strings in the URL 
     # but need to be converted to ObjectId objects for the query (sometimes).
@@ -62,35 +102,109 @@ class LeaveViewSet(viewsets.ModelViewSet):
         self.check_object_permissions(self.request, obj)
         return obj
 
+    # Refuses a date range that overlaps one of the employee's Pending or
+    # Approved leaves (one indexed range query).
+    def check_overlap(self, employee_id, start_date, end_date, exclude_pk=None):
+        overlap = find_overlap(employee_id, start_date, end_date, exclude_pk=exclude_pk)
+        if overlap:
+            raise serializers.ValidationError(
+                f"Overlaps a {overlap['status'].lower()} leave from "
+                f"{overlap['start_date']:%Y-%m-%d} to {overlap['end_date']:%Y-%m-%d}."
+            )
+
     # Custom logic for creating a new Leave request.
     def perform_create(self, serializer):
         # Automatically associate the new leave request with the currently logged-in employee.
         try:
-            serializer.save(employee=self.request.user.employee)
+            employee = self.request.user.employee
         except Employee.DoesNotExist:
             # Error if the user trying to apply doesn't have an employee profile.
             raise serializers.ValidationError("User is not linked to an Employee profile.")
 
+        start_date = serializer.validated_data['start_date']
+        end_date = serializer.validated_data['end_date']
+        # The overlap check only holds until the leave is saved: the employee's
+        # guard keeps a concurrent request from slipping in between.
+        try:
+            with employee_guard(employee.pk):
+                self.check_overlap(employee.pk, start_date, end_date)
+                # Hold the requested days against the balance before saving, so
+                # two simultaneous requests cannot both spend the last days.
+                reserve(employee.pk, start_date, end_date)
+                try:
+                    serializer.save(employee=employee)
+                except Exception:
+                    release(employee.pk, start_date, end_date)
+                    raise
+        except LeaveBalanceError as exc:
+            raise serializers.ValidationError(str(exc))
+
+    def perform_update(self, serializer):
+        leave = serializer.instance
+        start_date = serializer.validated_data.get('start_date', leave.start_date)
+        end_date = serializer.validated_data.get('end_date', leave.end_date)
+        if (start_date, end_date) == (leave.start_date, leave.end_date):
+            serializer.save()
+            return
+        try:
+            with employee_guard(leave.employee_id):
+                self.check_overlap(leave.employee_id, start_date, end_date, exclude_pk=leave.pk)
+                reschedule(leave, start_date, end_date)
+                serializer.save()
+        except LeaveBalanceError as exc:
+            raise serializers.ValidationError(str(exc))
+
+    def perform_destroy(self, instance):
+        release(instance.employee_id, instance.start_date, instance.end_date, instance.status)
+        instance.delete()
+
     @action(detail=True, methods=['patch'])
     def approve(self, request, pk=None):
         if request.user.employee.role != 'admin':
             return Response({'error': 'Only admins can approve leaves'}, status=status.HTTP_403_FORBIDDEN)
+        leave = self.get_object()
         try:
-            leave = self.get_object()
-            leave.status = 'Approved'
-            leave.save()
-            return Response({'status': 'leave approved'})
-        except Exception as e:
-            raise e
+            # Moves the days from pending to used in the same atomic balance update.
+            change_status(leave, 'Approved')
+        except LeaveBalanceError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'status': 'leave approved'})
 
     @action(detail=True, methods=['patch'])
     def reject(self, request, pk=None):
         if request.user.employee.role != 'admin':
             return Response({'error': 'Only admins can reject leaves'}, status=status.HTTP_403_FORBIDDEN)
+        leave = self.get_object()
         try:
-            leave = self.get_object()
-            leave.status = 'Rejected'
-            leave.save()
-            return Response({'status': 'leave rejected'})
-        except Exception as e:
-            raise e
+            # Gives the days back to the balance.
+            change_status(leave, 'Rejected')
+        except LeaveBalanceError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'status': 'leave rejected'})
+
+    # GET /api/leaves/balance/?year=2024
+    # Admins may pass ?employee_id=<id> to see someone else's balance.
+    @action(detail=False, methods=['get'])
+    def balance(self, request):
+        try:
+            employee = request.user.employee
+        except AttributeError:
+            raise serializers.ValidationError("User is not linked to an Employee profile.")
+
+        target = employee
+        requested = request.query_params.get('employee_id')
+        if requested and requested != employee.employee_id:
+            if employee.role != 'admin':
+                return Response({'error': 'Only admins can view other balances'}, status=status.HTTP_403_FORBIDDEN)
+            target = get_employee_by_employee_id(requested)
+            if target is None:
+                raise Http404
+
+        try:
+            year = int(request.query_params.get('year', timezone.localdate().year))
+        except ValueError:
+            raise serializers.ValidationError({'year': 'Must be a number.'})
+
+        data = get_balance(target.pk, year)
+        data['employee_id'] = target.employee_id
+        return Response(data)
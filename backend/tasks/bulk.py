@@ -0,0 +1,93 @@
+from django.db import connections
+from django.utils import timezone
+
+from hrms_core.cache import bump_version
+from hrms_core.changefeed import record_writes
+from hrms_core.mongo import allocate_ids, get_collection, to_document
+from hrms_core.sync import log_changes
+from .models import Task
+
+# Outcome of each task in a bulk request.
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+ERROR = 'error'
+
+
+def _db_value(field_name, value):
+    return Task._meta.get_field(field_name).get_db_prep_save(value, connections['default'])
+
+
+# Sets one field to the same value on many tasks.
+#
+# `scope` is the caller's Mongo filter (TaskViewSet.get_mongo_filter), so a task
+# outside it is reported exactly like one that does not exist. Two round trips
+# for any number of tasks: read the current values, then one update_many of the
+# tasks that actually change.
+#
+# Each id is reported once, in request order, as:
+#   updated   - the task had a different value and was changed
+#   unchanged - the task already had that value
+#   error     - no such task (or not visible to the caller)
+def update_tasks(ids, scope, field_name, value):
+    ids = list(dict.fromkeys(ids))
+    field = Task._meta.get_field(field_name)
+    stored = _db_value(field_name, value)
+    collection = get_collection(Task)
+
+    docs = collection.find(
+        {'$and': [scope, {'id': {'$in': ids}}]}, {'id': 1, field.column: 1, 'assigned_to_id': 1, '_id': 0}
+    )
+    current, owners = {}, {}
+    for doc in docs:
+        current[doc['id']] = doc.get(field.column)
+        owners[doc['id']] = doc.get('assigned_to_id')
+
+    results, changed = [], []
+    for pk in ids:
+        result = {'id': pk}
+        results.append(result)
+        if pk not in current:
+            result['result'] = ERROR
+            result['error'] = 'Not found.'
+        elif current[pk] == stored:
+            result['result'] = UNCHANGED
+        else:
+            result['result'] = UPDATED
+            changed.append(pk)
+
+    if changed:
+        collection.update_many(
+            {'$and': [scope, {'id': {'$in': changed}}]},
+            {'$set': {field.column: stored, 'updated_at': _db_value('updated_at', timezone.now())}},
+        )
+        # Raw writes bypass model signals.
+        bump_version('task')
+        # Reassigned tasks concern both the previous and the new assignee.
+        new_owner = stored if field.column == 'assigned_to_id' else None
+        log_changes('task', [(pk, (owners[pk], new_owner)) for pk in changed])
+        record_writes(Task, {'id': {'$in': changed}}, fields=(field_name, 'updated_at'))
+    return results
+
+
+# Inserts validated tasks (TaskSerializer(many=True).validated_data) with one
+# insert_many, drawing their ids from djongo's counter first.
+# Returns the ids, in the same order.
+def create_tasks(rows, assigned_by=None):
+    if not rows:
+        return []
+    first = allocate_ids(Task, len(rows))
+    documents = []
+    for offset, row in enumerate(rows):
+        values = dict(row)
+        if assigned_by is not None:
+            values['assigned_by'] = assigned_by
+        task = Task(**values)
+        task.pk = first + offset
+        documents.append(to_document(task))
+    get_collection(Task).insert_many(documents)
+    ids = [first + offset for offset in range(len(rows))]
+    bump_version('task')
+    log_changes('task', [(doc['id'], [doc['assigned_to_id']]) for doc in documents])
+    record_writes(Task, {'id': {'$in': ids}}, op='insert')
+    return ids
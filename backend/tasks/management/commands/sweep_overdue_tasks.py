@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from tasks.overdue import sweep_overdue
+
+
+class Command(BaseCommand):
+    help = "Marks pending/in-progress tasks whose deadline has passed as 'overdue'."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Check every open task, not just the deadlines passed since the last run.',
+        )
+
+    def handle(self, *args, **options):
+        counts = sweep_overdue(full=options['full'])
+        if counts['from'] is not None and counts['from'] > counts['to']:
+            self.stdout.write('No deadlines have passed since the last run.')
+            return
+        since = counts['from'] or 'the beginning'
+        self.stdout.write(self.style.SUCCESS(
+            f"Marked {counts['marked']} tasks overdue (deadlines from {since} to {counts['to']})."
+        ))
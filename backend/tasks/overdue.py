@@ -0,0 +1,81 @@
+import logging
+from datetime import timedelta
+
+from django.db import connections
+from django.utils import timezone
+
+from hrms_core.cache import bump_version
+from hrms_core.changefeed import record_writes
+from hrms_core.sync import log_changes
+from hrms_core.jobs import get_watermark, set_watermark
+from hrms_core.mongo import get_collection, to_mongo_date
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = 'overdue_tasks'
+
+# Statuses a task leaves for 'overdue' once its deadline has passed.
+OPEN_STATUSES = ('pending', 'in_progress')
+
+
+# The status a task is saved with: an open task whose deadline has already
+# passed is overdue right away. Tasks created or updated through the API go
+# through this (TaskSerializer, update_status), so they never wait for a sweep.
+def effective_status(status, deadline, today=None):
+    if status in OPEN_STATUSES and deadline < (today or timezone.localdate()):
+        return 'overdue'
+    return status
+
+
+# Marks open tasks whose deadline has passed as 'overdue', with one
+# update_many served by the (status, deadline) index.
+#
+# The watermark is the first deadline not yet swept: deadlines before it were
+# handled by an earlier run, so a run only looks at the days that went by since
+# (usually none or one). Tasks that become open-and-past-deadline behind the
+# watermark (reopened by a bulk status change, or written to the database
+# directly) are caught by a full sweep (`full=True`, sweep_all_overdue() daily
+# in each server process, `manage.py sweep_overdue_tasks --full`), which scans
+# every open task before today through the same index.
+#
+# Returns the counts: {'marked': n, 'from': date or None, 'to': date}.
+def sweep_overdue(today=None, full=False):
+    today = today or timezone.localdate()
+    watermark = None if full else get_watermark(JOB_NAME)
+
+    deadline = {'$lt': to_mongo_date(today)}
+    if watermark is not None:
+        if watermark >= to_mongo_date(today):
+            return _report(0, today, today)
+        deadline['$gte'] = watermark
+
+    updated_at = Task._meta.get_field('updated_at').get_db_prep_save(timezone.now(), connections['default'])
+    result = get_collection(Task).update_many(
+        {'status': {'$in': list(OPEN_STATUSES)}, 'deadline': deadline},
+        {'$set': {'status': 'overdue', 'updated_at': updated_at}},
+    )
+    if result.modified_count:
+        # Raw writes bypass model signals.
+        bump_version('task')
+        # The tasks of this run are the overdue ones with its updated_at.
+        marked = {'status': 'overdue', 'updated_at': updated_at}
+        log_changes('task', [
+            (doc['id'], [doc['assigned_to_id']])
+            for doc in get_collection(Task).find(marked, {'id': 1, 'assigned_to_id': 1, '_id': 0})
+        ])
+        record_writes(Task, marked, fields=('status', 'updated_at'))
+    set_watermark(JOB_NAME, to_mongo_date(today))
+    return _report(result.modified_count, watermark.date() if watermark else None, today)
+
+
+# The daily full sweep of the in-process jobs (hrms_core/jobs.py).
+def sweep_all_overdue():
+    return sweep_overdue(full=True)
+
+
+def _report(marked, since, today):
+    counts = {'marked': marked, 'from': since, 'to': today - timedelta(days=1)}
+    if marked:
+        logger.info('Marked %d tasks overdue (deadlines %s to %s).', marked, since or 'start', counts['to'])
+    return counts
@@ -0,0 +1,28 @@
+from hrms_core.mongo import MongoRepository, get_collection
+from .models import Task
+
+
+# Native Mongo read path for the task list (see hrms_core/mongo.py).
+class TaskRepository(MongoRepository):
+    model = Task
+    # TaskSerializer reads assigned_to.name, assigned_by.name and project.title.
+    related = ('project',)
+    directory_related = ('assigned_to', 'assigned_by')
+
+
+# Task counts by status for each of the given projects, with one aggregation:
+# {project_id: {'pending': 3, 'in_progress': 1, ..., 'total': 4}}.
+# Served by the (project, status) index.
+def count_tasks_by_project(project_ids):
+    counts = {pk: dict.fromkeys([key for key, _ in Task.STATUS_CHOICES] + ['total'], 0) for pk in project_ids}
+    if not counts:
+        return counts
+    pipeline = [
+        {'$match': {'project_id': {'$in': list(counts)}}},
+        {'$group': {'_id': {'project': '$project_id', 'status': '$status'}, 'count': {'$sum': 1}}},
+    ]
+    for row in get_collection(Task).aggregate(pipeline):
+        project_counts = counts[row['_id']['project']]
+        project_counts[row['_id']['status']] = project_counts.get(row['_id']['status'], 0) + row['count']
+        project_counts['total'] += row['count']
+    return counts
@@ -1,29 +1,115 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from .models import Project, Task
 from employees.models import Employee
+from employees.directory import (
+    DirectoryListSerializer, EmployeePrimaryKeyRelatedField, EmployeeReadOnlyField, get_employees,
+)
+from hrms_core.prefetch import prefetch_many_to_many
+from hrms_core.sparse import SparseFieldsSerializerMixin
+from .overdue import effective_status
+from .repository import count_tasks_by_project
 
 class EmployeeSimpleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         fields = ['id', 'name', 'employee_id', 'role']
 
-class TaskSerializer(serializers.ModelSerializer):
-    assigned_to_name = serializers.ReadOnlyField(source='assigned_to.name')
-    assigned_by_name = serializers.ReadOnlyField(source='assigned_by.name')
+# The project of a task. Bulk creates preload the referenced projects into
+# context['projects'] ({pk: Project}) instead of one query per row.
+class TaskProjectField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        projects = self.context.get('projects')
+        if projects is None:
+            return super().to_internal_value(data)
+        try:
+            pk = Project._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in projects:
+            self.fail('does_not_exist', pk_value=data)
+        return projects[pk]
+
+# Employees (names on reads, pks on writes) come from the directory cache
+# (employees/directory.py).
+class TaskSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    assigned_to = EmployeePrimaryKeyRelatedField()
+    assigned_by = EmployeePrimaryKeyRelatedField(required=False, allow_null=True)
+    project = TaskProjectField(queryset=Project.objects.all())
+    assigned_to_name = EmployeeReadOnlyField(source='assigned_to.name')
+    assigned_by_name = EmployeeReadOnlyField(source='assigned_by.name')
     project_title = serializers.ReadOnlyField(source='project.title')
 
     class Meta:
         model = Task
         fields = '__all__'
+        list_serializer_class = DirectoryListSerializer
+
+    # A task saved open with a deadline in the past is overdue already.
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        instance = self.instance
+        status = attrs.get('status', instance.status if instance else Task._meta.get_field('status').default)
+        deadline = attrs.get('deadline', instance.deadline if instance else None)
+        if deadline is not None and effective_status(status, deadline) != status:
+            attrs['status'] = 'overdue'
+        return attrs
+
+# Task ids of a bulk request (see tasks/bulk.py).
+class BulkTaskIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+
+    def validate_ids(self, ids):
+        if len(ids) > self.context.get('max_rows', len(ids)):
+            raise serializers.ValidationError(f"At most {self.context['max_rows']} tasks per request.")
+        return ids
+
+
+# PATCH /api/tasks/bulk_update_status/: {"ids": [1, 2], "status": "completed"}
+class BulkTaskStatusSerializer(BulkTaskIdsSerializer):
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
+
+
+# PATCH /api/tasks/bulk_assign/: {"ids": [1, 2], "assigned_to": 7}
+class BulkTaskAssignSerializer(BulkTaskIdsSerializer):
+    assigned_to = EmployeePrimaryKeyRelatedField()
+
+
+# Loads the members of every project on the page in bulk before the
+# per-project serialization runs (see hrms_core/prefetch.py), the employees
+# named by their nested tasks in one directory lookup, and the task counts with
+# one aggregation.
+class ProjectListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        projects = list(data.all() if hasattr(data, 'all') else data)
+        if {'members', 'member_details'} & set(self.child.fields):
+            prefetch_many_to_many(projects, 'members', load=get_employees)
+        if 'tasks' in self.child.fields:
+            self.child.fields['tasks'].load_employees([task for project in projects for task in project.tasks.all()])
+        if 'task_counts' in self.child.fields:
+            counts = count_tasks_by_project([project.pk for project in projects])
+            for project in projects:
+                project._task_counts = counts[project.pk]
+        return super().to_representation(projects)
+
+# Lists are compact by default: task counts by status instead of the nested
+# tasks. ?expand=tasks,member_details brings those back; detail views include them.
+class ProjectSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = ('tasks', 'member_details')
+    field_sources = {'task_counts': ()}
 
-class ProjectSerializer(serializers.ModelSerializer):
     tasks = TaskSerializer(many=True, read_only=True)
-    members = serializers.PrimaryKeyRelatedField(
-        many=True, 
-        queryset=Employee.objects.all()
-    )
+    members = EmployeePrimaryKeyRelatedField(many=True)
     member_details = EmployeeSimpleSerializer(source='members', many=True, read_only=True)
+    task_counts = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
-        fields = ('id', 'title', 'description', 'deadline', 'status', 'members', 'member_details', 'tasks', 'created_at', 'updated_at')
+        fields = ('id', 'title', 'description', 'deadline', 'status', 'members', 'member_details', 'tasks', 'task_counts', 'created_at', 'updated_at')
+        list_serializer_class = ProjectListSerializer
+
+    def get_task_counts(self, obj):
+        counts = getattr(obj, '_task_counts', None)
+        if counts is None:
+            counts = count_tasks_by_project([obj.pk])[obj.pk]
+        return counts
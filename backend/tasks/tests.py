@@ -0,0 +1,70 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from employees import directory
+from .models import Project, Task
+
+
+# Task and project lists load their related rows in bulk (hrms_core/prefetch.py,
+# employees/directory.py): the number of queries a list costs must not grow with
+# the number of rows. Each list is measured on a cold directory cache at two
+# sizes, with assigners who are not project members so that every employee
+# named in the response has to be loaded.
+#
+#   python manage.py test tasks.tests
+class ListQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_projects(self, count, tasks_per_project=3):
+        for n in range(Project.objects.count(), Project.objects.count() + count):
+            members = [self.add_employee(f'member{n}_{i}') for i in range(2)]
+            project = Project.objects.create(title=f'Project {n}', description='', deadline=date(2030, 1, 1))
+            project.members.set(members)
+            for i in range(tasks_per_project):
+                Task.objects.create(
+                    title=f'Task {n}.{i}', description='', project=project, deadline=date(2030, 1, 1),
+                    assigned_to=members[i % len(members)], assigned_by=self.add_employee(f'assigner{n}_{i}'),
+                )
+
+    # Registration creates the employee profile (employees/models.py).
+    @staticmethod
+    def add_employee(username):
+        return User.objects.create_user(username, f'{username}@example.com', 'password').employee
+
+    def count_queries(self, url):
+        directory.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), len(response.json())
+
+    def assert_fixed_query_count(self, url, rows_per_project=1):
+        self.add_projects(2)
+        small, small_rows = self.count_queries(url)
+        self.add_projects(6)
+        large, large_rows = self.count_queries(url)
+        self.assertEqual((small_rows, large_rows), (2 * rows_per_project, 8 * rows_per_project))
+        self.assertEqual(small, large)
+
+    # The ORM read path; the pymongo one (MONGO_READ_ENDPOINTS) loads its
+    # relations with one find per related collection by construction.
+    @override_settings(MONGO_READ_ENDPOINTS=[])
+    def test_task_list(self):
+        self.assert_fixed_query_count('/api/tasks/?paginate=false', rows_per_project=3)
+
+    def test_project_list(self):
+        self.assert_fixed_query_count('/api/projects/?paginate=false')
+
+    def test_expanded_project_list(self):
+        self.assert_fixed_query_count('/api/projects/?paginate=false&expand=tasks,member_details')
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ProjectViewSet, TaskViewSet
@@ -9,3 +10,9 @@ router.register(r'tasks', TaskViewSet)
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+# Async (motor) list/detail reads when running under ASGI; see hrms_core/async_reads.py.
+if settings.ASYNC_READS:
+    from hrms_core.async_reads import async_read_urls
+
+    urlpatterns = async_read_urls('tasks', TaskViewSet, 'task') + urlpatterns
@@ -1,40 +1,96 @@
-from rest_framework import viewsets, permissions, status
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import viewsets, permissions, serializers, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from .models import Project, Task
-from .serializers import ProjectSerializer, TaskSerializer
+from .serializers import BulkTaskAssignSerializer, BulkTaskStatusSerializer, ProjectSerializer, TaskSerializer
+from .repository import TaskRepository
+from .bulk import create_tasks, update_tasks, CREATED, UPDATED, UNCHANGED, ERROR
+from .overdue import effective_status
 from employees.models import Employee
+from hrms_core.conditional import ConditionalGetMixin
+from hrms_core.export import ExportMixin
+from hrms_core.filters import ChoiceFilter, DateFilter, DepartmentFilter, FilterMixin, PrimaryKeyFilter
+from hrms_core.mixins import MongoReadMixin
+from hrms_core.sparse import SparseFieldsMixin
+
+# Related rows needed by the serializers, loaded with one `IN` query per relation
+# instead of one query per row. (Project members are many-to-many and are
+# batch-loaded by ProjectListSerializer, since djongo cannot join them.)
+# Employees come from the directory cache instead (employees/directory.py).
+TASK_RELATIONS = ('project',)
+PROJECT_RELATIONS = ('tasks',)
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Conditional GET: projects embed their tasks and member details.
+    etag_dependencies = ('project', 'task', 'employee')
 
     def get_queryset(self):
         user = self.request.user
         try:
             employee = user.employee
             if employee.role == 'admin':
-                return Project.objects.all()
-            return Project.objects.filter(members=employee)
+                queryset = Project.objects.all()
+            else:
+                queryset = Project.objects.filter(members=employee)
+            return queryset.prefetch_related(*PROJECT_RELATIONS).order_by('-created_at')
         except AttributeError:
             return Project.objects.none()
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, SparseFieldsMixin, ExportMixin, FilterMixin, MongoReadMixin,
+                  viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Conditional GET: tasks show employee names and the project title.
+    etag_dependencies = ('task', 'employee', 'project')
+    # List reads go straight to MongoDB when 'tasks' is in MONGO_READ_ENDPOINTS.
+    repository_class = TaskRepository
+    mongo_reads_name = 'tasks'
+    # GET .../export/?output=csv|ndjson&from=&to=&department= streams the full history.
+    export_range_fields = ('deadline', 'deadline')
+    export_employee_field = 'assigned_to'
+    # GET /api/tasks/?status=&assigned_to=&department=&project=&deadline_after=
+    # &deadline_before=&ordering= (hrms_core/filters.py). Deadline ranges are
+    # index-backed with ordering=deadline.
+    filterset = {
+        'status': ChoiceFilter('status'),
+        'assigned_to': PrimaryKeyFilter('assigned_to'),
+        'department': DepartmentFilter('assigned_to'),
+        'project': PrimaryKeyFilter('project'),
+        'deadline_after': DateFilter('deadline', 'gte'),
+        'deadline_before': DateFilter('deadline', 'lte'),
+    }
+    ordering_fields = ('created_at', 'deadline')
 
     def get_queryset(self):
         user = self.request.user
         try:
             employee = user.employee
             if employee.role == 'admin':
-                return Task.objects.all()
-            return Task.objects.filter(assigned_to=employee)
+                queryset = Task.objects.all()
+            else:
+                queryset = Task.objects.filter(assigned_to=employee)
+            return queryset.prefetch_related(*TASK_RELATIONS).order_by('-created_at')
         except AttributeError:
             return Task.objects.none()
 
+    # Same scoping as get_queryset(), as a raw Mongo filter.
+    def get_mongo_filter(self):
+        try:
+            employee = self.request.user.employee
+        except AttributeError:
+            return None
+        if employee.role == 'admin':
+            return {}
+        return {'assigned_to_id': employee.pk}
+
     def perform_create(self, serializer):
         try:
             employee = self.request.user.employee
@@ -47,8 +103,8 @@ class TaskViewSet(viewsets.ModelViewSet):
         task = self.get_object()
         new_status = request.data.get('status')
         if new_status:
-            task.status = new_status
-            task.save()
+            task.status = effective_status(new_status, task.deadline)
+            task.save(update_fields=['status', 'updated_at'])
             return Response({'status': 'status updated'})
         return Response({'error': 'status not provided'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -58,6 +114,73 @@ class TaskViewSet(viewsets.ModelViewSet):
         checklist = request.data.get('checklist')
         if checklist is not None:
             task.checklist = checklist
-            task.save()
+            task.save(update_fields=['checklist', 'updated_at'])
             return Response({'status': 'checklist updated'})
         return Response({'error': 'checklist not provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # PATCH /api/tasks/bulk_update_status/  {"ids": [1, 2, 3], "status": "completed"}
+    # PATCH /api/tasks/bulk_assign/         {"ids": [1, 2, 3], "assigned_to": 7}
+    # Change many tasks with one update_many (see tasks/bulk.py). Same scoping as
+    # the list: employees can only touch their own tasks, other ids are errors.
+    @action(detail=False, methods=['patch'])
+    def bulk_update_status(self, request):
+        payload = BulkTaskStatusSerializer(data=request.data, context={'max_rows': settings.TASK_BULK_MAX_ROWS})
+        payload.is_valid(raise_exception=True)
+        results = update_tasks(payload.validated_data['ids'], self._bulk_scope(), 'status',
+                               payload.validated_data['status'])
+        return self._bulk_response(results, status=payload.validated_data['status'])
+
+    @action(detail=False, methods=['patch'])
+    def bulk_assign(self, request):
+        payload = BulkTaskAssignSerializer(data=request.data, context={'max_rows': settings.TASK_BULK_MAX_ROWS})
+        payload.is_valid(raise_exception=True)
+        assignee = payload.validated_data['assigned_to']
+        results = update_tasks(payload.validated_data['ids'], self._bulk_scope(), 'assigned_to', assignee.pk)
+        return self._bulk_response(results, assigned_to=assignee.pk)
+
+    # POST /api/tasks/bulk_create/  {"tasks": [{...same fields as POST /api/tasks/...}, ...]}
+    # Validates every task first (400 with the errors of each row if any is
+    # invalid, nothing is created), then inserts them all with one write.
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        rows = request.data.get('tasks') if isinstance(request.data, dict) else None
+        if not isinstance(rows, list) or not rows:
+            raise serializers.ValidationError({'tasks': 'Provide a non-empty list of tasks.'})
+        if len(rows) > settings.TASK_BULK_MAX_ROWS:
+            raise serializers.ValidationError({'tasks': f'At most {settings.TASK_BULK_MAX_ROWS} tasks per request.'})
+        self._bulk_scope()
+
+        # One query for the projects of all rows (see TaskProjectField).
+        project_ids = set()
+        for row in rows:
+            try:
+                project_ids.add(Project._meta.pk.to_python(row.get('project')))
+            except (AttributeError, TypeError, ValueError, DjangoValidationError):
+                pass
+        project_ids.discard(None)
+        context = self.get_serializer_context()
+        context['projects'] = Project.objects.in_bulk(project_ids)
+        payload = TaskSerializer(data=rows, many=True, context=context)
+        if not payload.is_valid():
+            return Response({'tasks': payload.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Like perform_create: the creator is recorded as assigned_by.
+        ids = create_tasks(payload.validated_data, assigned_by=request.user.employee)
+        results = [{'index': index, 'id': pk, 'result': CREATED} for index, pk in enumerate(ids)]
+        return Response({'created': len(ids), 'results': results}, status=status.HTTP_201_CREATED)
+
+    def _bulk_scope(self):
+        scope = self.get_mongo_filter()
+        if scope is None:
+            raise serializers.ValidationError("User is not linked to an Employee profile.")
+        return scope
+
+    def _bulk_response(self, results, **values):
+        counts = Counter(row['result'] for row in results)
+        return Response(dict(
+            values,
+            updated=counts[UPDATED],
+            unchanged=counts[UNCHANGED],
+            errors=counts[ERROR],
+            results=results,
+        ))
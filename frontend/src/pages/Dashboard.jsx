@@ -33,26 +33,17 @@ export default function Dashboard() {
 
   const fetchDashboardData = async () => {
     try {
-      const [projectsRes, tasksRes, employeesRes] = await Promise.all([
-        api.get('projects/'),
-        api.get('tasks/'),
-        api.get('employees/')
-      ]);
-
-      const tasks = tasksRes.data;
-      const tasksStats = {
-        pending: tasks.filter(t => t.status === 'pending').length,
-        in_progress: tasks.filter(t => t.status === 'in_progress').length,
-        completed: tasks.filter(t => t.status === 'completed').length,
-        overdue: tasks.filter(t => t.status === 'overdue').length,
-        total: tasks.length
-      };
+      // One request: counts are aggregated server-side.
+      const { data } = await api.get('dashboard/summary/');
 
       setStats({
-        totalProjects: projectsRes.data.length,
-        totalUsers: employeesRes.data.length,
-        tasks: tasksStats,
-        recentTasks: tasks.slice(0, 5)
+        totalProjects: data.projects.total,
+        totalUsers: data.employees.total,
+        tasks: {
+          ...data.tasks.by_status,
+          total: data.tasks.total
+        },
+        recentTasks: data.recent_tasks
       });
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
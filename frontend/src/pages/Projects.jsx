@@ -54,7 +54,7 @@ export default function Projects() {
 
   const fetchEmployees = async () => {
     try {
-      const response = await api.get('employees/');
+      const response = await api.get('employees/', { params: { fields: 'id,name,employee_id' } });
       setEmployees(response.data);
     } catch (error) {
       console.error('Error fetching employees:', error);
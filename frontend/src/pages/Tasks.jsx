@@ -47,7 +47,8 @@ export default function Tasks() {
 
   const fetchProjects = async () => {
     try {
-      const response = await api.get('projects/');
+      // The dropdown only needs ids and titles.
+      const response = await api.get('projects/', { params: { fields: 'id,title' } });
       setProjects(response.data);
     } catch (error) {
       console.error('Error fetching projects:', error);
@@ -56,7 +57,7 @@ export default function Tasks() {
 
   const fetchEmployees = async () => {
     try {
-      const response = await api.get('employees/');
+      const response = await api.get('employees/', { params: { fields: 'id,name' } });
       setEmployees(response.data);
     } catch (error) {
       console.error('Error fetching employees:', error);
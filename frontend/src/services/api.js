@@ -22,6 +22,10 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    // The pages below still work on complete lists; opt out of server-side pagination.
+    if (!config.method || config.method === 'get') {
+      config.params = { paginate: 'false', ...config.params };
+    }
     return config;
   },
   (error) => {